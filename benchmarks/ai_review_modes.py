@@ -0,0 +1,116 @@
+"""
+Latency benchmark for the single-call and parallel AI review paths.
+
+Usage (from the repo root):
+    python benchmarks/ai_review_modes.py --text resume.txt --runs 3
+    python benchmarks/ai_review_modes.py --pdf-url https://.../resume.pdf
+    python benchmarks/ai_review_modes.py --text resume.txt --simulate
+
+By default this calls the real OpenAI API (OPENAI_API_KEY must be set).
+--simulate swaps in a fake client whose latency grows with prompt and output
+size, which is useful for checking the fan-out/merge overhead offline.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+# Every run must reach the model, so the review cache is bypassed
+os.environ['AI_REVIEW_CACHE_ENABLED'] = 'false'
+os.environ.setdefault('OPENAI_API_KEY', 'simulated')
+
+
+class SimulatedCompletions:
+    """Fake chat.completions endpoint: fixed overhead plus per-character input and output cost"""
+
+    def __init__(self, base_latency, input_latency_per_1k, output_latency_per_item):
+        self.base_latency = base_latency
+        self.input_latency_per_1k = input_latency_per_1k
+        self.output_latency_per_item = output_latency_per_item
+
+    def create(self, **request):
+        prompt = request['messages'][-1]['content']
+        lines = [line.strip() for line in prompt.split('Resume Content:')[-1].split('\n') if len(line.strip()) > 30]
+        item_limit = re.search(r'Limit to \d+-(\d+) feedback items', prompt)
+        max_items = int(item_limit.group(1)) if item_limit else 12
+        items = [{'selected_text': line[:120], 'comment': 'Quantify the impact of this work.'} for line in lines[:max_items]]
+
+        time.sleep(self.base_latency + len(prompt) / 1000 * self.input_latency_per_1k + len(items) * self.output_latency_per_item)
+
+        message = type('Message', (), {'content': json.dumps({'feedback': items})})
+        choice = type('Choice', (), {'message': message})
+        return type('Response', (), {'choices': [choice]})
+
+
+def load_resume_text(args):
+    from helpers.pdf_extractor import extract_text_from_pdf_url, clean_resume_text
+
+    if args.text:
+        with open(args.text, 'r', encoding='utf-8') as file:
+            return clean_resume_text(file.read())
+    return clean_resume_text(extract_text_from_pdf_url(args.pdf_url) or '')
+
+
+def run_mode(analyzer, mode, resume_text, runs):
+    analyzer.mode = mode
+    latencies = []
+    item_counts = []
+
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        feedback = analyzer.analyze_resume(resume_text)
+        latencies.append(time.perf_counter() - start_time)
+        item_counts.append(len(feedback or []))
+
+    return {
+        'mode': mode,
+        'runs': runs,
+        'mean_s': statistics.mean(latencies),
+        'median_s': statistics.median(latencies),
+        'min_s': min(latencies),
+        'max_s': max(latencies),
+        'mean_items': statistics.mean(item_counts)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--text', help='Path to a plain-text resume')
+    source.add_argument('--pdf-url', help='URL of a resume PDF')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--simulate', action='store_true', help='Use a fake client instead of OpenAI')
+    parser.add_argument('--base-latency', type=float, default=0.8)
+    parser.add_argument('--input-latency-per-1k', type=float, default=0.05)
+    parser.add_argument('--output-latency-per-item', type=float, default=0.6)
+    args = parser.parse_args()
+
+    from helpers.ai_resume_analyzer import ResumeAnalyzer
+
+    client = None
+    if args.simulate:
+        completions = SimulatedCompletions(args.base_latency, args.input_latency_per_1k, args.output_latency_per_item)
+        client = type('Client', (), {'chat': type('Chat', (), {'completions': completions})})
+    resume_analyzer = ResumeAnalyzer(client=client)
+
+    resume_text = load_resume_text(args)
+    if not resume_text:
+        print('Could not load resume text')
+        sys.exit(1)
+
+    print(f"Resume: {len(resume_text)} chars, {len(resume_analyzer._create_analysis_chunks(resume_text))} parallel chunk(s)")
+    print(f"{'mode':<10} {'runs':>4} {'mean':>8} {'median':>8} {'min':>8} {'max':>8} {'items':>6}")
+    for mode in ('single', 'parallel'):
+        result = run_mode(resume_analyzer, mode, resume_text, args.runs)
+        print(f"{result['mode']:<10} {result['runs']:>4} {result['mean_s']:>7.2f}s {result['median_s']:>7.2f}s "
+              f"{result['min_s']:>7.2f}s {result['max_s']:>7.2f}s {result['mean_items']:>6.1f}")
+    print(f"Observed model latencies: {json.dumps(resume_analyzer.router.get_stats())}")
+
+
+if __name__ == '__main__':
+    main()
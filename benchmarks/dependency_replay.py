@@ -0,0 +1,248 @@
+"""
+Replays recorded Discord, Hypothes.is and OpenAI responses with injected latency
+and errors, and measures how send_followup_message, create_bulk_annotations and
+analyze_resume hold up.
+
+Usage (from the repo root):
+    python benchmarks/dependency_replay.py
+    python benchmarks/dependency_replay.py --runs 50 --concurrency 10 --profile slow_openai.json
+    python benchmarks/dependency_replay.py --targets send_followup_message --concurrency 1 --seed 7
+
+Recording (needs real credentials and network, writes sanitized cassettes):
+    HTTP_REPLAY_MODE=record python src/main.py     # then use the bot as normal
+
+Cassettes are read from --cassettes (default benchmarks/cassettes, see
+helpers/http_replay.py). When a service has no cassette yet, a synthetic one
+with the same shape as a sanitized recording is written so the benchmark still
+runs offline.
+
+--profile is a JSON file overriding the per-service fault profiles, e.g.
+{"openai": {"p50_ms": 9000, "p99_ms": 40000, "rate_limit_rate": 0.1}}. With
+--concurrency 1 the same seed draws the same faults on every run. Circuit
+breakers keep their state across runs, as they would in a warm container.
+"""
+import os
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARK_DIR), 'src'))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from pdf_corpus import make_resume_pages
+
+APPLICATION_ID = '1234567890123456789'
+INTERACTION_TOKEN = 'aW50ZXJhY3Rpb246MTIzNDU2Nzg5MDEyMzQ1Njc4OTpyZXBsYXk'
+RESUME_URL = 'https://resuralph-benchmark.s3.us-east-1.amazonaws.com/uploads/0/resume.pdf'
+
+
+def synthetic_interactions(service):
+    """Cassette entries shaped like sanitized recordings of each service"""
+    from helpers.http_replay import route_template, sanitize_completion, redact, OPENAI_ROUTE
+
+    if service == 'discord':
+        route = route_template('POST', f"https://discord.com/api/v10/webhooks/{APPLICATION_ID}/{INTERACTION_TOKEN}")
+        body = redact({'id': '1300000000000000000', 'type': 0, 'content': '', 'embeds': [{'title': 'x'}],
+                       'channel_id': '1200000000000000000', 'author': {'id': APPLICATION_ID, 'username': 'ResuRalph', 'bot': True}})
+        return [{'route': route, 'status': 200, 'headers': {'Content-Type': 'application/json'}, 'body': body,
+                 'recorded_latency_ms': 140.0}]
+
+    if service == 'hypothesis':
+        route = route_template('POST', 'https://api.hypothes.is/api/annotations')
+        body = redact({'id': 'Zx0aBcDeFgHiJkLmNoPqRs', 'created': '2025-01-01T00:00:00.000000+00:00',
+                       'uri': RESUME_URL, 'user': 'acct:resuralph@hypothes.is', 'text': 'x', 'tags': ['ai-review'],
+                       'group': '__world__', 'permissions': {'read': ['group:__world__']},
+                       'target': [{'source': RESUME_URL, 'selector': [{'type': 'TextQuoteSelector', 'exact': 'x'}]}],
+                       'links': {'html': 'https://hypothes.is/a/x'}})
+        return [{'route': route, 'status': 200, 'headers': {'Content-Type': 'application/json'}, 'body': body,
+                 'recorded_latency_ms': 310.0}]
+
+    comments = [
+        "Lead with the result you delivered, then the method; quantify it with a number.",
+        "This lists tools rather than impact. What changed for users or the business?",
+        "Vague scope: say how many services, users or requests this covered.",
+        "Start with a strong action verb and cut the filler words.",
+        "Add a metric: latency, cost, revenue or time saved.",
+        "Clarify your role: did you lead this, or contribute to it?",
+        "Two ideas in one bullet; split them so each gets its own result.",
+        "Name the outcome of the migration, not just that it happened.",
+    ]
+    content = json.dumps({'feedback': [{'selected_text': 'x', 'comment': comment} for comment in comments]})
+    return [{'route': OPENAI_ROUTE, 'status': 200, 'headers': {},
+             'body': {'model': 'gpt-4o-mini', 'content': sanitize_completion(content)}, 'recorded_latency_ms': 6800.0}]
+
+
+def ensure_cassettes(directory):
+    created = []
+    for service in ('discord', 'hypothesis', 'openai'):
+        path = os.path.join(directory, f"{service}.json")
+        if os.path.exists(path):
+            continue
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'interactions': synthetic_interactions(service)}, f, indent=2)
+        created.append(service)
+    return created
+
+
+def make_resume_text(seed):
+    lines = ["Jordan Lee", "Email: jordan.lee@example.com | Phone: (555) 010-0100", "Experience"]
+    for page in make_resume_pages(seed, 2):
+        lines.extend(page)
+    return '\n'.join(lines)
+
+
+def make_annotations(resume_text, count):
+    quotes = [line for line in resume_text.split('\n') if len(line) > 40]
+    return [{
+        'uri': f"https://via.hypothes.is/{RESUME_URL}",
+        'document': {'title': ['Resume']},
+        'text': f"Quantify the impact of this bullet ({index}).",
+        'tags': ['ai-review'],
+        'group': '__world__',
+        'permissions': {'read': ['group:__world__']},
+        'target': [{'source': RESUME_URL, 'selector': [{'type': 'TextQuoteSelector', 'exact': quotes[index % len(quotes)][:60]}]}]
+    } for index in range(count)]
+
+
+def build_targets(resume_text, annotation_count, review_budget_ms):
+    """name -> function() returning (ok, detail) for one call under a fresh production-sized deadline"""
+    from helpers.deadline import Deadline
+    from helpers.discord_followup import send_followup_message
+    from helpers.hypothesis_client import create_bulk_annotations
+    from helpers.ai_resume_analyzer import ResumeAnalyzer
+
+    analyzer = ResumeAnalyzer()
+    annotations = make_annotations(resume_text, annotation_count)
+    followup = {'embeds': [{'title': '✅ Resume Updated', 'description': 'Benchmark follow-up'}]}
+
+    def followup_call():
+        ok = send_followup_message(APPLICATION_ID, INTERACTION_TOKEN, followup, Deadline.from_lambda_context(None))
+        return ok, None
+
+    def annotations_call():
+        results = create_bulk_annotations(annotations, Deadline.from_lambda_context(None))
+        return not results['failed'] and not results['skipped'], {
+            'created': len(results['created']), 'failed': len(results['failed']), 'skipped': len(results['skipped'])
+        }
+
+    def analyze_call():
+        feedback = analyzer.analyze_resume(resume_text, review_budget_ms)
+        return feedback is not None, {'items': len(feedback or [])}
+
+    return {
+        'send_followup_message': followup_call,
+        'create_bulk_annotations': annotations_call,
+        'analyze_resume': analyze_call,
+    }
+
+
+def percentile(sorted_values, p):
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def run_target(call, runs, concurrency):
+    samples = []
+    lock = threading.Lock()
+
+    def one(_):
+        start = time.monotonic()
+        try:
+            ok, detail = call()
+        except Exception as e:
+            ok, detail = False, {'exception': type(e).__name__}
+        elapsed_ms = (time.monotonic() - start) * 1000
+        with lock:
+            samples.append((elapsed_ms, ok, detail))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(runs)))
+
+    timings = sorted(sample[0] for sample in samples)
+    result = {
+        'runs': runs,
+        'ok_rate': round(sum(1 for sample in samples if sample[1]) / runs, 3),
+        'p50_ms': round(percentile(timings, 50), 1),
+        'p95_ms': round(percentile(timings, 95), 1),
+        'p99_ms': round(percentile(timings, 99), 1),
+        'max_ms': round(timings[-1], 1)
+    }
+
+    # Sum numeric details (annotations created/failed, feedback items) across runs
+    totals = {}
+    for _, _, detail in samples:
+        for key, value in (detail or {}).items():
+            if isinstance(value, int):
+                totals[key] = totals.get(key, 0) + value
+            else:
+                totals[f"{key}:{value}"] = totals.get(f"{key}:{value}", 0) + 1
+    if totals:
+        result['totals'] = totals
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--targets', nargs='+', help='Targets to run (default: all)')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--annotations', type=int, default=8, help='Annotations per create_bulk_annotations call')
+    parser.add_argument('--review-budget-ms', type=float, default=45000, help='Time left when analyze_resume starts')
+    parser.add_argument('--cassettes', default=os.path.join(BENCHMARK_DIR, 'cassettes'))
+    parser.add_argument('--profile', help='JSON file overriding fault profiles')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    # Read when the helpers are first imported
+    os.environ['HTTP_REPLAY_MODE'] = 'replay'
+    os.environ['HTTP_REPLAY_DIR'] = args.cassettes
+    os.environ['HTTP_REPLAY_SEED'] = str(args.seed)
+    if args.profile:
+        os.environ['HTTP_REPLAY_PROFILE'] = os.path.abspath(args.profile)
+    os.environ['AI_REVIEW_CACHE_ENABLED'] = 'false'
+    os.environ.setdefault('BUCKET_REGION', 'us-east-1')
+
+    logging.disable(logging.ERROR)
+
+    created = ensure_cassettes(args.cassettes)
+    if created and not args.json:
+        print(f"No recordings for {', '.join(created)}; wrote synthetic cassettes to {args.cassettes}")
+
+    from helpers.http_replay import get_http_replay_stats
+    from helpers.circuit_breaker import get_circuit_breaker_stats
+
+    targets = build_targets(make_resume_text(args.seed), args.annotations, args.review_budget_ms)
+    names = args.targets or list(targets)
+    unknown = [name for name in names if name not in targets]
+    if unknown:
+        parser.error(f"Unknown targets: {', '.join(unknown)}. Available: {', '.join(targets)}")
+
+    results = {name: run_target(targets[name], args.runs, args.concurrency) for name in names}
+    replay_stats = get_http_replay_stats()
+
+    if args.json:
+        print(json.dumps({'targets': results, 'replay': replay_stats, 'circuit_breakers': get_circuit_breaker_stats()},
+                         indent=2, default=str))
+        return
+
+    print(f"{'target':<26} {'runs':>5} {'ok':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  totals")
+    for name, result in results.items():
+        totals = ', '.join(f"{key}={value}" for key, value in result.get('totals', {}).items())
+        print(f"{name:<26} {result['runs']:>5} {result['ok_rate']:>6.1%} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} "
+              f"{result['p99_ms']:>9.1f} {result['max_ms']:>9.1f}  {totals}")
+
+    print("\nReplayed and injected per service:")
+    for service, stats in replay_stats['services'].items():
+        print(f"  {service:<12} {', '.join(f'{key}={value}' for key, value in sorted(stats.items()))}")
+
+
+if __name__ == '__main__':
+    main()
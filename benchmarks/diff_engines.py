@@ -0,0 +1,146 @@
+"""
+Benchmark for the resume diff engines against difflib.
+
+Usage (from the repo root):
+    python benchmarks/diff_engines.py
+    python benchmarks/diff_engines.py --pages 10 --runs 5 --seed 7
+
+Builds synthetic multi-page resumes, applies a set of edits to each (single-word
+changes, a reflowed paragraph, inserted and removed bullets, a long run of
+near-duplicate lines) and reports the time per diff and the size of the output
+each engine produces. No network access or PDFs are needed.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+import textwrap
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from helpers.diff_engine import DiffEngine
+
+WORDS = (
+    "built designed led shipped migrated scaled reduced improved automated python aws lambda dynamodb "
+    "react typescript kubernetes terraform pipelines latency throughput customers revenue dashboards "
+    "services api graphql postgres redis kafka team mentored interns on-call reliability observability"
+).split()
+
+SECTION_TITLES = ["Experience", "Projects", "Education", "Skills", "Leadership", "Publications"]
+
+
+def make_resume(rng, pages, lines_per_page=55):
+    """Resume-shaped text: section headers, role lines and bullets, wrapped like extracted PDF text"""
+    lines = []
+    while len(lines) < pages * lines_per_page:
+        lines.append(rng.choice(SECTION_TITLES))
+        for _ in range(rng.randint(2, 4)):
+            lines.append(f"{rng.choice(WORDS).title()} Engineer, Company {rng.randint(1, 999)}  {rng.randint(2015, 2025)}")
+            for _ in range(rng.randint(3, 6)):
+                bullet = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(12, 30)))
+                wrapped = textwrap.wrap(f"• {bullet}", width=rng.choice([70, 80, 90]))
+                lines.extend(wrapped)
+    return lines
+
+
+def edit_words(rng, lines, count):
+    lines = list(lines)
+    for _ in range(count):
+        index = rng.randrange(len(lines))
+        words = lines[index].split()
+        if words:
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+            lines[index] = ' '.join(words)
+    return lines
+
+
+def reflow(rng, lines, paragraphs):
+    """Rewraps a few multi-line bullets at a different width, as a font or margin change would"""
+    lines = list(lines)
+    for _ in range(paragraphs):
+        start = rng.randrange(len(lines) - 6)
+        block = lines[start:start + 6]
+        rewrapped = textwrap.wrap(' '.join(block), width=rng.choice([60, 75, 95]))
+        lines[start:start + 6] = rewrapped
+    return lines
+
+
+def insert_and_remove(rng, lines, count):
+    lines = list(lines)
+    for _ in range(count):
+        del lines[rng.randrange(len(lines))]
+        bullet = ' '.join(rng.choice(WORDS) for _ in range(15))
+        lines.insert(rng.randrange(len(lines)), f"• {bullet}")
+    return lines
+
+
+def repetitive(rng, pages):
+    """Many near-identical lines, the case where SequenceMatcher degrades the most"""
+    old = [f"• {rng.choice(WORDS)} {rng.choice(WORDS)}" for _ in range(pages * 55)]
+    new = list(old)
+    for _ in range(len(new) // 10):
+        new[rng.randrange(len(new))] = f"• {rng.choice(WORDS)} {rng.choice(WORDS)}"
+    return old, new
+
+
+def build_scenarios(rng, pages):
+    base = make_resume(rng, pages)
+    return {
+        'word_edits': (base, edit_words(rng, base, 10)),
+        'reflow': (base, reflow(rng, base, 5)),
+        'reflow_and_edits': (base, edit_words(rng, reflow(rng, base, 5), 5)),
+        'insert_remove': (base, insert_and_remove(rng, base, 10)),
+        'rewrite': (base, make_resume(rng, pages)),
+        'repetitive': repetitive(rng, pages),
+    }
+
+
+def run_engine(engine, old_lines, new_lines, runs):
+    timings = []
+    changes = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        changes = list(engine.iter_changes(old_lines, new_lines))
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'median_ms': round(statistics.median(timings), 2),
+        'changed_lines': len(changes),
+        'output_chars': sum(len(line) for _, line in changes)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=4)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    engines = {
+        'difflib': DiffEngine('difflib'),
+        'myers': DiffEngine('myers', word_level=True, normalize=True),
+        'patience': DiffEngine('patience', word_level=True, normalize=True),
+    }
+
+    results = {}
+    for scenario, (old_lines, new_lines) in build_scenarios(random.Random(args.seed), args.pages).items():
+        results[scenario] = {
+            name: run_engine(engine, old_lines, new_lines, args.runs) for name, engine in engines.items()
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'scenario':<18} {'engine':<10} {'median ms':>10} {'lines':>7} {'chars':>8}")
+    for scenario, by_engine in results.items():
+        for name, result in by_engine.items():
+            print(f"{scenario:<18} {name:<10} {result['median_ms']:>10.2f} {result['changed_lines']:>7} {result['output_chars']:>8}")
+
+
+if __name__ == '__main__':
+    main()
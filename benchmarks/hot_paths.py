@@ -0,0 +1,302 @@
+"""
+Micro-benchmarks for the PDF, diff and formatting hot paths, with stored baselines.
+
+Usage (from the repo root):
+    python benchmarks/hot_paths.py                          # run and print
+    python benchmarks/hot_paths.py --save-baseline main     # store results in benchmarks/baselines/main.json
+    python benchmarks/hot_paths.py --compare main           # fail (exit 1) on regressions against it
+    python benchmarks/hot_paths.py --pages 1 20 --cases compare_text_diff --runs 10
+
+Every case runs over generated resume PDFs (benchmarks/pdf_corpus.py) of 1-20
+pages. PDFs are served by a local HTTP server so the download paths are real but
+stay on the machine. The /tmp disk cache and the diff cache are disabled so
+each run does the full work; DynamoDB, S3, OpenAI and Hypothes.is are never
+called. The parsing sandbox stays on unless --no-sandbox is given, matching
+production.
+
+Baselines record the git commit and Python version they were taken with.
+Compare only against baselines taken on the same machine. benchmarks/baselines/main.json
+is a committed reference run. On another machine, check out the commit you want to
+measure against and run --save-baseline NAME there. Then check out your branch and
+run --compare NAME. Refresh main.json from main when a change intentionally moves
+the numbers.
+"""
+import os
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import threading
+import statistics
+import subprocess
+import contextlib
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+BASELINE_DIR = os.path.join(BENCHMARK_DIR, 'baselines')
+sys.path.insert(0, os.path.join(REPO_DIR, 'src'))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from pdf_corpus import make_resume_pages, build_pdf, WORDS
+
+DEFAULT_PAGES = [1, 5, 10, 20]
+
+
+class FixtureServer:
+    """Serves in-memory PDFs over HTTP on a free localhost port"""
+
+    def __init__(self):
+        self.files = {}
+        files = self.files
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = files.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/pdf')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def add(self, name, body):
+        self.files[f"/{name}"] = body
+        return f"http://127.0.0.1:{self.server.server_port}/{name}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+
+
+def edit_pages(pages, seed):
+    """A new version of a resume with a few lines changed on one page"""
+    rng = random.Random(seed)
+    edited = [list(lines) for lines in pages]
+    page = rng.randrange(len(edited))
+    for _ in range(3):
+        index = rng.randrange(len(edited[page]))
+        edited[page][index] = ' '.join(rng.choice(WORDS) for _ in range(12))
+    return edited
+
+
+def make_annotations(text, count, rng):
+    lines = [line for line in text.split('\n') if len(line) > 20]
+    rows = []
+    for index in range(count):
+        quote = rng.choice(lines)
+        rows.append({
+            'text': f"Consider quantifying the impact here ({index}).",
+            'user': f"acct:reviewer{index % 7}@hypothes.is",
+            'target': [{'selector': [{'type': 'TextQuoteSelector', 'exact': quote}]}]
+        })
+    return {'total': count, 'rows': rows}
+
+
+def make_feedback_items(text, count, rng):
+    lines = [line for line in text.split('\n') if len(line) > 40]
+    items = []
+    for _ in range(count):
+        line = rng.choice(lines)
+        start = rng.randrange(0, len(line) // 2)
+        items.append({'selected_text': line[start:start + 30], 'comment': "Lead with the result, then the method."})
+    return items
+
+
+def build_fixtures(server, page_counts, seed):
+    fixtures = {}
+    for pages in page_counts:
+        old_pages = make_resume_pages(seed + pages, pages)
+        new_pages = edit_pages(old_pages, seed + pages)
+        old_pdf = build_pdf(old_pages)
+        text = '\n'.join('\n'.join(lines) for lines in old_pages)
+        rng = random.Random(seed + pages)
+        fixtures[pages] = {
+            'old_url': server.add(f"resume-{pages}-v1.pdf", old_pdf),
+            'new_url': server.add(f"resume-{pages}-v2.pdf", build_pdf(new_pages)),
+            'size': len(old_pdf),
+            # Extracted-looking text: ragged whitespace and blank runs for clean_resume_text to remove
+            'raw_text': text.replace('\n', '  \n\n\n  '),
+            'text': text,
+            'annotations': make_annotations(text, 10 * pages, rng),
+            'feedback': make_feedback_items(text, 8 * pages, rng)
+        }
+    return fixtures
+
+
+def build_cases():
+    """name -> function(fixture) running one iteration of the hot path"""
+    from helpers.validate_pdf import validate_pdf
+    from helpers.pdf_extractor import extract_text_from_pdf_url, clean_resume_text
+    from helpers import get_pdf_diff
+    from helpers.ai_resume_analyzer import ResumeAnalyzer
+    from commands.get_annotations import format_annotations
+
+    analyzer = ResumeAnalyzer(client=object())
+
+    def format_feedback(fixture):
+        # A fresh anchor index each time, as for the first item of a new review
+        analyzer._anchor_index = None
+        analyzer.format_feedback_for_hypothesis(fixture['feedback'], fixture['old_url'], fixture['text'])
+
+    return {
+        'validate_pdf': lambda fixture: validate_pdf({
+            'content_type': 'application/pdf', 'size': fixture['size'], 'url': fixture['old_url']
+        }),
+        'extract_text_from_pdf_url': lambda fixture: extract_text_from_pdf_url(fixture['old_url']),
+        'extract_text_from_pdf_url_diff': lambda fixture: get_pdf_diff.extract_text_from_pdf_url(fixture['old_url']),
+        'clean_resume_text': lambda fixture: clean_resume_text(fixture['raw_text']),
+        'compare_text_diff': lambda fixture: get_pdf_diff.compare_text_diff(fixture['old_url'], fixture['new_url']),
+        'format_annotations': lambda fixture: format_annotations(fixture['annotations'], 'benchmark'),
+        'format_feedback_for_hypothesis': format_feedback,
+    }
+
+
+def time_case(run, fixture, runs, warmup):
+    # validate_pdf prints progress and the helpers log at INFO; keep both out of the timings and output
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            run(fixture)
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            run(fixture)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'min_ms': round(timings[0], 3),
+        'runs': runs
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(name, results):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    baseline = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'created_at': datetime.now(timezone.utc).isoformat()
+        },
+        'results': results
+    }
+    with open(baseline_path(name), 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+    print(f"Saved baseline {name} ({baseline['meta']['commit']}) to {baseline_path(name)}")
+
+
+def compare_baseline(name, results, threshold, min_delta_ms):
+    """Prints the change against a baseline and returns the keys that regressed beyond the threshold"""
+    with open(baseline_path(name)) as f:
+        baseline = json.load(f)
+
+    print(f"\nAgainst baseline {name} (commit {baseline['meta']['commit']}, Python {baseline['meta']['python']}):")
+    print(f"{'case':<46} {'base ms':>9} {'now ms':>9} {'change':>8}")
+
+    regressions = []
+    for key, result in results.items():
+        previous = baseline['results'].get(key)
+        if previous is None:
+            print(f"{key:<46} {'-':>9} {result['median_ms']:>9.3f} {'new':>8}")
+            continue
+        before, after = previous['median_ms'], result['median_ms']
+        change = (after - before) / before if before else 0.0
+        # Sub-threshold absolute changes on fast cases are timer noise, not regressions
+        regressed = change > threshold and after - before > min_delta_ms
+        if regressed:
+            regressions.append(key)
+        print(f"{key:<46} {before:>9.3f} {after:>9.3f} {change:>+7.1%}{' !' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=DEFAULT_PAGES, help='Page counts to generate (1-20)')
+    parser.add_argument('--cases', nargs='+', help='Cases to run (default: all)')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-sandbox', action='store_true', help='Parse PDFs in-process instead of in sandbox workers')
+    parser.add_argument('--save-baseline', metavar='NAME')
+    parser.add_argument('--compare', metavar='NAME')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Median slowdown that counts as a regression')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help='Ignore regressions smaller than this')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    if args.compare and not os.path.exists(baseline_path(args.compare)):
+        parser.error(f"No baseline {baseline_path(args.compare)}; create it with --save-baseline {args.compare}")
+
+    # Full work on every run, and no AWS or OpenAI calls. Set here rather than at import, since
+    # load_test.py imports edit_pages from this module and must keep its own cache settings.
+    os.environ['DISK_CACHE_ENABLED'] = 'false'
+    os.environ['DIFF_CACHE_ENABLED'] = 'false'
+    os.environ.setdefault('BUCKET_REGION', 'us-east-1')
+    os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+
+    if args.no_sandbox:
+        os.environ['PDF_SANDBOX_ENABLED'] = 'false'
+
+    cases = build_cases()
+    names = args.cases or list(cases)
+    unknown = [name for name in names if name not in cases]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)}. Available: {', '.join(cases)}")
+
+    results = {}
+    with FixtureServer() as server:
+        fixtures = build_fixtures(server, args.pages, args.seed)
+        for name in names:
+            for pages in args.pages:
+                results[f"{name}[{pages}p]"] = time_case(cases[name], fixtures[pages], args.runs, args.warmup)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'case':<46} {'median ms':>10} {'p95 ms':>10} {'min ms':>10}")
+        for key, result in results.items():
+            print(f"{key:<46} {result['median_ms']:>10.3f} {result['p95_ms']:>10.3f} {result['min_ms']:>10.3f}")
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+
+    if args.compare:
+        regressions = compare_baseline(args.compare, results, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
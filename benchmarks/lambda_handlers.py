@@ -0,0 +1,256 @@
+"""
+Compares the two Lambda entry points for Discord interactions: main.handler
+(Mangum -> WsgiToAsgi -> Flask -> verify_key_decorator) and lambda_handler.handler
+(native Function URL handler). Both share interaction_router.
+
+Usage (from the repo root):
+    python benchmarks/lambda_handlers.py
+    python benchmarks/lambda_handlers.py --cold-runs 10 --requests 500
+    python benchmarks/lambda_handlers.py --skip-cold --json
+
+Cold start: each run is a fresh interpreter that imports the handler module and
+serves a signed ping, measuring the import, the first request and a second one.
+Warm: both handlers live in one process and take the same signed Function URL
+events (ping, get_latest_resume, get_all_resumes and a bad signature)
+alternately, with the fake S3/DynamoDB from load_test.py answering instantly,
+so the difference is the adapter and verification overhead.
+"""
+import os
+import io
+import sys
+import json
+import time
+import uuid
+import logging
+import argparse
+import importlib
+import subprocess
+import contextlib
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARK_DIR), 'src'))
+sys.path.insert(0, BENCHMARK_DIR)
+
+HANDLERS = ['main', 'lambda_handler']
+WARM_REQUESTS = ['ping', 'get_latest_resume', 'get_all_resumes', 'bad_signature']
+
+
+class FakeLambdaContext:
+    function_name = 'resuralph-benchmark'
+    memory_limit_in_mb = 1024
+
+    def __init__(self):
+        self.aws_request_id = str(uuid.uuid4())
+
+    def get_remaining_time_in_millis(self):
+        return 3000
+
+
+def function_url_event(body, headers):
+    """A Lambda Function URL (payload format 2.0) POST, as both handlers receive it"""
+    now = time.time()
+    return {
+        'version': '2.0',
+        'routeKey': '$default',
+        'rawPath': '/',
+        'rawQueryString': '',
+        # Flask won't read a body without its length, and Function URLs always send it
+        'headers': {name.lower(): value for name, value in headers.items()} | {'content-length': str(len(body))},
+        'requestContext': {
+            'accountId': 'anonymous',
+            'apiId': 'benchmark',
+            'domainName': 'benchmark.lambda-url.us-east-1.on.aws',
+            'domainPrefix': 'benchmark',
+            'http': {'method': 'POST', 'path': '/', 'protocol': 'HTTP/1.1', 'sourceIp': '127.0.0.1',
+                     'userAgent': 'Discord-Interactions/1.0'},
+            'requestId': str(uuid.uuid4()),
+            'routeKey': '$default',
+            'stage': '$default',
+            'time': time.strftime('%d/%b/%Y:%H:%M:%S +0000', time.gmtime(now)),
+            'timeEpoch': int(now * 1000)
+        },
+        'body': body.decode('utf-8'),
+        'isBase64Encoded': False
+    }
+
+
+def run_child(handler_name):
+    """One cold start: runs in a fresh interpreter and prints its timings as JSON"""
+    import nacl.signing
+
+    signing_key = nacl.signing.SigningKey.generate()
+    public_key = signing_key.verify_key.encode().hex()
+    os.environ['ENVIRONMENT'] = 'PROD'
+    os.environ['DISCORD_PUBLIC_KEY'] = public_key
+    os.environ.setdefault('BUCKET_REGION', 'us-east-1')
+    os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+
+    def signed_ping():
+        body = json.dumps({'id': '1', 'application_id': '1', 'token': 'x', 'type': 1, 'version': 1}).encode('utf-8')
+        timestamp = str(int(time.time()))
+        signature = signing_key.sign(timestamp.encode() + body).signature.hex()
+        return function_url_event(body, {'Content-Type': 'application/json', 'X-Signature-Ed25519': signature,
+                                         'X-Signature-Timestamp': timestamp})
+
+    start = time.perf_counter()
+    module = importlib.import_module(handler_name)
+    import_ms = (time.perf_counter() - start) * 1000
+
+    timings = {'import_ms': import_ms}
+    for label in ('first_request_ms', 'second_request_ms'):
+        event = signed_ping()
+        start = time.perf_counter()
+        response = module.handler(event, FakeLambdaContext())
+        timings[label] = (time.perf_counter() - start) * 1000
+        if response.get('statusCode') != 200:
+            timings['error'] = f"status {response.get('statusCode')}"
+
+    timings['modules'] = len(sys.modules)
+    timings['flask_imported'] = 'flask' in sys.modules
+    sys.stdout.write(json.dumps(timings) + "\n")
+    sys.stdout.flush()
+
+    # Only the sandbox can have started in PROD mode; load_test's shutdown would add its import to process_ms
+    from helpers.pdf_sandbox import shutdown_pdf_sandbox
+    shutdown_pdf_sandbox()
+
+
+def measure_cold_starts(runs):
+    results = {name: [] for name in HANDLERS}
+    for _ in range(runs):
+        # Interleaved so drift on the machine affects both handlers alike
+        for name in HANDLERS:
+            start = time.perf_counter()
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', name],
+                                    capture_output=True, text=True, check=True).stdout
+            timings = json.loads(output.strip().splitlines()[-1])
+            timings['process_ms'] = (time.perf_counter() - start) * 1000
+            results[name].append(timings)
+    return results
+
+
+def build_warm_events(signer, user_id):
+    from load_test import build_interaction
+
+    events = {}
+    for name in WARM_REQUESTS:
+        command_name = 'ping' if name == 'bad_signature' else name
+        body = json.dumps(build_interaction(command_name, user_id)).encode('utf-8')
+        events[name] = (body, name != 'bad_signature')
+    return {name: (lambda body=body, valid=valid: function_url_event(body, signer.headers(body, valid)))
+            for name, (body, valid) in events.items()}
+
+
+def measure_warm_requests(requests_per_type):
+    import load_test
+
+    signer = load_test.InteractionSigner()
+    load_test.configure_environment(signer.public_key, workers=1)
+    # Adapter overhead is what's being compared, so the fakes answer instantly
+    for service in load_test.LATENCY_MS:
+        load_test.LATENCY_MS[service] = 0
+
+    handlers = {name: importlib.import_module(name).handler for name in HANDLERS}
+    # Mangum logs a traceback for the lifespan probe on every main.handler call
+    logging.disable(logging.ERROR)
+    from aws.s3 import s3_manager
+    from aws.dynamo import dynamo_manager
+    s3_manager.s3_client = load_test.FakeS3Client()
+    dynamo_manager.dynamodb = load_test.FakeDynamoDBClient()
+
+    events = build_warm_events(signer, 'warm-user')
+    expected_status = {name: 401 if name == 'bad_signature' else 200 for name in WARM_REQUESTS}
+    samples = {name: {request: [] for request in WARM_REQUESTS} for name in HANDLERS}
+    errors = {name: 0 for name in HANDLERS}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(requests_per_type):
+            for request_name in WARM_REQUESTS:
+                for name, handler in handlers.items():
+                    event = events[request_name]()
+                    start = time.perf_counter()
+                    response = handler(event, FakeLambdaContext())
+                    samples[name][request_name].append((time.perf_counter() - start) * 1000)
+                    if response.get('statusCode') != expected_status[request_name]:
+                        errors[name] += 1
+    return samples, errors
+
+
+def summarize(values):
+    from load_test import percentile
+
+    ordered = sorted(values)
+    return {
+        'p50_ms': round(percentile(ordered, 50), 3),
+        'p95_ms': round(percentile(ordered, 95), 3),
+        'p99_ms': round(percentile(ordered, 99), 3),
+        'mean_ms': round(sum(ordered) / len(ordered), 3)
+    }
+
+
+def shutdown_app():
+    from load_test import shutdown_app as shutdown_load_test_app
+    shutdown_load_test_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cold-runs', type=int, default=5, help='Fresh interpreters per handler')
+    parser.add_argument('--requests', type=int, default=200, help='Warm requests per request type and handler')
+    parser.add_argument('--skip-cold', action='store_true')
+    parser.add_argument('--skip-warm', action='store_true')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--child', choices=HANDLERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    report = {}
+    if not args.skip_cold:
+        cold = measure_cold_starts(args.cold_runs)
+        report['cold_start'] = {
+            name: {
+                metric: summarize([run[metric] for run in runs])
+                for metric in ('import_ms', 'first_request_ms', 'second_request_ms', 'process_ms')
+            } | {'modules': runs[-1]['modules'], 'flask_imported': runs[-1]['flask_imported'],
+                 'errors': sum(1 for run in runs if 'error' in run)}
+            for name, runs in cold.items()
+        }
+
+    if not args.skip_warm:
+        samples, errors = measure_warm_requests(args.requests)
+        report['warm'] = {
+            name: {request_name: summarize(values) for request_name, values in requests.items()} | {'errors': errors[name]}
+            for name, requests in samples.items()
+        }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        shutdown_app()
+        return
+
+    if 'cold_start' in report:
+        print(f"Cold start, {args.cold_runs} fresh interpreters each (p50 / p95 ms)")
+        print(f"{'handler':<16} {'import':>17} {'first request':>17} {'second request':>17} {'process':>17}  modules  flask")
+        for name, result in report['cold_start'].items():
+            cells = ' '.join(f"{result[metric]['p50_ms']:>8.1f}/{result[metric]['p95_ms']:<8.1f}"
+                             for metric in ('import_ms', 'first_request_ms', 'second_request_ms', 'process_ms'))
+            print(f"{name:<16} {cells}  {result['modules']:>7}  {'yes' if result['flask_imported'] else 'no':>5}")
+
+    if 'warm' in report:
+        print(f"\nWarm requests, {args.requests} of each type per handler (p50 / p95 / p99 ms)")
+        print(f"{'request':<20} " + ' '.join(f"{name:>26}" for name in HANDLERS))
+        for request_name in WARM_REQUESTS:
+            cells = ' '.join(
+                f"{report['warm'][name][request_name]['p50_ms']:>8.2f}/{report['warm'][name][request_name]['p95_ms']:>8.2f}/"
+                f"{report['warm'][name][request_name]['p99_ms']:<8.2f}" for name in HANDLERS)
+            print(f"{request_name:<20} {cells}")
+        print(f"{'errors':<20} " + ' '.join(f"{report['warm'][name]['errors']:>26}" for name in HANDLERS))
+
+    shutdown_app()
+
+
+if __name__ == '__main__':
+    main()
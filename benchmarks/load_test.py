@@ -0,0 +1,651 @@
+"""
+End-to-end load test for the interaction endpoint and the command processor.
+
+Usage (from the repo root):
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --users 16 --iterations 5 --workers 4
+    python benchmarks/load_test.py --latency openai=4000 --latency s3=120 --json
+
+Each virtual user walks through every command (ping, upload, get_latest_resume,
+update, get_all_resumes, get_resume_diff, ai_review, get_annotations,
+clear_resumes). Interactions are signed with a throwaway Ed25519 key over
+timestamp + body, just as Discord signs them, and POSTed to main.app through
+the Flask test client, so signature verification, routing and the inline
+handlers all run as in production. Deferred commands go through the in-process
+SQS emulator (helpers/queue_emulator.py), which calls command_processor.handler
+with SQS-shaped events on --workers pollers.
+
+S3 and DynamoDB are in-memory clients swapped into the aws/ managers. OpenAI is
+a fake client that quotes the resume back as feedback. HTTP calls to the
+Discord CDN, the Discord webhook, S3 object URLs and Hypothes.is are answered
+by a fake requests transport. Nothing leaves the machine. Every fake sleeps for
+its configured latency and raises a timeout when that latency exceeds the
+caller's timeout.
+
+For each command the report gives p50/p95/p99 of the interaction response
+against the 3 second budget Discord allows. Deferred commands also get the
+time until their follow-up reached the webhook.
+"""
+import io
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import logging
+import argparse
+import tempfile
+import threading
+import contextlib
+from types import SimpleNamespace
+from urllib.parse import urlsplit, parse_qs
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARK_DIR), 'src'))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import nacl.signing
+import requests
+from requests.adapters import BaseAdapter
+
+from pdf_corpus import make_resume_pages, build_pdf
+from hot_paths import edit_pages
+
+# Discord drops interactions that aren't answered within 3 seconds
+DISCORD_DEADLINE_MS = 3000
+
+APPLICATION_ID = 'load-test-application'
+BUCKET_NAME = 'load-test-bucket'
+BUCKET_REGION = 'us-east-1'
+
+# Simulated service time of each fake dependency, in ms
+DEFAULT_LATENCY_MS = {
+    'discord_cdn': 40,
+    'discord_webhook': 60,
+    's3': 30,
+    'dynamodb': 8,
+    'hypothesis': 80,
+    'openai': 1500,
+}
+LATENCY_MS = dict(DEFAULT_LATENCY_MS)
+
+# Contact and summary lines so every fixture passes validate_resume_content and has an Experience section
+RESUME_HEADER = [
+    "Jordan Lee",
+    "Email: jordan.lee@example.com | Phone: (555) 010-0100",
+    "Summary",
+    "Backend engineer focused on reliable, observable services",
+    "Experience",
+    "Senior Engineer, Company 42 (2021)",
+    "- Led the migration of billing services to aws lambda, reducing p99 latency by 40 percent for customers",
+    "- Built dashboards and on-call runbooks that cut incident resolution time from hours to minutes",
+]
+
+SCENARIO = [
+    'ping', 'upload', 'get_latest_resume', 'update', 'get_all_resumes',
+    'get_resume_diff', 'ai_review', 'get_annotations', 'clear_resumes'
+]
+
+
+def simulate_latency(service, timeout=None):
+    delay = LATENCY_MS.get(service, 0) / 1000
+    if isinstance(timeout, tuple):
+        timeout = timeout[-1]
+    if timeout is not None and delay > timeout:
+        time.sleep(timeout)
+        raise requests.Timeout(f"{service} did not answer within {timeout:.2f}s")
+    time.sleep(delay)
+
+
+class FakeS3Client:
+    """In-memory stand-in for the boto3 S3 client calls aws/s3.py makes"""
+
+    def __init__(self):
+        self.objects = {}
+        self.lock = threading.Lock()
+
+    def put_object(self, Bucket, Key, Body, ContentType=None):
+        simulate_latency('s3')
+        with self.lock:
+            self.objects[Key] = Body
+        return {'ETag': uuid.uuid4().hex}
+
+    def get_object_bytes(self, key):
+        with self.lock:
+            return self.objects.get(key)
+
+    def delete_object(self, Bucket, Key):
+        simulate_latency('s3')
+        with self.lock:
+            self.objects.pop(Key, None)
+        return {}
+
+    def list_objects_v2(self, Bucket, Prefix=''):
+        simulate_latency('s3')
+        with self.lock:
+            keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        return {'Contents': [{'Key': key} for key in keys]} if keys else {}
+
+    def delete_objects(self, Bucket, Delete):
+        simulate_latency('s3')
+        deleted = []
+        with self.lock:
+            for obj in Delete['Objects']:
+                self.objects.pop(obj['Key'], None)
+                deleted.append({'Key': obj['Key']})
+        return {'Deleted': deleted}
+
+
+class FakeDynamoDBClient:
+    """In-memory stand-in for the boto3 DynamoDB client calls aws/dynamo.py makes, keyed on user_id + resume_version"""
+
+    def __init__(self):
+        self.items = {}
+        self.lock = threading.Lock()
+
+    def put_item(self, TableName, Item):
+        simulate_latency('dynamodb')
+        with self.lock:
+            self.items[(Item['user_id']['S'], Item['resume_version']['S'])] = dict(Item)
+        return {}
+
+    def get_item(self, TableName, Key):
+        simulate_latency('dynamodb')
+        with self.lock:
+            item = self.items.get((Key['user_id']['S'], Key['resume_version']['S']))
+        return {'Item': dict(item)} if item else {}
+
+    def delete_item(self, TableName, Key):
+        simulate_latency('dynamodb')
+        with self.lock:
+            self.items.pop((Key['user_id']['S'], Key['resume_version']['S']), None)
+        return {}
+
+    def query(self, TableName, KeyConditionExpression, ExpressionAttributeValues, ScanIndexForward=True,
+              Limit=None, ProjectionExpression=None):
+        simulate_latency('dynamodb')
+        partition = ExpressionAttributeValues[':user_id']['S']
+        with self.lock:
+            # Sort keys compare as strings, like the real table
+            matches = sorted((sort_key, item) for (user_id, sort_key), item in self.items.items() if user_id == partition)
+        items = [dict(item) for _, item in matches]
+        if not ScanIndexForward:
+            items.reverse()
+        if Limit:
+            items = items[:Limit]
+        if ProjectionExpression:
+            names = [name.strip() for name in ProjectionExpression.split(',')]
+            items = [{name: item[name] for name in names if name in item} for item in items]
+        return {'Items': items, 'Count': len(items)}
+
+
+class FakeOpenAIClient:
+    """Exposes chat.completions.create and answers with feedback quoting bullet lines from the prompt's resume"""
+
+    def __init__(self, chunk_chars=40):
+        self.chunk_chars = chunk_chars
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, stream=False, **request):
+        content = self.build_content(request['messages'][-1]['content'])
+        if not stream:
+            simulate_latency('openai')
+            message = SimpleNamespace(content=content)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        return self.stream(content)
+
+    def stream(self, content):
+        pieces = [content[i:i + self.chunk_chars] for i in range(0, len(content), self.chunk_chars)]
+        delay = LATENCY_MS.get('openai', 0) / 1000 / max(1, len(pieces))
+        for piece in pieces:
+            time.sleep(delay)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+    def build_content(self, prompt):
+        resume = prompt
+        if 'Resume Content:' in prompt:
+            resume = prompt.split('Resume Content:', 1)[1].split('Please respond with', 1)[0]
+        lines = [line.strip().lstrip('- ') for line in resume.split('\n') if len(line.strip()) > 40]
+        feedback = []
+        for line in lines[:8]:
+            words = line.split()
+            feedback.append({
+                'selected_text': ' '.join(words[:10]),
+                'comment': "Lead with the measurable result, then describe how you achieved it."
+            })
+        return json.dumps({'feedback': feedback})
+
+
+def make_response(request, status_code, body=b'', content_type='application/json'):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode('utf-8') if isinstance(body, (dict, list)) else body
+    response.headers['Content-Type'] = content_type
+    response.url = request.url
+    response.request = request
+    response.encoding = 'utf-8'
+    return response
+
+
+class FakeTransport(BaseAdapter):
+    """
+    Answers every requests call in the process: Discord CDN attachments, Discord webhooks,
+    S3 object URLs and the Hypothes.is API. Anything else fails as a connection error.
+    """
+
+    def __init__(self, s3_client):
+        super().__init__()
+        self.s3_client = s3_client
+        self.attachments = {}
+        self.annotations = {}
+        self.followups = {}
+        self.condition = threading.Condition()
+
+    def send(self, request, timeout=None, **kwargs):
+        url = urlsplit(request.url)
+        if url.hostname == 'cdn.discordapp.com':
+            simulate_latency('discord_cdn', timeout)
+            body = self.attachments.get(url.path)
+            return make_response(request, 200, body, 'application/pdf') if body else make_response(request, 404)
+        if url.hostname == f"{BUCKET_NAME}.s3.{BUCKET_REGION}.amazonaws.com":
+            simulate_latency('s3', timeout)
+            body = self.s3_client.get_object_bytes(url.path.lstrip('/'))
+            return make_response(request, 200, body, 'application/pdf') if body else make_response(request, 403)
+        if url.hostname == 'discord.com':
+            simulate_latency('discord_webhook', timeout)
+            return self.handle_webhook(request, url)
+        if url.hostname == 'api.hypothes.is':
+            simulate_latency('hypothesis', timeout)
+            return self.handle_hypothesis(request, url)
+        raise requests.ConnectionError(f"Load test has no fake for {url.hostname}")
+
+    def close(self):
+        pass
+
+    def add_attachment(self, name, body):
+        path = f"/attachments/{uuid.uuid4().int % 10 ** 18}/{name}"
+        self.attachments[path] = body
+        return f"https://cdn.discordapp.com{path}"
+
+    def handle_webhook(self, request, url):
+        token = url.path.split('/')[5]
+        if request.method == 'POST':
+            with self.condition:
+                self.followups[token] = (time.monotonic(), json.loads(request.body))
+                self.condition.notify_all()
+        return make_response(request, 200, {'id': uuid.uuid4().hex})
+
+    def wait_for_followup(self, token, timeout):
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while token not in self.followups:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+            return self.followups.pop(token)
+
+    def handle_hypothesis(self, request, url):
+        if request.method == 'POST' and url.path == '/api/annotations':
+            annotation = json.loads(request.body)
+            annotation['id'] = uuid.uuid4().hex[:22]
+            annotation['user'] = 'acct:resuralph@hypothes.is'
+            with self.condition:
+                self.annotations.setdefault(strip_via(annotation.get('uri', '')), []).append(annotation)
+            return make_response(request, 200, annotation)
+        if request.method == 'GET' and url.path == '/api/search':
+            uri = strip_via(parse_qs(url.query).get('uri', [''])[0])
+            with self.condition:
+                rows = list(self.annotations.get(uri, []))
+            return make_response(request, 200, {'total': len(rows), 'rows': rows})
+        return make_response(request, 404, {'status': 'failure'})
+
+
+def strip_via(url):
+    return url.replace("https://via.hypothes.is/", "")
+
+
+class InteractionSigner:
+    """Signs interactions with a throwaway key the app is configured to trust"""
+
+    def __init__(self):
+        self.signing_key = nacl.signing.SigningKey.generate()
+        self.public_key = self.signing_key.verify_key.encode().hex()
+
+    def headers(self, body, valid=True):
+        timestamp = str(int(time.time()))
+        signature = self.signing_key.sign(timestamp.encode() + body).signature.hex()
+        if not valid:
+            signature = ('0' if signature[0] != '0' else '1') + signature[1:]
+        return {
+            'Content-Type': 'application/json',
+            'X-Signature-Ed25519': signature,
+            'X-Signature-Timestamp': timestamp
+        }
+
+
+def build_interaction(command_name, user_id, options=None, attachments=None):
+    interaction = {
+        'id': str(uuid.uuid4().int % 10 ** 18),
+        'application_id': APPLICATION_ID,
+        'token': uuid.uuid4().hex,
+        'type': 1 if command_name == 'ping' else 2,
+        'version': 1,
+        'guild_id': 'load-test-guild',
+        'channel_id': 'load-test-channel',
+        'member': {'user': {'id': user_id, 'username': f"user-{user_id}"}}
+    }
+    if command_name == 'ping':
+        return interaction
+
+    data = {'id': str(uuid.uuid4().int % 10 ** 18), 'name': command_name, 'type': 1}
+    if options:
+        data['options'] = options
+    if attachments:
+        data['resolved'] = {'attachments': attachments}
+    interaction['data'] = data
+    return interaction
+
+
+def attachment_interaction(command_name, user_id, url, pdf, extra_options=()):
+    attachment_id = str(uuid.uuid4().int % 10 ** 18)
+    attachment = {
+        'id': attachment_id,
+        'filename': 'resume.pdf',
+        'content_type': 'application/pdf',
+        'size': len(pdf),
+        'url': url,
+        'proxy_url': url,
+        'ephemeral': True
+    }
+    options = [{'name': 'file', 'type': 11, 'value': attachment_id}] + list(extra_options)
+    return build_interaction(command_name, user_id, options, {attachment_id: attachment})
+
+
+def is_error_payload(payload):
+    embeds = payload.get('embeds', []) if isinstance(payload, dict) else []
+    return any(embed.get('title', '').startswith('❌') for embed in embeds)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class LoadTest:
+
+    def __init__(self, app, transport, fixtures, signer, followup_timeout):
+        self.app = app
+        self.transport = transport
+        self.fixtures = fixtures
+        self.signer = signer
+        self.followup_timeout = followup_timeout
+        self.samples = []
+        self.lock = threading.Lock()
+
+    def send(self, client, command_name, interaction):
+        body = json.dumps(interaction).encode('utf-8')
+        headers = self.signer.headers(body)
+
+        start = time.monotonic()
+        response = client.post('/', data=body, headers=headers)
+        response_ms = (time.monotonic() - start) * 1000
+
+        payload = response.get_json(silent=True) or {}
+        sample = {
+            'command': command_name,
+            'response_ms': response_ms,
+            'deferred': payload.get('type') == 5,
+            'error': response.status_code != 200 or is_error_payload(payload.get('data'))
+        }
+
+        if sample['deferred']:
+            followup = self.transport.wait_for_followup(interaction['token'], self.followup_timeout)
+            if followup is None:
+                sample['error'] = True
+                sample['followup_ms'] = None
+            else:
+                sample['followup_ms'] = (followup[0] - start) * 1000
+                sample['error'] = is_error_payload(followup[1])
+
+        with self.lock:
+            self.samples.append(sample)
+        return sample
+
+    def latest_urls(self, user_id):
+        from aws.dynamo import get_all_user_resumes
+        resumes = get_all_user_resumes(user_id)
+        resumes.sort(key=lambda resume: int(resume['resume_version'][1:]))
+        return [resume['resume_url'] for resume in resumes]
+
+    def run_user(self, user_index, iterations):
+        client = self.app.test_client()
+        for iteration in range(iterations):
+            # A fresh user per iteration so the daily AI review limit never applies
+            user_id = f"{user_index:04d}{iteration:04d}"
+            fixture = self.fixtures[(user_index + iteration) % len(self.fixtures)]
+            for command_name in SCENARIO:
+                self.run_step(client, command_name, user_id, fixture)
+
+    def run_step(self, client, command_name, user_id, fixture):
+        if command_name == 'upload':
+            interaction = attachment_interaction('upload', user_id, fixture['v1_url'], fixture['v1'])
+        elif command_name == 'update':
+            show_diff = {'name': 'show_diff', 'type': 5, 'value': True}
+            interaction = attachment_interaction('update', user_id, fixture['v2_url'], fixture['v2'], [show_diff])
+        elif command_name in ('get_resume_diff', 'ai_review', 'get_annotations'):
+            urls = self.latest_urls(user_id)
+            if len(urls) < 2:
+                # The upload or update failed; the sample for it already counts as an error
+                return
+            if command_name == 'get_resume_diff':
+                options = [
+                    {'name': 'old_resume_url', 'type': 3, 'value': f"https://via.hypothes.is/{urls[0]}"},
+                    {'name': 'new_resume_url', 'type': 3, 'value': f"https://via.hypothes.is/{urls[1]}"}
+                ]
+            else:
+                options = [{'name': 'pdf_url', 'type': 3, 'value': f"https://via.hypothes.is/{urls[-1]}"}]
+            interaction = build_interaction(command_name, user_id, options)
+        else:
+            interaction = build_interaction(command_name, user_id)
+        self.send(client, command_name, interaction)
+
+    def check_signature_rejected(self):
+        body = json.dumps(build_interaction('ping', 'signature-check')).encode('utf-8')
+        response = self.app.test_client().post('/', data=body, headers=self.signer.headers(body, valid=False))
+        return response.status_code == 401
+
+    def run(self, users, iterations):
+        threads = [threading.Thread(target=self.run_user, args=(index, iterations), name=f"load-user-{index}")
+                   for index in range(users)]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - start
+
+
+def summarize(samples, budget_ms):
+    results = {}
+    for command_name in SCENARIO:
+        command_samples = [sample for sample in samples if sample['command'] == command_name]
+        if not command_samples:
+            continue
+        timings = sorted(sample['response_ms'] for sample in command_samples)
+        p99 = percentile(timings, 99)
+        result = {
+            'count': len(command_samples),
+            'errors': sum(1 for sample in command_samples if sample['error']),
+            'deferred': sum(1 for sample in command_samples if sample['deferred']),
+            'p50_ms': round(percentile(timings, 50), 1),
+            'p95_ms': round(percentile(timings, 95), 1),
+            'p99_ms': round(p99, 1),
+            'max_ms': round(timings[-1], 1),
+            'over_budget': sum(1 for timing in timings if timing > budget_ms),
+            'headroom_ms': round(budget_ms - p99, 1)
+        }
+
+        followups = sorted(sample['followup_ms'] for sample in command_samples if sample.get('followup_ms') is not None)
+        if followups:
+            result['followup_p50_ms'] = round(percentile(followups, 50), 1)
+            result['followup_p95_ms'] = round(percentile(followups, 95), 1)
+            result['followup_p99_ms'] = round(percentile(followups, 99), 1)
+        results[command_name] = result
+    return results
+
+
+def print_report(results, elapsed, total, budget_ms, signature_rejected, queue_stats):
+    print(f"{total} interactions in {elapsed:.1f}s ({total / elapsed:.1f}/s), budget {budget_ms:.0f}ms, "
+          f"bad signature {'rejected' if signature_rejected else 'ACCEPTED'}")
+    print(f"{'command':<18} {'count':>6} {'errors':>6} {'defer':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'over':>5} {'headroom':>9}")
+    for command_name, result in results.items():
+        print(f"{command_name:<18} {result['count']:>6} {result['errors']:>6} {result['deferred']:>6} "
+              f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['max_ms']:>8.1f} "
+              f"{result['over_budget']:>5} {result['headroom_ms']:>9.1f}")
+
+    deferred = {name: result for name, result in results.items() if 'followup_p50_ms' in result}
+    if deferred:
+        print("\nDeferred commands, request to follow-up:")
+        print(f"{'command':<18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for command_name, result in deferred.items():
+            print(f"{command_name:<18} {result['followup_p50_ms']:>9.1f} {result['followup_p95_ms']:>9.1f} "
+                  f"{result['followup_p99_ms']:>9.1f}")
+
+    print(f"\nQueue emulator: {queue_stats['invocations']} invocations, {queue_stats['invocation_errors']} errors, "
+          f"{queue_stats['dead_letters']} dead letters, avg {queue_stats['avg_invocation_time'] * 1000:.0f}ms")
+
+
+def parse_latency(values):
+    latency = dict(DEFAULT_LATENCY_MS)
+    for value in values or []:
+        name, _, ms = value.partition('=')
+        if name not in latency or not ms:
+            raise argparse.ArgumentTypeError(f"Expected NAME=MS with NAME one of {', '.join(latency)}, got {value}")
+        latency[name] = float(ms)
+    return latency
+
+
+def configure_environment(public_key, workers):
+    # Must run before main is imported: the public key and queue backend are read at import time
+    os.environ['ENVIRONMENT'] = 'DEV'
+    os.environ['DEV_DISCORD_PUBLIC_KEY'] = public_key
+    os.environ['DISCORD_PUBLIC_KEY'] = public_key
+    os.environ['COMMAND_QUEUE_BACKEND'] = 'emulator'
+    os.environ['QUEUE_EMULATOR_CONCURRENCY'] = str(workers)
+    os.environ['BUCKET_REGION'] = BUCKET_REGION
+    os.environ['S3_BUCKET_NAME'] = BUCKET_NAME
+    os.environ['DYNAMODB_TABLE_NAME'] = 'load-test-table'
+    os.environ['OPENAI_API_KEY'] = 'load-test'
+    os.environ['HYPOTHESIS_API_KEY'] = 'load-test'
+    os.environ.pop('MY_USER_ID', None)
+    # A private cache directory so runs don't warm each other
+    os.environ['DISK_CACHE_DIR'] = tempfile.mkdtemp(prefix='resuralph-load-test-')
+
+
+def build_fixtures(transport, count, max_pages, seed):
+    fixtures = []
+    for index in range(count):
+        pages = make_resume_pages(seed + index, 1 + index % max_pages)
+        pages[0] = RESUME_HEADER + pages[0][:-len(RESUME_HEADER)]
+        v1 = build_pdf(pages)
+        v2 = build_pdf(edit_pages(pages, seed + index))
+        fixtures.append({
+            'v1': v1,
+            'v2': v2,
+            'v1_url': transport.add_attachment(f"resume-{index}-v1.pdf", v1),
+            'v2_url': transport.add_attachment(f"resume-{index}-v2.pdf", v2)
+        })
+    return fixtures
+
+
+def shutdown_app():
+    """Stops the emulator pollers, local workers and sandbox processes so the interpreter exits normally"""
+    from helpers.queue_emulator import stop_queue_emulator
+    from helpers.local_job_executor import stop_local_job_executor
+    from helpers.pdf_sandbox import shutdown_pdf_sandbox
+    from helpers.profiler import profiler
+
+    stop_queue_emulator()
+    stop_local_job_executor()
+    shutdown_pdf_sandbox()
+    # Slow interactions' profiles are written by a daemon thread that would otherwise die mid-queue
+    profiler.wait_for_writes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=8, help='Concurrent virtual users')
+    parser.add_argument('--iterations', type=int, default=3, help='Scenarios each user runs')
+    parser.add_argument('--workers', type=int, default=4, help='Queue emulator pollers running command_processor.handler')
+    parser.add_argument('--latency', action='append', metavar='NAME=MS',
+                        help=f"Override a fake dependency's latency ({', '.join(DEFAULT_LATENCY_MS)})")
+    parser.add_argument('--budget-ms', type=float, default=DISCORD_DEADLINE_MS)
+    parser.add_argument('--followup-timeout', type=float, default=120, help='Seconds to wait for a follow-up')
+    parser.add_argument('--fixtures', type=int, default=6, help='Distinct resume PDFs')
+    parser.add_argument('--max-pages', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--verbose', action='store_true', help='Keep application logging')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    try:
+        LATENCY_MS.update(parse_latency(args.latency))
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    signer = InteractionSigner()
+    configure_environment(signer.public_key, args.workers)
+
+    import main as app_module
+    from aws.s3 import s3_manager
+    from aws.dynamo import dynamo_manager
+    from helpers.ai_resume_analyzer import resume_analyzer
+    from helpers.queue_emulator import get_queue_emulator
+
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    s3_client = FakeS3Client()
+    transport = FakeTransport(s3_client)
+    s3_manager.s3_client = s3_client
+    dynamo_manager.dynamodb = FakeDynamoDBClient()
+    resume_analyzer.client = FakeOpenAIClient()
+    # Every requests call in the process, including module-level requests.get/post, goes through the fake
+    requests.Session.get_adapter = lambda session, url: transport
+
+    fixtures = build_fixtures(transport, args.fixtures, args.max_pages, args.seed)
+    load_test = LoadTest(app_module.app, transport, fixtures, signer, args.followup_timeout)
+
+    # The aws/ managers and validate_pdf print progress; keep it out of the report
+    output = sys.stdout if args.verbose else io.StringIO()
+    with contextlib.redirect_stdout(output):
+        signature_rejected = load_test.check_signature_rejected()
+        elapsed = load_test.run(args.users, args.iterations)
+        get_queue_emulator().wait_until_drained(timeout=args.followup_timeout)
+
+    results = summarize(load_test.samples, args.budget_ms)
+    queue_stats = get_queue_emulator().get_stats()
+
+    if args.json:
+        print(json.dumps({
+            'elapsed_seconds': round(elapsed, 2),
+            'interactions': len(load_test.samples),
+            'budget_ms': args.budget_ms,
+            'signature_rejected': signature_rejected,
+            'latency_ms': LATENCY_MS,
+            'commands': results,
+            'queue_emulator': queue_stats
+        }, indent=2))
+    else:
+        print_report(results, elapsed, len(load_test.samples), args.budget_ms, signature_rejected, queue_stats)
+
+    shutdown_app()
+
+
+if __name__ == '__main__':
+    main()
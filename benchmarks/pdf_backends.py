@@ -0,0 +1,103 @@
+"""
+Benchmark for the PDF text extraction backends.
+
+Usage (from the repo root):
+    python benchmarks/pdf_backends.py
+    python benchmarks/pdf_backends.py --documents 50 --max-pages 6 --runs 3
+
+Runs every installed backend over a corpus of synthetic resume PDFs and reports
+throughput (pages/s), peak Python heap allocation per document (tracemalloc;
+native allocations in pypdfium2 are not counted) and fidelity: the share of
+ground-truth words recovered in order. Backends run in-process, without the
+parsing sandbox, so only the library itself is measured.
+"""
+import os
+import sys
+import time
+import json
+import difflib
+import argparse
+import statistics
+import tracemalloc
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARK_DIR), 'src'))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from pdf_corpus import make_corpus
+from helpers.pdf_backends import BACKENDS, get_available_backends
+
+
+def word_fidelity(expected_text, actual_text):
+    expected = expected_text.split()
+    actual = actual_text.split()
+    if not expected:
+        return 1.0
+    matcher = difflib.SequenceMatcher(None, expected, actual, autojunk=False)
+    return sum(block.size for block in matcher.get_matching_blocks()) / len(expected)
+
+
+def benchmark_backend(backend, corpus, runs):
+    elapsed = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for document in corpus:
+            backend.extract_text(document['pdf'])
+        elapsed.append(time.perf_counter() - start)
+
+    peaks = []
+    fidelities = []
+    for document in corpus:
+        tracemalloc.start()
+        text = backend.extract_text(document['pdf'])
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        expected = '\n'.join('\n'.join(lines) for lines in document['pages'])
+        fidelities.append(word_fidelity(expected, text))
+
+    total_pages = sum(len(document['pages']) for document in corpus)
+    best = min(elapsed)
+    return {
+        'pages_per_second': round(total_pages / best, 1),
+        'ms_per_document': round(best / len(corpus) * 1000, 2),
+        'peak_heap_kb': round(statistics.median(peaks) / 1024, 1),
+        'fidelity': round(statistics.mean(fidelities), 4)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documents', type=int, default=20)
+    parser.add_argument('--min-pages', type=int, default=1)
+    parser.add_argument('--max-pages', type=int, default=4)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--backends', nargs='*', help='Backends to run (default: all installed)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.documents, args.min_pages, args.max_pages, args.seed)
+    available = get_available_backends()
+    names = args.backends or available
+
+    results = {}
+    for name in names:
+        if name not in available:
+            print(f"Skipping {name}: not installed", file=sys.stderr)
+            continue
+        results[name] = benchmark_backend(BACKENDS[name], corpus, args.runs)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    pages = sum(len(document['pages']) for document in corpus)
+    print(f"{len(corpus)} documents, {pages} pages")
+    print(f"{'backend':<10} {'pages/s':>9} {'ms/doc':>8} {'peak KB':>9} {'fidelity':>9}")
+    for name, result in results.items():
+        print(f"{name:<10} {result['pages_per_second']:>9.1f} {result['ms_per_document']:>8.2f} "
+              f"{result['peak_heap_kb']:>9.1f} {result['fidelity']:>9.4f}")
+
+
+if __name__ == '__main__':
+    main()
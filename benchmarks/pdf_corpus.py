@@ -0,0 +1,91 @@
+"""
+Synthetic resume PDFs for the benchmarks.
+
+Writes minimal, valid PDFs by hand (standard Helvetica, one content stream per
+page) so the benchmarks need no PDF authoring library. Every document comes
+with the text drawn on each page, which serves as ground truth for extraction
+fidelity.
+"""
+import random
+import textwrap
+
+WORDS = (
+    "built designed led shipped migrated scaled reduced improved automated python aws lambda dynamodb "
+    "react typescript kubernetes terraform pipelines latency throughput customers revenue dashboards "
+    "services api graphql postgres redis kafka team mentored interns on-call reliability observability"
+).split()
+
+SECTION_TITLES = ["Experience", "Projects", "Education", "Skills", "Leadership", "Awards"]
+
+LINES_PER_PAGE = 52
+LINE_HEIGHT = 14
+
+
+def escape_pdf_text(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_page_lines(rng, count):
+    lines = []
+    while len(lines) < count:
+        lines.append(rng.choice(SECTION_TITLES))
+        lines.append(f"{rng.choice(WORDS).title()} Engineer, Company {rng.randint(1, 999)} ({rng.randint(2015, 2025)})")
+        for _ in range(rng.randint(2, 5)):
+            bullet = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(10, 24)))
+            lines.extend(textwrap.wrap(f"- {bullet}", width=88))
+    return lines[:count]
+
+
+def make_resume_pages(seed, pages):
+    rng = random.Random(seed)
+    return [make_page_lines(rng, LINES_PER_PAGE) for _ in range(pages)]
+
+
+def build_pdf(pages):
+    """PDF bytes with one page per list of lines"""
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    pages_id = add(b"")
+    page_ids = []
+
+    for lines in pages:
+        operators = [f"BT /F1 10 Tf {LINE_HEIGHT} TL 50 770 Td"]
+        operators += [f"({escape_pdf_text(line)}) '" for line in lines]
+        operators.append("ET")
+        stream = '\n'.join(operators).encode('latin-1')
+        content_id = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (pages_id, content_id, font_id)
+        ))
+
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref_offset)
+    return output
+
+
+def make_corpus(documents=20, min_pages=1, max_pages=4, seed=42):
+    """List of {'name', 'pdf', 'pages'} where pages holds the ground-truth lines of each page"""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(documents):
+        pages = make_resume_pages(rng.random(), rng.randint(min_pages, max_pages))
+        corpus.append({'name': f"resume-{index:03d}", 'pdf': build_pdf(pages), 'pages': pages})
+    return corpus
@@ -2,6 +2,7 @@ import os
 import boto3
 from datetime import datetime
 from botocore.exceptions import ClientError
+from helpers.tracing import traced
 
 
 class DynamoManager:
@@ -12,7 +13,7 @@ class DynamoManager:
         )
         self.table_name = os.getenv('DYNAMODB_TABLE_NAME')
 
-    def save_db_resume(self, pdf_url, pdf_name, user_id, version):
+    def save_db_resume(self, pdf_url, pdf_name, user_id, version, content_hash=None, page_fingerprints=None):
         
         try:
             item = {
@@ -23,6 +24,14 @@ class DynamoManager:
                 'created_at': {'S': datetime.now().isoformat()}
             }
             
+            # sha256 of the PDF bytes, used to look up cached diffs between versions
+            if content_hash:
+                item['content_hash'] = {'S': content_hash}
+            
+            # Comma-separated per-page content fingerprints, used to diff only the pages that changed
+            if page_fingerprints:
+                item['page_fingerprints'] = {'S': page_fingerprints}
+            
             self.dynamodb.put_item(
                 TableName=self.table_name,
                 Item=item
@@ -73,7 +82,7 @@ class DynamoManager:
             print(f"Unexpected error in DynamoDB query: {e}")
             return []
 
-    def update_db_resume(self, user_id, pdf_url, pdf_name):
+    def update_db_resume(self, user_id, pdf_url, pdf_name, content_hash=None, page_fingerprints=None):
         
         try:
             # Get latest version
@@ -89,7 +98,7 @@ class DynamoManager:
                 new_version = f"v{version_num + 1}"
             
             # Save new record
-            success = self.save_db_resume(pdf_url, pdf_name, user_id, new_version)
+            success = self.save_db_resume(pdf_url, pdf_name, user_id, new_version, content_hash, page_fingerprints)
             
             return new_version if success else None
             
@@ -134,6 +143,10 @@ class DynamoManager:
     def clear_all_user_resumes(self, user_id):
         
         try:
+            # Stored AI review results contain resume text, so they are removed too
+            if not self.clear_ai_review_results(user_id):
+                return False
+            
             # First get all resumes for the user
             all_resumes = self.get_all_user_resumes(user_id)
             
@@ -227,34 +240,285 @@ class DynamoManager:
             print(f"Unexpected error saving AI review attempt: {e}")
             return False
 
+    def save_ai_review_result(self, user_id, resume_url, resume_text, feedback_json):
+        
+        try:
+            # Stored per user so the next review can build on it incrementally
+            ai_review_result_key = f"{user_id}#ai_review_result"
+            current_time = datetime.now().isoformat()
+            
+            item = {
+                'user_id': {'S': ai_review_result_key},
+                'resume_version': {'S': f"ai_review_result_{current_time}"},
+                'created_at': {'S': current_time},
+                'resume_url': {'S': resume_url},
+                'resume_text': {'S': resume_text},
+                'feedback': {'S': feedback_json}
+            }
+            
+            self.dynamodb.put_item(
+                TableName=self.table_name,
+                Item=item
+            )
+            
+            return True
+            
+        except ClientError as e:
+            print(f"Error saving AI review result for user {user_id}: {e}")
+            return False
+        except Exception as e:
+            print(f"Unexpected error saving AI review result: {e}")
+            return False
+
+    def get_latest_ai_review_result(self, user_id):
+        
+        try:
+            ai_review_result_key = f"{user_id}#ai_review_result"
+            
+            response = self.dynamodb.query(
+                TableName=self.table_name,
+                KeyConditionExpression='user_id = :user_id',
+                ExpressionAttributeValues={
+                    ':user_id': {'S': ai_review_result_key}
+                },
+                ScanIndexForward=False,  # Get newest first
+                Limit=1
+            )
+            
+            items = response.get('Items', [])
+            if not items:
+                return None
+            
+            item = items[0]
+            converted_item = {}
+            for key, value in item.items():
+                if 'S' in value:
+                    converted_item[key] = value['S']
+                elif 'N' in value:
+                    converted_item[key] = value['N']
+            
+            return converted_item
+            
+        except ClientError as e:
+            print(f"Error querying last AI review result for user {user_id}: {e}")
+            return None
+        except Exception as e:
+            print(f"Unexpected error in get last AI review result: {e}")
+            return None
+
+    def clear_ai_review_results(self, user_id):
+        
+        try:
+            ai_review_result_key = f"{user_id}#ai_review_result"
+            
+            response = self.dynamodb.query(
+                TableName=self.table_name,
+                KeyConditionExpression='user_id = :user_id',
+                ExpressionAttributeValues={
+                    ':user_id': {'S': ai_review_result_key}
+                },
+                ProjectionExpression='resume_version'
+            )
+            
+            for item in response.get('Items', []):
+                self.dynamodb.delete_item(
+                    TableName=self.table_name,
+                    Key={
+                        'user_id': {'S': ai_review_result_key},
+                        'resume_version': item['resume_version']
+                    }
+                )
+            
+            return True
+            
+        except ClientError as e:
+            print(f"Error clearing AI review results for user {user_id}: {e}")
+            return False
+        except Exception as e:
+            print(f"Unexpected error clearing AI review results: {e}")
+            return False
+
+    def get_cached_ai_review(self, cache_key):
+        
+        try:
+            # Use a special key format for AI review result caching
+            response = self.dynamodb.get_item(
+                TableName=self.table_name,
+                Key={
+                    'user_id': {'S': f"ai_cache#{cache_key}"},
+                    'resume_version': {'S': 'result'}
+                }
+            )
+            
+            item = response.get('Item')
+            if not item:
+                return None
+            
+            converted_item = {}
+            for key, value in item.items():
+                if 'S' in value:
+                    converted_item[key] = value['S']
+                elif 'N' in value:
+                    converted_item[key] = value['N']
+            
+            return converted_item
+            
+        except ClientError as e:
+            print(f"Error reading cached AI review {cache_key}: {e}")
+            return None
+        except Exception as e:
+            print(f"Unexpected error reading cached AI review: {e}")
+            return None
+
+    def save_cached_ai_review(self, cache_key, result_json, expires_at):
+        
+        try:
+            item = {
+                'user_id': {'S': f"ai_cache#{cache_key}"},
+                'resume_version': {'S': 'result'},
+                'result': {'S': result_json},
+                'created_at': {'S': datetime.now().isoformat()},
+                'expires_at': {'N': str(int(expires_at))}  # epoch seconds, usable as the table TTL attribute
+            }
+            
+            self.dynamodb.put_item(
+                TableName=self.table_name,
+                Item=item
+            )
+            
+            return True
+            
+        except ClientError as e:
+            print(f"Error caching AI review {cache_key}: {e}")
+            return False
+        except Exception as e:
+            print(f"Unexpected error caching AI review: {e}")
+            return False
+
+
+    def get_cached_diff(self, old_hash, new_hash):
+        
+        try:
+            # Diffs are keyed by the content hashes of both PDFs, not by user
+            response = self.dynamodb.get_item(
+                TableName=self.table_name,
+                Key={
+                    'user_id': {'S': f"diff#{old_hash}"},
+                    'resume_version': {'S': new_hash}
+                }
+            )
+            
+            item = response.get('Item')
+            if not item:
+                return None
+            
+            converted_item = {}
+            for key, value in item.items():
+                if 'S' in value:
+                    converted_item[key] = value['S']
+                elif 'N' in value:
+                    converted_item[key] = value['N']
+            
+            return converted_item
+            
+        except ClientError as e:
+            print(f"Error reading cached diff {old_hash} -> {new_hash}: {e}")
+            return None
+        except Exception as e:
+            print(f"Unexpected error reading cached diff: {e}")
+            return None
+
+    def save_cached_diff(self, old_hash, new_hash, result_json, diff_version, expires_at):
+        
+        try:
+            item = {
+                'user_id': {'S': f"diff#{old_hash}"},
+                'resume_version': {'S': new_hash},
+                'result': {'S': result_json},
+                'diff_version': {'S': diff_version},
+                'created_at': {'S': datetime.now().isoformat()},
+                'expires_at': {'N': str(int(expires_at))}  # epoch seconds, usable as the table TTL attribute
+            }
+            
+            self.dynamodb.put_item(
+                TableName=self.table_name,
+                Item=item
+            )
+            
+            return True
+            
+        except ClientError as e:
+            print(f"Error caching diff {old_hash} -> {new_hash}: {e}")
+            return False
+        except Exception as e:
+            print(f"Unexpected error caching diff: {e}")
+            return False
+
 
 # Global instance
 dynamo_manager = DynamoManager()
 
-def save_db_resume(pdf_url, pdf_name, user_id, version):
+@traced()
+def save_db_resume(pdf_url, pdf_name, user_id, version, content_hash=None, page_fingerprints=None):
     """Convenience function for saving resume to DynamoDB"""
-    return dynamo_manager.save_db_resume(pdf_url, pdf_name, user_id, version)
+    return dynamo_manager.save_db_resume(pdf_url, pdf_name, user_id, version, content_hash, page_fingerprints)
 
+@traced()
 def get_latest_db_resume(user_id):
     """Convenience function for getting latest resume"""
     return dynamo_manager.get_latest_db_resume(user_id)
 
-def update_db_resume(user_id, pdf_url, pdf_name):
+@traced()
+def update_db_resume(user_id, pdf_url, pdf_name, content_hash=None, page_fingerprints=None):
     """Convenience function for updating resume version"""
-    return dynamo_manager.update_db_resume(user_id, pdf_url, pdf_name)
+    return dynamo_manager.update_db_resume(user_id, pdf_url, pdf_name, content_hash, page_fingerprints)
 
+@traced()
 def get_all_user_resumes(user_id):
     """Convenience function for getting all user resumes"""
     return dynamo_manager.get_all_user_resumes(user_id)
 
+@traced()
 def clear_all_user_resumes(user_id):
     """Convenience function for clearing all user resumes"""
     return dynamo_manager.clear_all_user_resumes(user_id)
 
+@traced()
 def get_last_ai_review(user_id):
     """Convenience function for getting last AI review timestamp"""
     return dynamo_manager.get_last_ai_review(user_id)
 
+@traced()
 def save_ai_review_attempt(user_id):
     """Convenience function for saving AI review attempt"""
-    return dynamo_manager.save_ai_review_attempt(user_id)
\ No newline at end of file
+    return dynamo_manager.save_ai_review_attempt(user_id)
+
+@traced()
+def save_ai_review_result(user_id, resume_url, resume_text, feedback_json):
+    """Convenience function for saving an AI review result"""
+    return dynamo_manager.save_ai_review_result(user_id, resume_url, resume_text, feedback_json)
+
+@traced()
+def get_latest_ai_review_result(user_id):
+    """Convenience function for getting the latest AI review result"""
+    return dynamo_manager.get_latest_ai_review_result(user_id)
+
+@traced()
+def get_cached_ai_review(cache_key):
+    """Convenience function for reading a cached AI review result"""
+    return dynamo_manager.get_cached_ai_review(cache_key)
+
+@traced()
+def save_cached_ai_review(cache_key, result_json, expires_at):
+    """Convenience function for caching an AI review result"""
+    return dynamo_manager.save_cached_ai_review(cache_key, result_json, expires_at)
+
+@traced()
+def get_cached_diff(old_hash, new_hash):
+    """Convenience function for reading a cached diff"""
+    return dynamo_manager.get_cached_diff(old_hash, new_hash)
+
+@traced()
+def save_cached_diff(old_hash, new_hash, result_json, diff_version, expires_at):
+    """Convenience function for caching a diff"""
+    return dynamo_manager.save_cached_diff(old_hash, new_hash, result_json, diff_version, expires_at)
\ No newline at end of file
@@ -2,6 +2,7 @@ import os
 import boto3
 from datetime import datetime
 from botocore.exceptions import ClientError
+from helpers.tracing import traced
 
 
 class S3Manager:
@@ -52,6 +53,71 @@ class S3Manager:
             print(f"Unexpected error in S3 upload: {e}")
             return None
 
+    def save_s3_diff_artifact(self, diff_text, user_id):
+        """
+        Upload a full resume diff as a plain-text file to S3
+        
+        Args:
+            diff_text (str): Complete diff contents
+            user_id (str): Discord user ID
+            
+        Returns:
+            dict: {'key': str, 'url': str} or None if failed
+        """
+        try:
+            # Kept under the user's uploads prefix so clear_all_user_s3_resumes removes it too
+            timestamp = str(int(datetime.now().timestamp() * 1000))
+            key = f"uploads/{user_id}/diffs/{timestamp}.txt"
+            
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=diff_text.encode('utf-8'),
+                ContentType='text/plain; charset=utf-8'
+            )
+            
+            url = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{key}"
+            
+            return {
+                'key': key,
+                'url': url
+            }
+            
+        except ClientError as e:
+            print(f"Error uploading diff to S3: {e}")
+            return None
+        except Exception as e:
+            print(f"Unexpected error in S3 diff upload: {e}")
+            return None
+
+    def save_s3_profile(self, profile_json, key):
+        """
+        Upload a captured CPU profile as JSON to S3
+        
+        Args:
+            profile_json (str): Serialized profile
+            key (str): Object key under the profiles/ prefix
+            
+        Returns:
+            str: The object key or None if failed
+        """
+        try:
+            # Outside uploads/ so profiles are never served with the public resume URLs
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=profile_json.encode('utf-8'),
+                ContentType='application/json'
+            )
+            return key
+            
+        except ClientError as e:
+            print(f"Error uploading profile to S3: {e}")
+            return None
+        except Exception as e:
+            print(f"Unexpected error in S3 profile upload: {e}")
+            return None
+
     def delete_s3_resume(self, key):
         """
         Delete a PDF resume from S3
@@ -135,14 +201,26 @@ class S3Manager:
 # Global instance
 s3_manager = S3Manager()
 
+@traced()
 def save_s3_resume(file_buffer, user_id):
     """Convenience function for saving resume to S3"""
     return s3_manager.save_s3_resume(file_buffer, user_id)
 
+@traced()
 def delete_s3_resume(key):
     """Convenience function for deleting resume from S3"""
     return s3_manager.delete_s3_resume(key)
 
+@traced()
 def clear_all_user_s3_resumes(user_id):
     """Convenience function for clearing all user S3 resumes"""
-    return s3_manager.clear_all_user_s3_resumes(user_id)
\ No newline at end of file
+    return s3_manager.clear_all_user_s3_resumes(user_id)
+
+@traced()
+def save_s3_diff_artifact(diff_text, user_id):
+    """Convenience function for saving a full diff to S3"""
+    return s3_manager.save_s3_diff_artifact(diff_text, user_id)
+
+def save_s3_profile(profile_json, key):
+    """Convenience function for saving a captured profile to S3"""
+    return s3_manager.save_s3_profile(profile_json, key)
@@ -1,7 +1,12 @@
 import json
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from helpers.discord_followup import send_followup_message
+from helpers.deadline import Deadline, FOLLOWUP_RESERVE_MS
+from helpers.sqs_publisher import defer_background_jobs
+from helpers.tracing import start_trace
+from helpers.profiler import profile_invocation
+from helpers.pdf_sandbox import start_pdf_sandbox
 
 logging.basicConfig(
     level=logging.INFO,
@@ -9,15 +14,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Least time worth starting a deferred background job with, after the safety margin
+DEFERRED_JOB_MIN_MS = 5000
+
+# Started during init so the first job doesn't wait for the PDF parsing workers
+start_pdf_sandbox()
+
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     # AWS Lambda handler for processing Discord commands from SQS messages.
     try:
         logger.info(f"Processing {len(event['Records'])} command(s) from SQS")
         
+        # One budget for the whole batch, taken from the time Lambda has left for this invocation
+        deadline = Deadline.from_lambda_context(context)
+        
         results = []
         for record in event['Records']: # SQS event containing command processing jobs
-            result = process_sqs_record(record)
+            result = process_sqs_record(record, deadline)
             results.append(result)
         
         logger.info(f"Completed processing {len(results)} command(s)")
@@ -32,12 +46,13 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         raise
 
 
-def process_sqs_record(record: Dict[str, Any]) -> Dict[str, Any]:
+def process_sqs_record(record: Dict[str, Any], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
     """
     Processes a single SQS record containing a command processing job.
     
     Args:
         record: SQS record with command data
+        deadline: Time budget for the invocation
     
     Returns:
         Dict: Processing result
@@ -45,6 +60,12 @@ def process_sqs_record(record: Dict[str, Any]) -> Dict[str, Any]:
     try:
         # Parse message body
         message_body = json.loads(record['body'])
+        
+        # Background jobs carry no interaction and send no follow-up. A failed one is only a missed
+        # cache warm-up, so it is logged and its message deleted rather than retried into the shared DLQ.
+        if 'job_type' in message_body:
+            return run_background_job(message_body['job_type'], message_body.get('payload', {}), deadline)
+        
         interaction_data = message_body['interaction_data']
         command_type = message_body['command_type']
         application_id = message_body['application_id']
@@ -52,39 +73,116 @@ def process_sqs_record(record: Dict[str, Any]) -> Dict[str, Any]:
         
         logger.info(f"Processing {command_type} command from SQS")
         
-        # Validate required data
-        if not application_id or not interaction_token:
-            error_msg = "Missing application_id or interaction_token in SQS message"
-            logger.error(error_msg)
-            return {'success': False, 'error': error_msg}
+        return run_command_job(interaction_data, command_type, application_id, interaction_token, deadline)
         
-        # Process the command
-        result_message = process_command(interaction_data, command_type)
+    except Exception as e:
+        logger.error(f"Error processing SQS record: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
+
+def run_command_job(interaction_data: Dict[str, Any], command_type: str, application_id: str, interaction_token: str,
+                    deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """
+    Runs a command job end to end: processes the command and sends the Discord follow-up.
+    Shared by the SQS Lambda path and the local job executor.
+    
+    Args:
+        interaction_data: Discord interaction data
+        command_type: Type of command to process
+        application_id: Discord application ID for the follow-up webhook
+        interaction_token: Discord interaction token for the follow-up webhook
+        deadline: Time budget for the job, defaults to the local job budget
+    
+    Returns:
+        Dict: Processing result
+    """
+    # Validate required data
+    if not application_id or not interaction_token:
+        error_msg = "Missing application_id or interaction_token in command job"
+        logger.error(error_msg)
+        return {'success': False, 'error': error_msg}
+    
+    deadline = deadline or Deadline.from_lambda_context(None)
+    
+    with start_trace(command_type, path='command_job'), profile_invocation(command_type, 'command_job'):
+        # Process the command, keeping time back for the follow-up
+        with defer_background_jobs() as background_jobs:
+            result_message = process_command(interaction_data, command_type, deadline.reserve(FOLLOWUP_RESERVE_MS))
         
         # Send follow-up message to Discord
-        success = send_followup_message(application_id, interaction_token, result_message)
+        success = send_followup_message(application_id, interaction_token, result_message, deadline)
         
         if not success:
             # Try to send error message if main result failed
             error_msg = f"An error occurred while processing your {command_type}. Please try again."
-            send_followup_message(application_id, interaction_token, error_msg)
-            return {'success': False, 'command_type': command_type, 'error': 'Failed to send follow-up message'}
+            send_followup_message(application_id, interaction_token, error_msg, deadline)
+    
+    # The user already has their answer; what the command did (e.g. an upload) stands either way
+    run_deferred_background_jobs(background_jobs, deadline)
+    
+    if not success:
+        return {'success': False, 'command_type': command_type, 'error': 'Failed to send follow-up message'}
+    
+    logger.info(f"Successfully processed {command_type} command")
+    return {'success': True, 'command_type': command_type}
+
+
+def run_deferred_background_jobs(background_jobs: List[Tuple[str, Dict[str, Any]]], deadline: Deadline):
+    """
+    Runs the background jobs a command published, after its follow-up was sent. They must finish
+    well inside the Lambda timeout: a timeout would retry the command message, not just the job.
+    """
+    job_deadline = deadline.reserve(FOLLOWUP_RESERVE_MS)
+    for job_type, payload in background_jobs:
+        if not job_deadline.has_time_for(DEFERRED_JOB_MIN_MS):
+            logger.warning(f"Skipping {job_type} background job, only {job_deadline.remaining_ms():.0f}ms left")
+            continue
+        run_background_job(job_type, payload, job_deadline)
+
+
+def run_background_job(job_type: str, payload: Dict[str, Any], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """
+    Runs work queued with publish_background_job, such as precomputing the diff between consecutive versions.
+    
+    Args:
+        job_type: Type of background job
+        payload: Job-specific arguments
+        deadline: Time budget for the job, defaults to the local job budget
+    
+    Returns:
+        Dict: Processing result
+    """
+    deadline = deadline or Deadline.from_lambda_context(None)
+    
+    try:
+        with start_trace(job_type, path='background_job'), profile_invocation(job_type, 'background_job'):
+            if job_type == 'precompute_diff':
+                from helpers.get_pdf_diff import precompute_diff
+                success = precompute_diff(
+                    payload['old_resume_url'],
+                    payload['new_resume_url'],
+                    payload.get('old_hash'),
+                    payload.get('new_hash'),
+                    deadline
+                )
+            else:
+                raise ValueError(f"Unknown background job type: {job_type}")
         
-        logger.info(f"Successfully processed {command_type} command")
-        return {'success': True, 'command_type': command_type}
+        return {'success': success, 'job_type': job_type}
         
     except Exception as e:
-        logger.error(f"Error processing SQS record: {str(e)}")
-        return {'success': False, 'error': str(e)}
+        logger.error(f"Error running {job_type} background job: {str(e)}")
+        return {'success': False, 'job_type': job_type, 'error': str(e)}
 
 
-def process_command(interaction_data: Dict[str, Any], command_type: str) -> Any:
+def process_command(interaction_data: Dict[str, Any], command_type: str, deadline: Optional[Deadline] = None) -> Any:
     """
     Processes the actual command and returns the result message.
     
     Args:
         interaction_data: Discord interaction data
         command_type: Type of command to process
+        deadline: Time budget for processing the command
     
     Returns:
         The result message to send back to Discord
@@ -92,14 +190,29 @@ def process_command(interaction_data: Dict[str, Any], command_type: str) -> Any:
     try:
         if command_type == 'update':
             from commands.update import handle_update_command
-            return handle_update_command(interaction_data)
+            return handle_update_command(interaction_data, deadline)
         elif command_type == 'ai_review':
             from commands.ai_review import handle_ai_review_command
-            return handle_ai_review_command(interaction_data)
+            return handle_ai_review_command(interaction_data, deadline)
+        elif command_type == 'upload':
+            from commands.upload import handle_upload_command
+            return handle_upload_command(interaction_data, deadline)
+        elif command_type == 'get_annotations':
+            from commands.get_annotations import handle_get_annotations_command
+            return handle_get_annotations_command(interaction_data, deadline)
+        elif command_type == 'get_resume_diff':
+            from commands.get_resume_diff import handle_get_resume_diff_command
+            return handle_get_resume_diff_command(interaction_data, deadline)
         else:
             raise ValueError(f"Unknown command type: {command_type}")
             
     except Exception as e:
         logger.error(f"Error processing {command_type} command: {str(e)}")
-        error_context = "updating your resume" if command_type == 'update' else "analyzing your resume"
+        error_contexts = {
+            'update': "updating your resume",
+            'upload': "uploading your resume",
+            'get_annotations': "getting your annotations",
+            'get_resume_diff': "comparing your resumes"
+        }
+        error_context = error_contexts.get(command_type, "analyzing your resume")
         return f"An error occurred while {error_context}. 😔"
\ No newline at end of file
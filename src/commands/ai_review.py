@@ -1,15 +1,111 @@
 import os
+import json
 import logging
-from helpers.embed_helper import create_error_embed, create_success_embed, create_ai_review_embed
+from helpers.embed_helper import create_error_embed, create_success_embed, create_ai_review_embed, create_service_unavailable_embed
 from helpers.pdf_extractor import extract_text_from_pdf_url, clean_resume_text, validate_resume_content
-from helpers.ai_resume_analyzer import analyze_resume_text, format_feedback_for_annotations
-from helpers.hypothesis_client import create_bulk_annotations, validate_annotation_data
+from helpers.ai_resume_analyzer import analyze_resume_text, analyze_resume_text_stream, analyze_resume_text_incremental, format_feedback_for_annotations
+from helpers.hypothesis_client import create_annotation, create_bulk_annotations, validate_annotation_data, ANNOTATION_BUDGET_MS
+from helpers.discord_followup import edit_original_message
+from aws.dynamo import get_latest_ai_review_result, save_ai_review_result
 from helpers.rate_limiter import can_use_ai_review, record_ai_review_usage
+from helpers.circuit_breaker import get_open_circuit
+from helpers.deadline import get_remaining_ms
+from helpers.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
-def handle_ai_review_command(interaction_data):
+def is_streaming_enabled():
+    return os.getenv('AI_REVIEW_STREAMING', 'false').lower() == 'true'
+
+
+def is_incremental_enabled():
+    return os.getenv('AI_REVIEW_INCREMENTAL', 'true').lower() == 'true'
+
+
+@traced()
+def get_incremental_feedback(user_id, pdf_url, cleaned_text, deadline=None):
+    """
+    Builds feedback from the user's previous AI review when it was for an earlier version.
+    Returns None when a full review is needed.
+    """
+    if not is_incremental_enabled():
+        return None
+    
+    previous_review = get_latest_ai_review_result(user_id)
+    if not previous_review or previous_review.get('resume_url') == pdf_url:
+        return None
+    
+    try:
+        previous_feedback = json.loads(previous_review.get('feedback', '[]'))
+    except ValueError:
+        logger.warning(f"Stored AI review result for user {user_id} is invalid, running full review")
+        return None
+    
+    logger.info(f"Running incremental AI review for user {user_id} against {previous_review.get('resume_url')}")
+    return analyze_resume_text_incremental(previous_review.get('resume_text', ''), previous_feedback, cleaned_text,
+                                           get_remaining_ms(deadline))
+
+
+@traced()
+def stream_review_annotations(interaction_data, cleaned_text, hypothesis_url, deadline=None):
+    """
+    Streams the AI review and posts each annotation as soon as its feedback item
+    is complete, editing the deferred Discord message with progress along the way.
+    
+    Returns:
+        tuple: (feedback_items, results) with results shaped like create_bulk_annotations output
+    """
+    application_id = interaction_data.get('application_id')
+    interaction_token = interaction_data.get('token')
+    
+    results = {
+        'created': [],
+        'failed': [],
+        'skipped': [],
+        'total': 0
+    }
+    
+    def on_feedback_item(item):
+        annotations = format_feedback_for_annotations([item], hypothesis_url, cleaned_text)
+        if not annotations:
+            return
+        annotation = annotations[0]
+        if not validate_annotation_data(annotation):
+            logger.warning("Skipping invalid streamed annotation data")
+            return
+        
+        results['total'] += 1
+        if deadline and not deadline.has_time_for(ANNOTATION_BUDGET_MS):
+            # Keep collecting the review but stop posting, so the summary can still go out in time
+            results['skipped'].append({'text': annotation.get('text', '')[:50] + '...'})
+            return
+        
+        created_annotation = create_annotation(annotation, deadline)
+        if created_annotation:
+            results['created'].append({
+                'id': created_annotation.get('id'),
+                'text': annotation.get('text', '')[:50] + '...'
+            })
+        else:
+            results['failed'].append({
+                'error': 'API returned null',
+                'text': annotation.get('text', '')[:50] + '...'
+            })
+        
+        if application_id and interaction_token:
+            progress_embed = create_ai_review_embed(
+                "AI Review In Progress...",
+                f"Posted {len(results['created'])} annotation(s) so far. 📝\n\n🔗 {hypothesis_url}"
+            )
+            edit_original_message(application_id, interaction_token, progress_embed, deadline)
+    
+    feedback_items = analyze_resume_text_stream(cleaned_text, on_feedback_item, get_remaining_ms(deadline))
+    return feedback_items, results
+
+
+@traced()
+def handle_ai_review_command(interaction_data, deadline=None):
     
     try:
         user_id = interaction_data.get('member', {}).get('user', {}).get('id')
@@ -46,6 +142,12 @@ def handle_ai_review_command(interaction_data):
                 "Annotation service is not properly configured. Please contact support. 🔧"
             )
 
+        # Fail fast while a dependency the review needs is known to be down
+        open_circuit = get_open_circuit('pdf_storage', 'openai', 'hypothesis')
+        if open_circuit:
+            logger.warning(f"Skipping AI review for user {user_id}: {open_circuit.name} circuit is open")
+            return create_service_unavailable_embed(open_circuit.label, open_circuit.retry_after())
+
         # Extract pdf_url from command options
         options = interaction_data.get('data', {}).get('options', [])
         pdf_url = None
@@ -67,7 +169,7 @@ def handle_ai_review_command(interaction_data):
         logger.info(f"Getting annotations for user {user_id} with URL: {pdf_url}")
 
         # Extract text from PDF
-        resume_text = extract_text_from_pdf_url(pdf_url)
+        resume_text = extract_text_from_pdf_url(pdf_url, deadline)
         if not resume_text:
             logger.error(f"Failed to extract text from PDF: {pdf_url}")
             return create_error_embed(
@@ -86,44 +188,62 @@ def handle_ai_review_command(interaction_data):
 
         logger.info(f"Successfully extracted and validated resume text ({len(cleaned_text)} chars)")
 
-        # Analyze resume with AI
-        feedback_items = analyze_resume_text(cleaned_text)
-        if not feedback_items:
-            logger.error(f"AI analysis failed for user {user_id}")
-            return create_error_embed(
-                "AI Analysis Error",
-                "Unable to analyze your resume at this time. Please try again later. 🤖"
-            )
-
-        logger.info(f"AI generated {len(feedback_items)} feedback items")
-
         # Get Hypothesis URL for annotations
         hypothesis_url = f"https://via.hypothes.is/{pdf_url}"
 
-        # Format feedback for Hypothesis annotations
-        annotations = format_feedback_for_annotations(feedback_items, hypothesis_url)
-        
-        # Validate annotations before sending
-        valid_annotations = []
-        for annotation in annotations:
-            if validate_annotation_data(annotation):
-                valid_annotations.append(annotation)
-            else:
-                logger.warning("Skipping invalid annotation data")
-
-        if not valid_annotations:
-            logger.error("No valid annotations generated")
-            return create_error_embed(
-                "Annotation Error",
-                "Unable to create annotations for your resume. Please try again. 📝"
-            )
+        # Only review what changed when there is a previous review of an earlier version
+        feedback_items = get_incremental_feedback(user_id, pdf_url, cleaned_text, deadline)
+
+        if feedback_items is None and is_streaming_enabled():
+            # Stream feedback and post each annotation as soon as it arrives
+            feedback_items, results = stream_review_annotations(interaction_data, cleaned_text, hypothesis_url, deadline)
+            if not feedback_items and results['total'] == 0:
+                logger.error(f"AI analysis failed for user {user_id}")
+                return create_error_embed(
+                    "AI Analysis Error",
+                    "Unable to analyze your resume at this time. Please try again later. 🤖"
+                )
+        else:
+            if feedback_items is None:
+                # Analyze resume with AI
+                feedback_items = analyze_resume_text(cleaned_text, get_remaining_ms(deadline))
+            if not feedback_items:
+                logger.error(f"AI analysis failed for user {user_id}")
+                return create_error_embed(
+                    "AI Analysis Error",
+                    "Unable to analyze your resume at this time. Please try again later. 🤖"
+                )
+
+            logger.info(f"AI generated {len(feedback_items)} feedback items")
+
+            # Format feedback for Hypothesis annotations, dropping feedback that can't be anchored in the text
+            annotations = format_feedback_for_annotations(feedback_items, hypothesis_url, cleaned_text)
+            
+            # Validate annotations before sending
+            valid_annotations = []
+            for annotation in annotations:
+                if validate_annotation_data(annotation):
+                    valid_annotations.append(annotation)
+                else:
+                    logger.warning("Skipping invalid annotation data")
+
+            if not valid_annotations:
+                logger.error("No valid annotations generated")
+                return create_error_embed(
+                    "Annotation Error",
+                    "Unable to create annotations for your resume. Please try again. 📝"
+                )
 
-        # Create annotations via Hypothesis API
-        results = create_bulk_annotations(valid_annotations)
+            # Create annotations via Hypothesis API
+            results = create_bulk_annotations(valid_annotations, deadline)
         
         # Record successful AI review usage
         record_ai_review_usage(user_id)
         
+        # Keep this review so the next one can be incremental
+        if feedback_items:
+            save_ai_review_result(user_id, pdf_url, cleaned_text, json.dumps(feedback_items))
+        
         # Check results and format response
         total_annotations = results['total']
         created_count = len(results['created'])
@@ -151,6 +271,16 @@ def handle_ai_review_command(interaction_data):
             "inline": False
         }]
 
+        skipped_count = len(results.get('skipped', []))
+        if skipped_count > 0:
+            logger.warning(f"Ran out of time, {skipped_count} annotations were not posted")
+            embed["fields"].append({
+                "name": "⏱️ Partial Review",
+                "value": f"Posted {created_count} of {total_annotations} annotations before running out of time. "
+                         "Run the review again later to see the rest.",
+                "inline": False
+            })
+
         if failed_count > 0:
             logger.warning(f"{failed_count} annotations failed to create")
             
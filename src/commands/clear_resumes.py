@@ -2,11 +2,13 @@ import logging
 from aws.s3 import clear_all_user_s3_resumes
 from aws.dynamo import clear_all_user_resumes, get_all_user_resumes
 from helpers.embed_helper import create_success_embed, create_error_embed, create_info_embed, create_warning_embed
+from helpers.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
-def handle_clear_resumes_command(interaction_data):
+@traced()
+def handle_clear_resumes_command(interaction_data, deadline=None):
     
     try:
         user_id = interaction_data['member']['user']['id']
@@ -2,12 +2,17 @@ import os
 import logging
 import requests
 from urllib.parse import quote
-from helpers.embed_helper import create_error_embed, create_info_embed
+from helpers.embed_helper import create_error_embed, create_info_embed, create_service_unavailable_embed
+from helpers.circuit_breaker import get_circuit_breaker, get_open_circuit
+from helpers.deadline import get_timeout
+from helpers.http_session import get_http_session
+from helpers.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
-def handle_get_annotations_command(interaction_data):
+@traced()
+def handle_get_annotations_command(interaction_data, deadline=None):
     
     try:
         user_id = interaction_data.get('member', {}).get('user', {}).get('id')
@@ -35,8 +40,12 @@ def handle_get_annotations_command(interaction_data):
         
         logger.info(f"Getting annotations for user {user_id} with URL: {pdf_url}")
         
+        open_circuit = get_open_circuit('hypothesis')
+        if open_circuit:
+            return create_service_unavailable_embed(open_circuit.label, open_circuit.retry_after())
+        
         # Get annotations from Hypothesis
-        annotations = get_annotations_from_hypothesis(pdf_url)
+        annotations = get_annotations_from_hypothesis(pdf_url, deadline)
         if not annotations:
             return create_error_embed(
                 "Hypothesis API Error",
@@ -54,7 +63,8 @@ def handle_get_annotations_command(interaction_data):
         )
 
 
-def get_annotations_from_hypothesis(pdf_url):
+@traced()
+def get_annotations_from_hypothesis(pdf_url, deadline=None):
     
     try:
         api_url = f"https://api.hypothes.is/api/search?uri={quote(pdf_url)}&limit=100&order=asc"
@@ -63,7 +73,18 @@ def get_annotations_from_hypothesis(pdf_url):
             'Authorization': f'Bearer {os.getenv("HYPOTHESIS_API_KEY")}'
         }
         
-        response = requests.get(api_url, headers=headers, timeout=10)
+        timeout = get_timeout(deadline, 10)
+        breaker = get_circuit_breaker('hypothesis')
+        if not breaker.allow_request():
+            logger.warning("Hypothesis circuit is open, skipping annotation search")
+            return None
+        
+        try:
+            response = get_http_session().get(api_url, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            breaker.record_exception(e, deadline_limited=timeout < 10)
+            raise
+        breaker.record_status(response.status_code)
         response.raise_for_status()
         
         annotations_data = response.json()
@@ -76,6 +97,7 @@ def get_annotations_from_hypothesis(pdf_url):
         return None
 
 
+@traced()
 def format_annotations(annotations, user_id):
     
     try:
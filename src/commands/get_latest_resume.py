@@ -1,11 +1,13 @@
 import logging
 from aws.dynamo import get_latest_db_resume
 from helpers.embed_helper import create_error_embed, create_info_embed
+from helpers.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
-def handle_get_latest_resume_command(interaction_data):
+@traced()
+def handle_get_latest_resume_command(interaction_data, deadline=None):
     """
     Handle the /get_latest_resume command
     
@@ -1,6 +1,11 @@
 import logging
-from helpers.get_pdf_diff import compare_text_diff
-from helpers.embed_helper import create_error_embed, create_info_embed
+from helpers.get_pdf_diff import compare_text_diff, format_diff_field_value
+from aws.s3 import save_s3_diff_artifact
+from helpers.embed_helper import create_error_embed, create_info_embed, create_service_unavailable_embed
+from helpers.circuit_breaker import get_open_circuit
+from helpers.diff_cache import remember_user_resume_hashes, has_cached_diff_for_urls
+from helpers.command_router import register_cache_probe
+from helpers.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -24,21 +29,36 @@ def extract_resume_urls(interaction_data):
     return old_url, new_url
 
 
-def create_resume_diff_response(old_resume_url, new_resume_url):
+def extract_full_diff_option(interaction_data):
+    """Extract the optional full_diff flag from Discord interaction data"""
+    for option in interaction_data['data'].get('options', []):
+        if option['name'] == 'full_diff':
+            return bool(option.get('value'))
+    return False
+
+
+@traced()
+def create_resume_diff_response(old_resume_url, new_resume_url, deadline=None, user_id=None, include_full_diff=False):
     """
     Generate a Discord embed response with resume differences
     
     Args:
         old_resume_url (str): URL of the previous resume
         new_resume_url (str): URL of the new resume
+        deadline (Deadline, optional): Time budget for downloading both PDFs
+        user_id (str, optional): Discord user ID, used for the full diff upload
+        include_full_diff (bool): Upload the complete diff to S3 and link it
         
     Returns:
         dict: Discord embed response data
     """
     try:
-        diff_result = compare_text_diff(old_resume_url, new_resume_url)
+        diff_result = compare_text_diff(old_resume_url, new_resume_url, deadline, include_full_diff=include_full_diff)
         added_text = diff_result.get('added_text')
         removed_text = diff_result.get('removed_text')
+        added_remaining = diff_result.get('added_remaining', 0)
+        removed_remaining = diff_result.get('removed_remaining', 0)
+        truncated = diff_result.get('truncated', False)
         
         # Create embed structure
         embed = {
@@ -52,41 +72,38 @@ def create_resume_diff_response(old_resume_url, new_resume_url):
         }
         
         # Handle case where no changes were found
-        if not added_text and not removed_text:
+        if not added_text and not removed_text and not added_remaining and not removed_remaining:
             embed["description"] = "No changes were found between the two resumes."
             embed["color"] = 0xffff00  # Yellow color for no changes
             return {"embeds": [embed]}
         
-        # Add "Added" field
-        if added_text:
-            added_field = {
-                "name": "🟢 Added",
-                "value": f"```{added_text[:1000]}```" if len(added_text) <= 1000 else f"```{added_text[:997]}```...",
-                "inline": False
-            }
-        else:
-            added_field = {
-                "name": "🟢 Added", 
-                "value": "No new content added.",
-                "inline": False
-            }
+        # Add "Added" field; text is already cut to the field budget, with a count of what didn't fit
+        added_field = {
+            "name": "🟢 Added",
+            "value": format_diff_field_value(added_text, added_remaining, "No new content added.", truncated),
+            "inline": False
+        }
         embed["fields"].append(added_field)
         
         # Add "Removed" field
-        if removed_text:
-            removed_field = {
-                "name": "🔴 Removed",
-                "value": f"```{removed_text[:1000]}```" if len(removed_text) <= 1000 else f"```{removed_text[:997]}```...",
-                "inline": False
-            }
-        else:
-            removed_field = {
-                "name": "🔴 Removed",
-                "value": "No content removed.",
-                "inline": False
-            }
+        removed_field = {
+            "name": "🔴 Removed",
+            "value": format_diff_field_value(removed_text, removed_remaining, "No content removed.", truncated),
+            "inline": False
+        }
         embed["fields"].append(removed_field)
         
+        # Link the complete diff when requested, since the embed only shows what fits
+        full_diff = diff_result.get('full_diff')
+        if full_diff and user_id:
+            artifact = save_s3_diff_artifact(full_diff, user_id)
+            if artifact:
+                embed["fields"].append({
+                    "name": "📄 Full Diff",
+                    "value": f"[Download the complete diff]({artifact['url']})",
+                    "inline": False
+                })
+        
         return {"embeds": [embed]}
         
     except Exception as e:
@@ -103,12 +120,14 @@ def create_resume_diff_response(old_resume_url, new_resume_url):
         return {"embeds": [error_embed]}
 
 
-def handle_get_resume_diff_command(interaction_data):
+@traced()
+def handle_get_resume_diff_command(interaction_data, deadline=None):
     """
     Handle the /get_resume_diff command workflow
     
     Args:
         interaction_data (dict): Discord interaction data
+        deadline (Deadline, optional): Time budget for the response
         
     Returns:
         dict: Response message for Discord
@@ -133,8 +152,16 @@ def handle_get_resume_diff_command(interaction_data):
         
         logger.info(f"Comparing resumes for user {user_id}: {clean_old_url} vs {clean_new_url}")
         
+        # Stored versions carry their content hashes, which lets a cached diff skip both downloads
+        remember_user_resume_hashes(user_id)
+        
+        open_circuit = get_open_circuit('pdf_storage')
+        if open_circuit and not has_cached_diff_for_urls(clean_old_url, clean_new_url):
+            return create_service_unavailable_embed(open_circuit.label, open_circuit.retry_after())
+        
         # Generate diff response
-        diff_response = create_resume_diff_response(clean_old_url, clean_new_url)
+        include_full_diff = extract_full_diff_option(interaction_data)
+        diff_response = create_resume_diff_response(clean_old_url, clean_new_url, deadline, user_id, include_full_diff)
         
         logger.info(f"Resume diff completed successfully for user {user_id}")
         return diff_response
@@ -144,4 +171,18 @@ def handle_get_resume_diff_command(interaction_data):
         return create_error_embed(
             "Diff Error",
             "An error occurred while comparing your resumes. 😔"
-        )
\ No newline at end of file
+        )
+
+
+def is_diff_cached(interaction_data):
+    """Cache probe for the command router: True when the requested diff can be served without downloads"""
+    old_url, new_url = extract_resume_urls(interaction_data)
+    if not old_url or not new_url:
+        return False
+    return has_cached_diff_for_urls(
+        old_url.replace("https://via.hypothes.is/", ""),
+        new_url.replace("https://via.hypothes.is/", "")
+    )
+
+
+register_cache_probe('get_resume_diff', is_diff_cached)
\ No newline at end of file
@@ -2,11 +2,19 @@ import logging
 from aws.s3 import save_s3_resume
 from aws.dynamo import get_latest_db_resume, update_db_resume
 from helpers.validate_pdf import validate_pdf, validate_attachment_data, PDFValidationError
-from helpers.get_pdf_diff import compare_text_diff
+from helpers.get_pdf_diff import compare_text_diff, format_diff_field_value
 from helpers.embed_helper import create_success_embed, create_error_embed, create_info_embed
+from helpers.diff_cache import hash_pdf_bytes, remember_pdf_hash, remember_pdf_page_fingerprints
+from helpers.page_fingerprints import serialize_page_fingerprints, parse_page_fingerprints
+from helpers.pdf_sandbox import fingerprint_pdf_pages
+from helpers.sqs_publisher import publish_background_job
+from helpers.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# Two PDF downloads plus text extraction; below this the diff is skipped rather than risk the timeout
+DIFF_BUDGET_MS = 8000
+
 
 def get_show_diff_option(interaction_data):
     """Extract the show_diff boolean option from Discord interaction data"""
@@ -22,12 +30,16 @@ def get_show_diff_option(interaction_data):
     return False
 
 
-def create_resume_diff_response(old_resume_url, new_resume_url):
+@traced()
+def create_resume_diff_response(old_resume_url, new_resume_url, deadline=None, old_hash=None, new_hash=None):
     
     try:
-        diff_result = compare_text_diff(old_resume_url, new_resume_url)
+        diff_result = compare_text_diff(old_resume_url, new_resume_url, deadline, old_hash, new_hash)
         added_text = diff_result.get('added_text')
         removed_text = diff_result.get('removed_text')
+        added_remaining = diff_result.get('added_remaining', 0)
+        removed_remaining = diff_result.get('removed_remaining', 0)
+        truncated = diff_result.get('truncated', False)
         
         embed = {
             "color": 0x0099ff,  
@@ -40,37 +52,24 @@ def create_resume_diff_response(old_resume_url, new_resume_url):
         }
         
         # Handle case where no changes were found
-        if not added_text and not removed_text:
+        if not added_text and not removed_text and not added_remaining and not removed_remaining:
             embed["description"] = "No changes were found in the resume."
             embed["color"] = 0xffff00  # Yellow color for no changes
             return {"embeds": [embed]}
         
-        if added_text:
-            added_field = {
-                "name": "🟢 Added",
-                "value": f"```{added_text[:1000]}```" if len(added_text) <= 1000 else f"```{added_text[:997]}```...",
-                "inline": False
-            }
-        else:
-            added_field = {
-                "name": "🟢 Added", 
-                "value": "No new content added.",
-                "inline": False
-            }
+        # Text is already cut to the field budget, with a count of what didn't fit
+        added_field = {
+            "name": "🟢 Added",
+            "value": format_diff_field_value(added_text, added_remaining, "No new content added.", truncated),
+            "inline": False
+        }
         embed["fields"].append(added_field)
         
-        if removed_text:
-            removed_field = {
-                "name": "🔴 Removed",
-                "value": f"```{removed_text[:1000]}```" if len(removed_text) <= 1000 else f"```{removed_text[:997]}```...",
-                "inline": False
-            }
-        else:
-            removed_field = {
-                "name": "🔴 Removed",
-                "value": "No content removed.",
-                "inline": False
-            }
+        removed_field = {
+            "name": "🔴 Removed",
+            "value": format_diff_field_value(removed_text, removed_remaining, "No content removed.", truncated),
+            "inline": False
+        }
         embed["fields"].append(removed_field)
         
         return {"embeds": [embed]}
@@ -89,7 +88,8 @@ def create_resume_diff_response(old_resume_url, new_resume_url):
         return {"embeds": [error_embed]}
 
 
-def handle_update_command(interaction_data):
+@traced()
+def handle_update_command(interaction_data, deadline=None):
    
     try:
         user_id = interaction_data['member']['user']['id']
@@ -106,6 +106,8 @@ def handle_update_command(interaction_data):
         
         # Get the current resume URL for diff comparison
         old_resume_url = existing_resume[0]['resume_url']
+        old_hash = existing_resume[0].get('content_hash')
+        remember_pdf_page_fingerprints(old_resume_url, parse_page_fingerprints(existing_resume[0].get('page_fingerprints')))
         logger.info(f"Found existing resume for user {user_id}: {old_resume_url}")
         
         # Validate attachment data
@@ -118,8 +120,10 @@ def handle_update_command(interaction_data):
 
         # Validate PDF
         try:
-            file_bytes = validate_pdf(attachment.to_dict())
+            file_bytes = validate_pdf(attachment.to_dict(), deadline)
             logger.info(f"PDF validation successful for user {user_id}: {len(file_bytes)} bytes")
+            new_hash = hash_pdf_bytes(file_bytes)
+            page_fingerprints = fingerprint_pdf_pages(file_bytes, deadline)
         except PDFValidationError as e:
             logger.warning(f"PDF validation failed for user {user_id}: {str(e)}")
             return create_error_embed(
@@ -143,7 +147,8 @@ def handle_update_command(interaction_data):
         
         # Update DynamoDB with new version
         logger.info(f"Updating resume metadata in DynamoDB for user {user_id}")
-        new_version = update_db_resume(user_id, pdf_url, attachment.filename)
+        new_version = update_db_resume(user_id, pdf_url, attachment.filename, new_hash,
+                                       serialize_page_fingerprints(page_fingerprints))
         if not new_version:
             logger.error(f"DynamoDB update failed for user {user_id}")
             return create_error_embed(
@@ -151,14 +156,28 @@ def handle_update_command(interaction_data):
                 "Failed to update resume metadata. 😔"
             )
         
+        remember_pdf_hash(pdf_url, new_hash)
+        remember_pdf_page_fingerprints(pdf_url, page_fingerprints)
+        
         # Generate Hypothes.is annotation link
         annotation_link = f"https://via.hypothes.is/{pdf_url}"
         
         # Check if user wants to see diff
         show_diff = get_show_diff_option(interaction_data)
         
-        if not show_diff:
-            logger.info(f"Update workflow completed successfully for user {user_id} (no diff requested)")
+        # The update itself is done, so skip the diff rather than let it run into the timeout
+        diff_skipped = show_diff and deadline is not None and not deadline.has_time_for(DIFF_BUDGET_MS)
+        
+        if not show_diff or diff_skipped:
+            # Precompute the v(n-1) -> v(n) diff so a later /get_resume_diff is a cache lookup
+            publish_background_job('precompute_diff', {
+                'old_resume_url': old_resume_url,
+                'new_resume_url': pdf_url,
+                'old_hash': old_hash,
+                'new_hash': new_hash
+            })
+            
+            logger.info(f"Update workflow completed successfully for user {user_id} (diff requested: {show_diff}, skipped: {diff_skipped})")
             fields = [
                 {
                     "name": "🔗 Resume PDF Link",
@@ -166,6 +185,12 @@ def handle_update_command(interaction_data):
                     "inline": False
                 }
             ]
+            if diff_skipped:
+                fields.append({
+                    "name": "📝 Resume Changes",
+                    "value": "The diff took too long to generate this time. Use `/get_resume_diff` to see what changed.",
+                    "inline": False
+                })
             return create_success_embed(
                 "Resume Updated",
                 "Your resume has been successfully updated!",
@@ -174,7 +199,7 @@ def handle_update_command(interaction_data):
         
         # Generate diff response
         logger.info(f"Generating diff comparison for user {user_id}")
-        diff_response = create_resume_diff_response(old_resume_url, pdf_url)
+        diff_response = create_resume_diff_response(old_resume_url, pdf_url, deadline, old_hash, new_hash)
         
         # Add annotation link to the embed
         if "embeds" in diff_response and len(diff_response["embeds"]) > 0:
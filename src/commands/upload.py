@@ -3,11 +3,16 @@ from aws.s3 import save_s3_resume, delete_s3_resume
 from aws.dynamo import save_db_resume, get_latest_db_resume
 from helpers.validate_pdf import validate_pdf, PDFValidationError, validate_attachment_data
 from helpers.embed_helper import create_success_embed, create_error_embed, create_info_embed
+from helpers.diff_cache import hash_pdf_bytes, remember_pdf_hash, remember_pdf_page_fingerprints
+from helpers.page_fingerprints import serialize_page_fingerprints
+from helpers.pdf_sandbox import fingerprint_pdf_pages
+from helpers.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
-def handle_upload_command(interaction_data):
+@traced()
+def handle_upload_command(interaction_data, deadline=None):
     
     try:
         user_id = interaction_data['member']['user']['id']
@@ -31,7 +36,7 @@ def handle_upload_command(interaction_data):
 
         # validate pdf
         try:
-            file_bytes = validate_pdf(attachment.to_dict())
+            file_bytes = validate_pdf(attachment.to_dict(), deadline)
             logger.info(f"PDF validation successful for user {user_id}: {len(file_bytes)} bytes")
         except PDFValidationError as e:
             logger.warning(f"PDF validation failed for user {user_id}: {str(e)}")
@@ -56,7 +61,10 @@ def handle_upload_command(interaction_data):
         
         # save to DynamoDB
         logger.info(f"Saving metadata to DynamoDB for user {user_id}")
-        success = save_db_resume(pdf_url, attachment.filename, user_id, "v1")
+        content_hash = hash_pdf_bytes(file_bytes)
+        page_fingerprints = fingerprint_pdf_pages(file_bytes, deadline)
+        success = save_db_resume(pdf_url, attachment.filename, user_id, "v1", content_hash,
+                                 serialize_page_fingerprints(page_fingerprints))
         if not success:
             logger.error(f"DynamoDB save failed for user {user_id}, cleaning up S3 file")
             # cleanup S3 file if DB save failed
@@ -66,6 +74,9 @@ def handle_upload_command(interaction_data):
                 "Failed to save resume metadata. 😔"
             )
         
+        remember_pdf_hash(pdf_url, content_hash)
+        remember_pdf_page_fingerprints(pdf_url, page_fingerprints)
+        
         # generate Hypothes.is annotation link
         annotation_link = f"https://via.hypothes.is/{pdf_url}"
         logger.info(f"Upload workflow completed successfully for user {user_id}")
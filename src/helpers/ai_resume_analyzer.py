@@ -1,9 +1,21 @@
 import os
+import json
+import time
 import logging
-from openai import OpenAI
-from typing import List, Dict, Optional
+from openai import OpenAI, APIStatusError
+from typing import List, Dict, Optional, Callable
 import dotenv
 from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
+from helpers.pdf_extractor import extract_relevant_sections, segment_resume_sections
+from helpers.get_pdf_diff import diff_text_lines
+from helpers.diff_engine import normalize_line
+from helpers.anchor_index import AnchorIndex, collapse_whitespace
+from helpers.model_router import ModelRouter, RouteDecision
+from helpers.circuit_breaker import get_circuit_breaker
+from helpers.ai_review_cache import build_ai_review_cache_key, get_cached_ai_review_result, cache_ai_review_result
+from helpers.http_replay import get_http_replay_mode, wrap_openai_client, REPLAY
+from helpers.tracing import traced
 
 dotenv.load_dotenv()
 logger = logging.getLogger(__name__)
@@ -18,53 +30,427 @@ class ResumeAnalysisResponse(BaseModel):
     feedback: List[FeedbackItem]
 
 
-class ResumeAnalyzer:
+class FeedbackStreamParser:
+    """
+    Incrementally scans streamed ResumeAnalysisResponse JSON and yields each
+    FeedbackItem once its object inside the "feedback" array is complete.
+    """
+    
     def __init__(self):
-        if not os.getenv('OPENAI_API_KEY'):
-            raise ValueError("OPENAI_API_KEY environment variable is not set")
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.content = ""
+        self.position = 0
+        self.stack = []
+        self.in_string = False
+        self.escaped = False
+        self.item_start = None
+    
+    def feed(self, delta: str) -> List[FeedbackItem]:
+        self.content += delta
+        completed = []
+        
+        while self.position < len(self.content):
+            char = self.content[self.position]
+            
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in '{[':
+                # Items are objects nested directly in the top-level object's array
+                if char == '{' and self.stack == ['{', '[']:
+                    self.item_start = self.position
+                self.stack.append(char)
+            elif char in '}]':
+                if self.stack:
+                    self.stack.pop()
+                if char == '}' and self.stack == ['{', '['] and self.item_start is not None:
+                    item = self._parse_item(self.content[self.item_start:self.position + 1])
+                    if item:
+                        completed.append(item)
+                    self.item_start = None
+            
+            self.position += 1
+        
+        return completed
+    
+    def _parse_item(self, raw_item: str) -> Optional[FeedbackItem]:
+        try:
+            return FeedbackItem.model_validate(json.loads(raw_item))
+        except Exception as e:
+            logger.warning(f"Skipping malformed streamed feedback item: {str(e)}")
+            return None
+
+
+class ResumeAnalyzer:
+    # Bump whenever the system message or _create_analysis_prompt changes so cached reviews are invalidated
+    PROMPT_VERSION = "2"
+    RELEVANT_SECTIONS = ('experience', 'projects')
+    MIN_FEEDBACK_ITEMS = 8
+    MAX_FEEDBACK_ITEMS = 12
+    # A feedback item (quote plus comment) serializes to ~120 tokens; the rest is headroom and JSON framing
+    OUTPUT_TOKENS_PER_ITEM = 160
+    
+    def __init__(self, client=None, router: Optional[ModelRouter] = None):
+        # Any object exposing chat.completions.create can be injected, e.g. a local fake in benchmarks
+        if client is None:
+            if get_http_replay_mode() == REPLAY:
+                # Recorded completions stand in for OpenAI, so no key is needed
+                client = wrap_openai_client()
+            else:
+                if not os.getenv('OPENAI_API_KEY'):
+                    raise ValueError("OPENAI_API_KEY environment variable is not set")
+                client = wrap_openai_client(OpenAI(api_key=os.getenv('OPENAI_API_KEY')))
+        self.client = client
+        self.router = router or ModelRouter()
+        self.min_output_tokens = self.MAX_FEEDBACK_ITEMS * self.OUTPUT_TOKENS_PER_ITEM + 100
+        self.breaker = get_circuit_breaker('openai')
+        # 'single' sends one request; 'parallel' analyzes section chunks concurrently and merges the results
+        self.mode = os.getenv('AI_REVIEW_MODE', 'single').lower()
+        self.chunk_chars = int(os.getenv('AI_REVIEW_CHUNK_CHARS', '2500'))
+        self.max_parallel_requests = int(os.getenv('AI_REVIEW_MAX_PARALLEL', '4'))
+        # Above this fraction of changed relevant lines an incremental review falls back to a full one
+        self.incremental_max_change = float(os.getenv('AI_REVIEW_INCREMENTAL_MAX_CHANGE', '0.5'))
+        self._anchor_index = None
+        
+    def analyze_resume(self, resume_text: str, remaining_time_ms: Optional[float] = None) -> Optional[List[Dict]]:
         
-    def analyze_resume(self, resume_text: str) -> Optional[List[Dict]]:
+        if self.mode == 'parallel':
+            return self.analyze_resume_parallel(resume_text, remaining_time_ms)
         
         try:
             prompt = self._create_analysis_prompt(resume_text)
+            route = self.router.choose(len(prompt), remaining_time_ms, self.min_output_tokens)
             
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert resume reviewer and career coach. Provide specific, actionable feedback."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                response_format={
-                    "type": "json_schema",
-                    "json_schema": {
-                        "name": "resume_analysis",
-                        "schema": ResumeAnalysisResponse.model_json_schema()
-                    }
-                }
-            )
+            cache_key = build_ai_review_cache_key(resume_text, route.model, self.PROMPT_VERSION)
+            cached_feedback = self._get_cached_feedback(cache_key)
+            if cached_feedback:
+                return cached_feedback
             
-            content = response.choices[0].message.content
-            if not content:
-                logger.error("AI response is empty or invalid")
+            if self._out_of_time(route):
+                return None
+            
+            feedback_data = self._request_feedback(prompt, route)
+            if feedback_data is None:
                 return None
-                
-            feedback_data = ResumeAnalysisResponse.model_validate_json(content)
             
             logger.info(f"Generated {len(feedback_data.feedback)} feedback items")
             
+            if feedback_data.feedback:
+                cache_ai_review_result(cache_key, feedback_data.model_dump_json())
+            
             return [item.model_dump() for item in feedback_data.feedback]
         except Exception as e:
             logger.error(f"Error analyzing resume with AI: {str(e)}")
             return None
     
+    def analyze_resume_parallel(self, resume_text: str, remaining_time_ms: Optional[float] = None) -> Optional[List[Dict]]:
+        """
+        Splits the relevant sections into chunks, analyzes them with concurrent
+        requests and merges the feedback back into the usual 8-12 item budget.
+        """
+        try:
+            chunks = self._create_analysis_chunks(resume_text)
+            if len(chunks) <= 1:
+                # Nothing to parallelise, a single request is cheaper
+                prompts = [self._create_analysis_prompt(resume_text)]
+            else:
+                # Split the overall budget across chunks, rounding up so the merge has enough to pick from
+                max_items = -(-self.MAX_FEEDBACK_ITEMS // len(chunks))
+                min_items = max(1, self.MIN_FEEDBACK_ITEMS // len(chunks))
+                prompts = [self._build_prompt(chunk, f"{min_items}-{max_items}") for chunk in chunks]
+            
+            # Requests run concurrently, so the largest chunk drives the routing decision
+            route = self.router.choose(max(len(prompt) for prompt in prompts), remaining_time_ms, self.min_output_tokens)
+            
+            cache_key = build_ai_review_cache_key(resume_text, route.model, f"{self.PROMPT_VERSION}-parallel")
+            cached_feedback = self._get_cached_feedback(cache_key)
+            if cached_feedback:
+                return cached_feedback
+            
+            if self._out_of_time(route):
+                return None
+            
+            with ThreadPoolExecutor(max_workers=min(len(prompts), self.max_parallel_requests)) as executor:
+                responses = list(executor.map(lambda prompt: self._request_feedback_safely(prompt, route), prompts))
+            chunk_results = [response.feedback if response else None for response in responses]
+            
+            successful_results = [result for result in chunk_results if result is not None]
+            if not successful_results:
+                logger.error("All parallel AI analysis requests failed")
+                return None
+            
+            merged_feedback = self._merge_feedback(successful_results)
+            logger.info(f"Merged {sum(len(result) for result in successful_results)} feedback items from "
+                        f"{len(successful_results)}/{len(chunk_results)} chunk(s) into {len(merged_feedback)}")
+            
+            # Only cache complete results so a partial failure is retried next time
+            if merged_feedback and len(successful_results) == len(chunk_results):
+                cache_ai_review_result(cache_key, ResumeAnalysisResponse(feedback=merged_feedback).model_dump_json())
+            
+            return [item.model_dump() for item in merged_feedback]
+        except Exception as e:
+            logger.error(f"Error analyzing resume with parallel AI requests: {str(e)}")
+            return None
+    
+    def analyze_resume_incremental(self, previous_text: str, previous_feedback: List[Dict], resume_text: str,
+                                   remaining_time_ms: Optional[float] = None) -> Optional[List[Dict]]:
+        """
+        Reviews only the lines added since the previous review and carries forward
+        previous feedback whose quoted text is still present in the new version.
+        
+        Returns:
+            Merged feedback items, or None when a full review should be run instead
+        """
+        try:
+            # diff_text_lines returns normalized lines, so compare against the same form
+            relevant_lines = [normalize_line(line) for line in extract_relevant_sections(resume_text, self.RELEVANT_SECTIONS).split('\n') if line.strip()]
+            if not relevant_lines:
+                return None
+            
+            relevant_line_set = set(relevant_lines)
+            added_lines = [line for line in diff_text_lines(previous_text, resume_text)['added_lines'] if line in relevant_line_set]
+            
+            change_ratio = len(added_lines) / len(relevant_lines)
+            if change_ratio > self.incremental_max_change:
+                logger.info(f"Resume changed too much for an incremental review ({change_ratio:.0%}), running full review")
+                return None
+            
+            normalized_text = ' '.join(resume_text.lower().split())
+            carried_feedback = []
+            for item in previous_feedback:
+                try:
+                    feedback_item = FeedbackItem.model_validate(item)
+                except Exception:
+                    continue
+                if ' '.join(feedback_item.selected_text.lower().split()) in normalized_text:
+                    carried_feedback.append(feedback_item)
+            
+            logger.info(f"Incremental review: {len(added_lines)} changed line(s), {len(carried_feedback)}/{len(previous_feedback)} prior item(s) still valid")
+            
+            if not added_lines:
+                if not carried_feedback:
+                    # Nothing new to review and nothing left to carry over; an empty result would read as a failure
+                    return None
+                return [item.model_dump() for item in carried_feedback[:self.MAX_FEEDBACK_ITEMS]]
+            
+            max_new_items = max(2, self.MAX_FEEDBACK_ITEMS - len(carried_feedback))
+            prompt = self._build_prompt('\n'.join(added_lines), f"1-{max_new_items}")
+            route = self.router.choose(len(prompt), remaining_time_ms, self.min_output_tokens)
+            
+            if self._out_of_time(route):
+                # What still applies from the last review beats no review at all
+                if not carried_feedback:
+                    return None
+                return [item.model_dump() for item in carried_feedback[:self.MAX_FEEDBACK_ITEMS]]
+            
+            feedback_data = self._request_feedback(prompt, route)
+            if feedback_data is None:
+                return None
+            
+            # New feedback is listed first so it wins overlaps and ties during the merge
+            merged_feedback = self._merge_feedback([feedback_data.feedback, carried_feedback])
+            if not merged_feedback:
+                return None
+            return [item.model_dump() for item in merged_feedback]
+        except Exception as e:
+            logger.error(f"Error running incremental AI review: {str(e)}")
+            return None
+    
+    def analyze_resume_stream(self, resume_text: str, on_feedback_item: Callable[[Dict], None],
+                              remaining_time_ms: Optional[float] = None) -> Optional[List[Dict]]:
+        """
+        Streaming variant of analyze_resume. on_feedback_item is called with each
+        feedback item as soon as it is complete in the streamed JSON, so callers can
+        act on the first item without waiting for the whole completion.
+        """
+        try:
+            prompt = self._create_analysis_prompt(resume_text)
+            route = self.router.choose(len(prompt), remaining_time_ms, self.min_output_tokens)
+            
+            cache_key = build_ai_review_cache_key(resume_text, route.model, self.PROMPT_VERSION)
+            cached_feedback = self._get_cached_feedback(cache_key)
+            if cached_feedback:
+                for item in cached_feedback:
+                    on_feedback_item(item)
+                return cached_feedback
+            
+            if self._out_of_time(route):
+                return None
+            
+            self.breaker.check()
+            start_time = time.monotonic()
+            parser = FeedbackStreamParser()
+            try:
+                stream = self.client.chat.completions.create(
+                    stream=True,
+                    **self._create_completion_request(prompt, route)
+                )
+                
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    for item in parser.feed(delta):
+                        on_feedback_item(item.model_dump())
+            except Exception as e:
+                self._record_openai_error(e)
+                raise
+            
+            self.breaker.record_success()
+            self.router.record_latency(route.model, (time.monotonic() - start_time) * 1000)
+            
+            if not parser.content:
+                logger.error("AI response is empty or invalid")
+                return None
+            
+            feedback_data = ResumeAnalysisResponse.model_validate_json(parser.content)
+            
+            logger.info(f"Streamed {len(feedback_data.feedback)} feedback items")
+            
+            if feedback_data.feedback:
+                cache_ai_review_result(cache_key, feedback_data.model_dump_json())
+            
+            return [item.model_dump() for item in feedback_data.feedback]
+        except Exception as e:
+            logger.error(f"Error streaming resume analysis with AI: {str(e)}")
+            return None
+    
+    @traced('openai.chat_completion')
+    def _request_feedback(self, prompt: str, route: RouteDecision) -> Optional[ResumeAnalysisResponse]:
+        # Raises CircuitOpenError straight away while OpenAI is failing
+        self.breaker.check()
+        start_time = time.monotonic()
+        try:
+            response = self.client.chat.completions.create(**self._create_completion_request(prompt, route))
+        except Exception as e:
+            self._record_openai_error(e)
+            raise
+        self.breaker.record_success()
+        self.router.record_latency(route.model, (time.monotonic() - start_time) * 1000)
+        
+        content = response.choices[0].message.content
+        if not content:
+            logger.error("AI response is empty or invalid")
+            return None
+        
+        return ResumeAnalysisResponse.model_validate_json(content)
+    
+    def _out_of_time(self, route: RouteDecision) -> bool:
+        # A request started with no budget left would only hit its timeout and count against the breaker
+        if route.budget_ms > 0:
+            return False
+        logger.warning(f"Skipping AI request to {route.model}: {route.budget_ms:.0f}ms left after the safety margin")
+        return True
+    
+    def _record_openai_error(self, error: Exception):
+        # Bad requests mean our input was rejected, not that OpenAI is unhealthy
+        if isinstance(error, APIStatusError):
+            self.breaker.record_status(error.status_code)
+        else:
+            self.breaker.record_failure()
+    
+    def _request_feedback_safely(self, prompt: str, route: RouteDecision) -> Optional[ResumeAnalysisResponse]:
+        # Used by the parallel path so one failed chunk doesn't discard the others
+        try:
+            return self._request_feedback(prompt, route)
+        except Exception as e:
+            logger.error(f"Error analyzing resume chunk with AI: {str(e)}")
+            return None
+    
+    def _create_analysis_chunks(self, resume_text: str) -> List[str]:
+        sections = [section for section in segment_resume_sections(resume_text) if section.name in self.RELEVANT_SECTIONS]
+        section_texts = [section.text.strip() for section in sections] or [resume_text]
+        
+        chunks = []
+        for section_text in section_texts:
+            # Long sections are split further on line boundaries
+            current_lines = []
+            current_length = 0
+            for line in section_text.split('\n'):
+                if current_lines and current_length + len(line) > self.chunk_chars:
+                    chunks.append('\n'.join(current_lines))
+                    current_lines = []
+                    current_length = 0
+                current_lines.append(line)
+                current_length += len(line) + 1
+            if current_lines:
+                chunks.append('\n'.join(current_lines))
+        
+        return [chunk for chunk in chunks if chunk.strip()]
+    
+    def _merge_feedback(self, chunk_results: List[List[FeedbackItem]]) -> List[FeedbackItem]:
+        merged = []
+        seen_texts = []
+        
+        # Round-robin across chunks so every section keeps a share of the budget
+        longest = max(len(result) for result in chunk_results)
+        for index in range(longest):
+            for result in chunk_results:
+                if index >= len(result) or len(merged) >= self.MAX_FEEDBACK_ITEMS:
+                    continue
+                item = result[index]
+                normalized = ' '.join(item.selected_text.lower().split())
+                if not normalized:
+                    continue
+                # Skip duplicates and quotes that overlap feedback already kept
+                if any(normalized in seen or seen in normalized for seen in seen_texts):
+                    continue
+                seen_texts.append(normalized)
+                merged.append(item)
+        
+        return merged
+    
+    def _get_cached_feedback(self, cache_key: str) -> Optional[List[Dict]]:
+        cached_result = get_cached_ai_review_result(cache_key)
+        if not cached_result:
+            return None
+        
+        try:
+            feedback_data = ResumeAnalysisResponse.model_validate_json(cached_result)
+            logger.info(f"Returning {len(feedback_data.feedback)} cached feedback items")
+            return [item.model_dump() for item in feedback_data.feedback]
+        except Exception as e:
+            logger.warning(f"Ignoring invalid cached AI review: {str(e)}")
+            return None
+    
+    def _create_completion_request(self, prompt: str, route: RouteDecision) -> Dict:
+        return {
+            "model": route.model,
+            "max_tokens": route.max_output_tokens,
+            # Give up in time to post annotations instead of running into the invocation timeout
+            "timeout": max(1.0, route.budget_ms / 1000),
+            "messages": [
+                {"role": "system", "content": "You are an expert resume reviewer and career coach. Provide specific, actionable feedback."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "resume_analysis",
+                    "schema": ResumeAnalysisResponse.model_json_schema()
+                }
+            }
+        }
+    
     def _create_analysis_prompt(self, resume_text: str) -> str:
+        # Only the Experience and Projects sections are reviewed, so only they are sent
+        relevant_text = extract_relevant_sections(resume_text, self.RELEVANT_SECTIONS)
+        return self._build_prompt(relevant_text, f"{self.MIN_FEEDBACK_ITEMS}-{self.MAX_FEEDBACK_ITEMS}")
+    
+    def _build_prompt(self, relevant_text: str, item_range: str) -> str:
         return f"""
 Analyze this resume and provide specific, actionable feedback. For each piece of feedback, identify the exact text from the resume that you're commenting on.
 
 Resume Content:
-{resume_text}
+{relevant_text}
 
 Please respond with a JSON object in this exact format:
 {{
@@ -88,22 +474,49 @@ Guidelines:
 - Only focus on improvement areas, not general praise
 - Be specific in your comments, avoid generalizations and be critical
 - Use clear, concise language
-- Limit to 8-12 feedback items total
+- Limit to {item_range} feedback items total
 """
 
-    def format_feedback_for_hypothesis(self, feedback_items: List[Dict], resume_url: str) -> List[Dict]:
+    def _get_anchor_index(self, resume_text: str) -> AnchorIndex:
+        # Streaming formats one item at a time, so the index for the current text is reused
+        cached = self._anchor_index
+        if cached is None or cached.text != resume_text:
+            cached = AnchorIndex(resume_text)
+            self._anchor_index = cached
+        return cached
+    
+    def format_feedback_for_hypothesis(self, feedback_items: List[Dict], resume_url: str, resume_text: Optional[str] = None) -> List[Dict]:
         annotations = []
         
+        # With the resume text available, quotes are snapped to exact substrings and unanchorable feedback is dropped
+        anchor_index = self._get_anchor_index(resume_text) if resume_text else None
+        
         for item in feedback_items:
+            
+            selectors = [{
+                'type': 'TextQuoteSelector',
+                'exact': item.get('selected_text', '')
+            }]
+            
+            if anchor_index:
+                anchor = anchor_index.anchor(item.get('selected_text', ''))
+                if not anchor:
+                    logger.warning(f"Dropping feedback that could not be anchored: {item.get('selected_text', '')[:50]}")
+                    continue
+                # Hypothesis anchors against PDF.js text, whose line breaks and offsets differ from PyPDF2's,
+                # so only a whitespace-collapsed quote is sent and no TextPositionSelector
+                selectors = [{
+                    'type': 'TextQuoteSelector',
+                    'exact': collapse_whitespace(anchor['exact']).strip(),
+                    'prefix': collapse_whitespace(anchor['prefix']),
+                    'suffix': collapse_whitespace(anchor['suffix'])
+                }]
 
             annotation = {
                 'uri': resume_url,
                 'target': [{
                     'source': resume_url,
-                    'selector': [{
-                        'type': 'TextQuoteSelector',
-                        'exact': item.get('selected_text', '')
-                    }]
+                    'selector': selectors
                 }],
                 'text': f"{item.get('comment', '')}",
                 'tags': ['ai-review'],
@@ -126,11 +539,27 @@ Guidelines:
 resume_analyzer = ResumeAnalyzer()
 
 
-def analyze_resume_text(resume_text: str) -> Optional[List[Dict]]:
+@traced()
+def analyze_resume_text(resume_text: str, remaining_time_ms: Optional[float] = None) -> Optional[List[Dict]]:
     """Convenience function for analyzing resume text"""
-    return resume_analyzer.analyze_resume(resume_text)
+    return resume_analyzer.analyze_resume(resume_text, remaining_time_ms)
+
+
+@traced()
+def analyze_resume_text_incremental(previous_text: str, previous_feedback: List[Dict], resume_text: str,
+                                    remaining_time_ms: Optional[float] = None) -> Optional[List[Dict]]:
+    """Convenience function for reviewing only what changed since the previous review"""
+    return resume_analyzer.analyze_resume_incremental(previous_text, previous_feedback, resume_text, remaining_time_ms)
+
+
+@traced()
+def analyze_resume_text_stream(resume_text: str, on_feedback_item: Callable[[Dict], None],
+                               remaining_time_ms: Optional[float] = None) -> Optional[List[Dict]]:
+    """Convenience function for analyzing resume text with streamed feedback items"""
+    return resume_analyzer.analyze_resume_stream(resume_text, on_feedback_item, remaining_time_ms)
 
 
-def format_feedback_for_annotations(feedback_items: List[Dict], resume_url: str) -> List[Dict]:
+@traced()
+def format_feedback_for_annotations(feedback_items: List[Dict], resume_url: str, resume_text: Optional[str] = None) -> List[Dict]:
     """Convenience function for formatting feedback as annotations"""
-    return resume_analyzer.format_feedback_for_hypothesis(feedback_items, resume_url)
\ No newline at end of file
+    return resume_analyzer.format_feedback_for_hypothesis(feedback_items, resume_url, resume_text)
\ No newline at end of file
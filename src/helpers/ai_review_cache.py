@@ -0,0 +1,107 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+from aws.dynamo import get_cached_ai_review, save_cached_ai_review
+import dotenv
+
+dotenv.load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+class AIReviewCache:
+    """
+    Two-tier cache of validated AI review results.
+    A bounded in-memory LRU serves warm containers; DynamoDB persists results across invocations.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv('AI_REVIEW_CACHE_ENABLED', 'true').lower() == 'true'
+        self.ttl_seconds = float(os.getenv('AI_REVIEW_CACHE_TTL_HOURS', '168')) * 3600
+        self.max_entries = int(os.getenv('AI_REVIEW_CACHE_MAX_ENTRIES', '128'))
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def build_cache_key(self, resume_text: str, model: str, prompt_version: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, prompt_version, resume_text):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def get(self, cache_key: str) -> Optional[str]:
+        """Returns the cached result JSON, or None on a miss or expired entry"""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+
+        with self.lock:
+            entry = self.entries.get(cache_key)
+            if entry:
+                result_json, expires_at = entry
+                if expires_at > now:
+                    self.entries.move_to_end(cache_key)
+                    logger.info(f"AI review cache hit (memory): {cache_key[:12]}")
+                    return result_json
+                del self.entries[cache_key]
+
+        try:
+            item = get_cached_ai_review(cache_key)
+            if not item or 'result' not in item:
+                return None
+
+            expires_at = float(item.get('expires_at', 0))
+            if expires_at <= now:
+                # DynamoDB TTL deletion is lazy, so expired items can still be returned
+                return None
+
+            self._remember(cache_key, item['result'], expires_at)
+            logger.info(f"AI review cache hit (dynamo): {cache_key[:12]}")
+            return item['result']
+
+        except Exception as e:
+            logger.error(f"Error reading AI review cache: {str(e)}")
+            return None
+
+    def put(self, cache_key: str, result_json: str) -> bool:
+        if not self.enabled:
+            return False
+
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(cache_key, result_json, expires_at)
+
+        try:
+            return save_cached_ai_review(cache_key, result_json, expires_at)
+        except Exception as e:
+            logger.error(f"Error writing AI review cache: {str(e)}")
+            return False
+
+    def _remember(self, cache_key: str, result_json: str, expires_at: float):
+        with self.lock:
+            self.entries[cache_key] = (result_json, expires_at)
+            self.entries.move_to_end(cache_key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+# Global instance
+ai_review_cache = AIReviewCache()
+
+
+def build_ai_review_cache_key(resume_text, model, prompt_version):
+    """Convenience function for building an AI review cache key"""
+    return ai_review_cache.build_cache_key(resume_text, model, prompt_version)
+
+
+def get_cached_ai_review_result(cache_key):
+    """Convenience function for reading a cached AI review result"""
+    return ai_review_cache.get(cache_key)
+
+
+def cache_ai_review_result(cache_key, result_json):
+    """Convenience function for caching an AI review result"""
+    return ai_review_cache.put(cache_key, result_json)
@@ -0,0 +1,136 @@
+import re
+import logging
+from difflib import SequenceMatcher
+from collections import defaultdict, Counter
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Single-character substitutions keep normalized and original offsets aligned 1:1
+CHARACTER_NORMALIZATION = str.maketrans({
+    '\u2018': "'", '\u2019': "'", '\u201c': '"', '\u201d': '"',
+    '\u2013': '-', '\u2014': '-', '\u2022': '-', '\u00a0': ' ',
+})
+
+WORD_PATTERN = re.compile(r'\S+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def collapse_whitespace(text: str) -> str:
+    """Replaces each whitespace run, including PyPDF2's line breaks, with a single space"""
+    return WHITESPACE_PATTERN.sub(' ', text or '')
+
+
+class AnchorIndex:
+    """
+    Word n-gram index over extracted resume text used to snap AI-quoted text
+    onto an exact substring before it is sent to Hypothesis as a selector.
+    """
+
+    def __init__(self, text: str, ngram_size: int = 3, context_chars: int = 32, min_score: float = 0.8):
+        self.text = text or ""
+        self.ngram_size = ngram_size
+        self.context_chars = context_chars
+        self.min_score = min_score
+
+        # Normalized text with whitespace runs collapsed, plus a map back to original offsets
+        normalized_chars = []
+        self.offsets = []
+        previous_space = True
+        for index, char in enumerate(self.text.translate(CHARACTER_NORMALIZATION)):
+            lowered = char.lower()
+            char = lowered if len(lowered) == 1 else char
+            if char.isspace():
+                if previous_space:
+                    continue
+                char = ' '
+                previous_space = True
+            else:
+                previous_space = False
+            normalized_chars.append(char)
+            self.offsets.append(index)
+        self.normalized_text = ''.join(normalized_chars)
+
+        self.tokens = [(match.group(), match.start(), match.end()) for match in WORD_PATTERN.finditer(self.normalized_text)]
+        self.ngrams = defaultdict(list)
+        for position in range(len(self.tokens) - ngram_size + 1):
+            self.ngrams[self._ngram_at(self.tokens, position)].append(position)
+
+    def anchor(self, quote: str) -> Optional[Dict]:
+        """
+        Returns the exact matching substring with its offsets and surrounding context,
+        or None when the quote cannot be located in the text.
+        """
+        if not quote or not quote.strip():
+            return None
+
+        # Exact match in the original text
+        start = self.text.find(quote)
+        if start != -1:
+            return self._build_anchor(start, start + len(quote), 1.0)
+
+        normalized_quote = ' '.join(quote.translate(CHARACTER_NORMALIZATION).lower().split())
+
+        # Whitespace and punctuation-insensitive match
+        normalized_start = self.normalized_text.find(normalized_quote)
+        if normalized_start != -1:
+            return self._build_normalized_anchor(normalized_start, normalized_start + len(normalized_quote), 1.0)
+
+        return self._fuzzy_anchor(normalized_quote)
+
+    def _fuzzy_anchor(self, normalized_quote: str) -> Optional[Dict]:
+        quote_tokens = [(match.group(), match.start(), match.end()) for match in WORD_PATTERN.finditer(normalized_quote)]
+        if len(quote_tokens) < self.ngram_size:
+            return None
+
+        # Each shared n-gram votes for the text position where the quote would start
+        votes = Counter()
+        for quote_position in range(len(quote_tokens) - self.ngram_size + 1):
+            for text_position in self.ngrams.get(self._ngram_at(quote_tokens, quote_position), []):
+                votes[text_position - quote_position] += 1
+
+        best = None
+        for candidate_start, _ in votes.most_common(5):
+            for start_shift in (-1, 0, 1):
+                for length_shift in (-2, -1, 0, 1, 2):
+                    first = max(0, candidate_start + start_shift)
+                    last = min(len(self.tokens), first + len(quote_tokens) + length_shift)
+                    if last <= first:
+                        continue
+                    window_start = self.tokens[first][1]
+                    window_end = self.tokens[last - 1][2]
+                    score = SequenceMatcher(None, normalized_quote, self.normalized_text[window_start:window_end]).ratio()
+                    if best is None or score > best[0]:
+                        best = (score, window_start, window_end)
+
+        if best is None or best[0] < self.min_score:
+            return None
+
+        # Trim bullets and punctuation picked up at the window edges
+        score, window_start, window_end = best
+        while window_start < window_end and not self.normalized_text[window_start].isalnum():
+            window_start += 1
+        while window_end > window_start and not self.normalized_text[window_end - 1].isalnum():
+            window_end -= 1
+        if window_start == window_end:
+            return None
+
+        return self._build_normalized_anchor(window_start, window_end, score)
+
+    def _build_normalized_anchor(self, normalized_start: int, normalized_end: int, score: float) -> Dict:
+        start = self.offsets[normalized_start]
+        end = self.offsets[normalized_end - 1] + 1
+        return self._build_anchor(start, end, score)
+
+    def _build_anchor(self, start: int, end: int, score: float) -> Dict:
+        return {
+            'exact': self.text[start:end],
+            'start': start,
+            'end': end,
+            'prefix': self.text[max(0, start - self.context_chars):start],
+            'suffix': self.text[end:end + self.context_chars],
+            'score': score
+        }
+
+    def _ngram_at(self, tokens: List[Tuple[str, int, int]], position: int) -> Tuple[str, ...]:
+        return tuple(token[0] for token in tokens[position:position + self.ngram_size])
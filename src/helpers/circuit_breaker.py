@@ -0,0 +1,209 @@
+import os
+import time
+import logging
+import threading
+import requests
+from collections import deque
+from typing import Dict, Optional
+import dotenv
+
+dotenv.load_dotenv()
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Names shown to users when a dependency is failing fast
+DEPENDENCY_LABELS = {
+    'openai': 'AI review',
+    'hypothesis': 'Hypothes.is',
+    'discord': 'Discord',
+    'pdf_storage': 'Resume storage'
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the dependency's circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open, retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker for a single downstream dependency.
+    Opens when the failure rate over a rolling window crosses the threshold, rejects calls
+    while open, then lets a limited number of trial calls through (half-open) to probe recovery.
+    """
+
+    def __init__(self, name: str, failure_rate_threshold: Optional[float] = None, minimum_calls: Optional[int] = None,
+                 window_seconds: Optional[float] = None, open_seconds: Optional[float] = None,
+                 half_open_max_calls: Optional[int] = None):
+        self.name = name
+        self.label = DEPENDENCY_LABELS.get(name, name)
+        self.failure_rate_threshold = failure_rate_threshold or float(os.getenv('CIRCUIT_BREAKER_FAILURE_RATE', '0.5'))
+        # Don't judge a dependency on a handful of calls
+        self.minimum_calls = minimum_calls or int(os.getenv('CIRCUIT_BREAKER_MIN_CALLS', '5'))
+        self.window_seconds = window_seconds or float(os.getenv('CIRCUIT_BREAKER_WINDOW_SECONDS', '60'))
+        self.open_seconds = open_seconds or float(os.getenv('CIRCUIT_BREAKER_OPEN_SECONDS', '30'))
+        self.half_open_max_calls = half_open_max_calls or int(os.getenv('CIRCUIT_BREAKER_HALF_OPEN_CALLS', '1'))
+
+        self.state = CLOSED
+        self.calls = deque()
+        self.opened_at = 0.0
+        self.trial_calls = 0
+        self.trial_started_at = 0.0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Returns False when the call should fail fast. Every allowed call must be followed by a record_* call or release()."""
+        with self.lock:
+            now = time.monotonic()
+            self._refresh_state_locked(now)
+
+            if self.state == CLOSED:
+                return True
+
+            if self.state == HALF_OPEN:
+                # A trial call that never reported back must not wedge the breaker half-open
+                if self.trial_calls >= self.half_open_max_calls and now - self.trial_started_at > self.open_seconds:
+                    self.trial_calls = 0
+                if self.trial_calls < self.half_open_max_calls:
+                    self.trial_calls += 1
+                    self.trial_started_at = now
+                    return True
+
+            self.rejected += 1
+            return False
+
+    def check(self):
+        """Like allow_request, but raises CircuitOpenError instead of returning False"""
+        if not self.allow_request():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def record_success(self):
+        with self.lock:
+            if self.state == HALF_OPEN:
+                logger.info(f"Circuit {self.name} closed after successful trial call")
+                self.state = CLOSED
+                self.calls.clear()
+                self.trial_calls = 0
+                return
+            self._record_locked(True)
+
+    def record_failure(self):
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self._open_locked(time.monotonic())
+                return
+            self._record_locked(False)
+
+    def record_status(self, status_code: int):
+        """Records an HTTP response. Server errors and throttling count as failures, client errors do not."""
+        if status_code >= 500 or status_code == 429:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def record_exception(self, error: Exception, deadline_limited: bool = False):
+        """Records a failed HTTP call. Timeouts we shortened to fit the request deadline say nothing about the dependency."""
+        if deadline_limited and isinstance(error, requests.Timeout):
+            self.release()
+        else:
+            self.record_failure()
+
+    def release(self):
+        """Forgets an allowed call without counting it either way"""
+        with self.lock:
+            if self.state == HALF_OPEN and self.trial_calls > 0:
+                self.trial_calls -= 1
+
+    def is_open(self) -> bool:
+        with self.lock:
+            self._refresh_state_locked(time.monotonic())
+            return self.state == OPEN
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker will allow a trial call"""
+        with self.lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            now = time.monotonic()
+            self._refresh_state_locked(now)
+            self._prune_locked(now)
+            failures = sum(1 for _, success in self.calls if not success)
+            return {
+                'state': self.state,
+                'calls': len(self.calls),
+                'failures': failures,
+                'failure_rate': failures / len(self.calls) if self.calls else 0.0,
+                'rejected': self.rejected
+            }
+
+    def _record_locked(self, success: bool):
+        now = time.monotonic()
+        self.calls.append((now, success))
+        self._prune_locked(now)
+
+        if self.state != CLOSED or len(self.calls) < self.minimum_calls:
+            return
+
+        failures = sum(1 for _, call_success in self.calls if not call_success)
+        if failures / len(self.calls) >= self.failure_rate_threshold:
+            self._open_locked(now)
+
+    def _open_locked(self, now: float):
+        logger.warning(f"Circuit {self.name} opened, failing fast for {self.open_seconds:.0f}s")
+        self.state = OPEN
+        self.opened_at = now
+        self.trial_calls = 0
+        self.calls.clear()
+
+    def _refresh_state_locked(self, now: float):
+        if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+            logger.info(f"Circuit {self.name} half-open, allowing trial calls")
+            self.state = HALF_OPEN
+            self.trial_calls = 0
+
+    def _prune_locked(self, now: float):
+        while self.calls and now - self.calls[0][0] > self.window_seconds:
+            self.calls.popleft()
+
+
+# Module-level registry so breaker state survives across warm Lambda invocations
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Returns the process-wide circuit breaker for a dependency, creating it on first use"""
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name)
+            _circuit_breakers[name] = breaker
+        return breaker
+
+
+def get_open_circuit(*names: str) -> Optional[CircuitBreaker]:
+    """Returns the first of the named breakers that is currently open, or None"""
+    for name in names:
+        breaker = get_circuit_breaker(name)
+        if breaker.is_open():
+            return breaker
+    return None
+
+
+def get_circuit_breaker_stats() -> Dict[str, Dict]:
+    """Convenience function for reporting the state of every breaker"""
+    with _circuit_breakers_lock:
+        breakers = list(_circuit_breakers.values())
+    return {breaker.name: breaker.get_stats() for breaker in breakers}
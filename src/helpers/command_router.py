@@ -0,0 +1,186 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+from helpers.deadline import Deadline
+import dotenv
+
+dotenv.load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CommandLatencyModel:
+    """Prior latency estimate for a command, built from the work its inputs imply"""
+    base_ms: float                     # DynamoDB/S3 round trips and response formatting
+    per_attachment_mb_ms: float = 0.0  # Downloading and validating the attached PDF
+    per_download_ms: float = 0.0       # Each stored PDF fetched and parsed
+    cached_ms: Optional[float] = None  # Whole command when a cached result exists
+
+
+# Commands that may be answered inline or deferred; anything not listed here always runs inline
+DEFAULT_LATENCY_MODELS = {
+    'upload': CommandLatencyModel(base_ms=700, per_attachment_mb_ms=500),
+    'update': CommandLatencyModel(base_ms=900, per_attachment_mb_ms=500, per_download_ms=700),
+    'get_resume_diff': CommandLatencyModel(base_ms=300, per_download_ms=700, cached_ms=300),
+    'get_annotations': CommandLatencyModel(base_ms=600),
+}
+
+# Commands that are never worth attempting inside the interaction window
+ALWAYS_ASYNC_COMMANDS = {'ai_review'}
+
+
+class CommandRouter:
+    """
+    Decides whether a command is answered within Discord's interaction window or deferred to the queue.
+    The prior for each command comes from its inputs (attachment size, PDFs to fetch, cached results)
+    and is scaled by the p95 of how far recent inline runs of that command were off from their prior.
+    Samples expire after max_sample_age_s: a command that is always deferred is never sampled inline,
+    so without expiry a few slow runs would keep it deferred for the life of the container.
+    """
+
+    def __init__(self, models: Optional[Dict[str, CommandLatencyModel]] = None, sync_budget_ms: Optional[float] = None,
+                 window_size: int = 50, max_sample_age_s: Optional[float] = None):
+        self.models = models or dict(DEFAULT_LATENCY_MODELS)
+        self.enabled = os.getenv('ADAPTIVE_COMMAND_ROUTING', 'true').lower() == 'true'
+        # Predicted latency above this is deferred; kept below the 2.5s interaction deadline for safety
+        self.sync_budget_ms = sync_budget_ms or float(os.getenv('SYNC_LATENCY_BUDGET_MS', '2000'))
+        self.window_size = window_size
+        self.max_sample_age_s = max_sample_age_s or float(os.getenv('COMMAND_LATENCY_SAMPLE_MAX_AGE_S', '300'))
+        self.cache_probes: Dict[str, Callable[[Dict[str, Any]], bool]] = {}
+        self.ratios: Dict[str, deque] = {}
+        self.decisions = {'sync': 0, 'deferred': 0}
+        self.lock = threading.Lock()
+
+    def register_cache_probe(self, command_name: str, probe: Callable[[Dict[str, Any]], bool]):
+        """probe(raw_request) returns True when the command's result can be served from a cache"""
+        self.cache_probes[command_name] = probe
+
+    def should_defer(self, command_name: str, raw_request: Dict[str, Any], deadline: Optional[Deadline] = None) -> bool:
+        if command_name in ALWAYS_ASYNC_COMMANDS:
+            return True
+        if command_name not in self.models:
+            return False
+        if not self.enabled:
+            # Previous behaviour: only update was deferred
+            return command_name == 'update'
+
+        predicted_ms = self.predict_latency_ms(command_name, raw_request)
+        budget_ms = self.sync_budget_ms
+        if deadline is not None:
+            budget_ms = min(budget_ms, deadline.remaining_ms())
+
+        defer = predicted_ms > budget_ms
+        with self.lock:
+            self.decisions['deferred' if defer else 'sync'] += 1
+        logger.info(f"Predicted {command_name} at {predicted_ms:.0f}ms against {budget_ms:.0f}ms budget, "
+                    f"{'deferring' if defer else 'answering inline'}")
+        return defer
+
+    def predict_latency_ms(self, command_name: str, raw_request: Dict[str, Any]) -> float:
+        return self.estimate_prior_ms(command_name, raw_request) * self._p95_ratio(command_name)
+
+    def estimate_prior_ms(self, command_name: str, raw_request: Dict[str, Any]) -> float:
+        model = self.models[command_name]
+
+        if model.cached_ms is not None and self._is_cached(command_name, raw_request):
+            return model.cached_ms
+
+        attachment_mb = get_attachment_bytes(raw_request) / (1024 * 1024)
+        downloads = count_pdf_downloads(command_name, raw_request)
+        return model.base_ms + model.per_attachment_mb_ms * attachment_mb + model.per_download_ms * downloads
+
+    def record_latency(self, command_name: str, raw_request: Dict[str, Any], latency_ms: float):
+        """Records an inline run so future predictions are scaled by how far off the prior was"""
+        if command_name not in self.models:
+            return
+        prior_ms = self.estimate_prior_ms(command_name, raw_request)
+        if prior_ms <= 0:
+            return
+        with self.lock:
+            samples = self.ratios.setdefault(command_name, deque(maxlen=self.window_size))
+            samples.append((time.monotonic(), latency_ms / prior_ms))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = {'decisions': dict(self.decisions), 'commands': {}}
+            sample_counts = {name: len(self._live_samples_locked(name)) for name in self.ratios}
+        for command_name in self.models:
+            stats['commands'][command_name] = {
+                'samples': sample_counts.get(command_name, 0),
+                'p95_ratio': self._p95_ratio(command_name)
+            }
+        return stats
+
+    def _p95_ratio(self, command_name: str) -> float:
+        # Never scale below the prior until there is enough data to trust it
+        with self.lock:
+            samples = sorted(ratio for _, ratio in self._live_samples_locked(command_name))
+        if len(samples) < 5:
+            return 1.0
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def _live_samples_locked(self, command_name: str) -> deque:
+        samples = self.ratios.get(command_name, deque())
+        # Appended in time order, so expired samples are always at the front
+        expires_before = time.monotonic() - self.max_sample_age_s
+        while samples and samples[0][0] < expires_before:
+            samples.popleft()
+        return samples
+
+    def _is_cached(self, command_name: str, raw_request: Dict[str, Any]) -> bool:
+        probe = self.cache_probes.get(command_name)
+        if probe is None:
+            return False
+        try:
+            return bool(probe(raw_request))
+        except Exception as e:
+            logger.error(f"Cache probe for {command_name} failed: {str(e)}")
+            return False
+
+
+def get_option_value(raw_request: Dict[str, Any], name: str) -> Any:
+    for option in raw_request.get('data', {}).get('options', []) or []:
+        if option.get('name') == name:
+            return option.get('value')
+    return None
+
+
+def get_attachment_bytes(raw_request: Dict[str, Any]) -> int:
+    attachments = raw_request.get('data', {}).get('resolved', {}).get('attachments', {}) or {}
+    return sum(int(attachment.get('size', 0) or 0) for attachment in attachments.values())
+
+
+def count_pdf_downloads(command_name: str, raw_request: Dict[str, Any]) -> int:
+    if command_name == 'get_resume_diff':
+        return 2
+    if command_name == 'update' and get_option_value(raw_request, 'show_diff'):
+        return 2
+    return 0
+
+
+# Global instance
+command_router = CommandRouter()
+
+
+def should_defer_command(command_name, raw_request, deadline=None):
+    """Convenience function for deciding whether to defer a command to the queue"""
+    return command_router.should_defer(command_name, raw_request, deadline)
+
+
+def record_command_latency(command_name, raw_request, latency_ms):
+    """Convenience function for recording an inline command's latency"""
+    return command_router.record_latency(command_name, raw_request, latency_ms)
+
+
+def register_cache_probe(command_name, probe):
+    """Convenience function for registering a cached-result check for a command"""
+    return command_router.register_cache_probe(command_name, probe)
+
+
+def get_command_router_stats():
+    """Convenience function for reporting routing decisions and latency calibration"""
+    return command_router.get_stats()
@@ -0,0 +1,78 @@
+import os
+import time
+from typing import Any, Optional
+import dotenv
+
+dotenv.load_dotenv()
+
+# Discord drops interactions that aren't answered within 3 seconds
+DISCORD_RESPONSE_BUDGET_MS = float(os.getenv('DISCORD_RESPONSE_BUDGET_MS', '2500'))
+# Used when a command job runs without a Lambda context (local executor, scripts)
+COMMAND_JOB_BUDGET_MS = float(os.getenv('COMMAND_JOB_BUDGET_MS', '60000'))
+# Kept back from a command job's processing so the Discord follow-up can still be sent
+FOLLOWUP_RESERVE_MS = float(os.getenv('COMMAND_FOLLOWUP_RESERVE_MS', '3000'))
+# Smallest timeout worth starting a network call with
+MIN_TIMEOUT_SECONDS = 0.2
+
+
+class DeadlineExceeded(Exception):
+    """Raised when there is not enough time left in the request to start an operation."""
+    pass
+
+
+class Deadline:
+    """
+    Request-scoped time budget. Created once per interaction or command job and passed
+    down to every I/O helper, which derives its timeouts from the time remaining.
+    """
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after_ms(cls, budget_ms: float) -> 'Deadline':
+        return cls(time.monotonic() + budget_ms / 1000)
+
+    @classmethod
+    def for_interaction(cls) -> 'Deadline':
+        return cls.after_ms(DISCORD_RESPONSE_BUDGET_MS)
+
+    @classmethod
+    def from_lambda_context(cls, context: Any) -> 'Deadline':
+        if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+            return cls.after_ms(context.get_remaining_time_in_millis())
+        return cls.after_ms(COMMAND_JOB_BUDGET_MS)
+
+    def remaining_ms(self) -> float:
+        return max(0.0, (self.expires_at - time.monotonic()) * 1000)
+
+    def expired(self) -> bool:
+        return self.remaining_ms() <= 0
+
+    def has_time_for(self, duration_ms: float) -> bool:
+        return self.remaining_ms() >= duration_ms
+
+    def reserve(self, duration_ms: float) -> 'Deadline':
+        """Returns a deadline that ends duration_ms earlier, keeping that time back for follow-up work"""
+        return Deadline(self.expires_at - duration_ms / 1000)
+
+    def timeout(self, default_seconds: float) -> float:
+        """Timeout for a single call: the default, clipped to the time remaining"""
+        remaining_seconds = self.remaining_ms() / 1000
+        if remaining_seconds < MIN_TIMEOUT_SECONDS:
+            raise DeadlineExceeded(f"Only {remaining_seconds * 1000:.0f}ms left in the request")
+        return min(default_seconds, remaining_seconds)
+
+
+def get_timeout(deadline: Optional[Deadline], default_seconds: float) -> float:
+    """Convenience function for helpers whose deadline is optional"""
+    if deadline is None:
+        return default_seconds
+    return deadline.timeout(default_seconds)
+
+
+def get_remaining_ms(deadline: Optional[Deadline]) -> Optional[float]:
+    """Convenience function returning the time left, or None when there is no deadline"""
+    if deadline is None:
+        return None
+    return deadline.remaining_ms()
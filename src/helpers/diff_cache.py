@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from aws.dynamo import get_cached_diff, save_cached_diff, get_all_user_resumes
+from helpers.diff_engine import get_diff_engine_signature
+from helpers.pdf_backends import get_pdf_text_backend_name
+from helpers.page_fingerprints import parse_page_fingerprints
+from helpers.tracing import traced
+import dotenv
+
+dotenv.load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Bump whenever diff_text_lines output changes so stored diffs are recomputed
+DIFF_FORMAT_VERSION = "4"
+
+
+class DiffCache:
+    """
+    Cache of line diffs keyed by the content hashes of the two PDFs.
+    A bounded in-memory LRU serves warm containers; DynamoDB persists diffs across invocations,
+    including the consecutive-version diffs precomputed after an update.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv('DIFF_CACHE_ENABLED', 'true').lower() == 'true'
+        self.ttl_seconds = float(os.getenv('DIFF_CACHE_TTL_HOURS', '168')) * 3600
+        self.max_entries = int(os.getenv('DIFF_CACHE_MAX_ENTRIES', '256'))
+        self.entries = OrderedDict()
+        # Stored resume URLs are immutable, so their content hash never changes
+        self.url_hashes = OrderedDict()
+        self.url_page_fingerprints = OrderedDict()
+        # Diffs from a different engine or text backend are treated as misses
+        self.diff_version = f"{DIFF_FORMAT_VERSION}:{get_diff_engine_signature()}:{get_pdf_text_backend_name()}"
+        self.lock = threading.Lock()
+
+    def hash_pdf_bytes(self, pdf_bytes: bytes) -> str:
+        return hashlib.sha256(pdf_bytes).hexdigest()
+
+    def remember_url_hash(self, pdf_url: str, content_hash: str):
+        if not pdf_url or not content_hash:
+            return
+        with self.lock:
+            self.url_hashes[pdf_url] = content_hash
+            self.url_hashes.move_to_end(pdf_url)
+            while len(self.url_hashes) > self.max_entries * 2:
+                self.url_hashes.popitem(last=False)
+
+    def get_url_hash(self, pdf_url: str) -> Optional[str]:
+        with self.lock:
+            return self.url_hashes.get(pdf_url)
+
+    def remember_url_page_fingerprints(self, pdf_url: str, page_fingerprints: Optional[List[str]]):
+        if not pdf_url or not page_fingerprints:
+            return
+        with self.lock:
+            self.url_page_fingerprints[pdf_url] = list(page_fingerprints)
+            self.url_page_fingerprints.move_to_end(pdf_url)
+            while len(self.url_page_fingerprints) > self.max_entries * 2:
+                self.url_page_fingerprints.popitem(last=False)
+
+    def get_url_page_fingerprints(self, pdf_url: str) -> Optional[List[str]]:
+        with self.lock:
+            return self.url_page_fingerprints.get(pdf_url)
+
+    def remember_user_resume_hashes(self, user_id: str):
+        """Learns the content hashes and page fingerprints stored with a user's versions, so their diffs can be looked up without downloading"""
+        try:
+            for resume in get_all_user_resumes(user_id):
+                self.remember_url_hash(resume.get('resume_url'), resume.get('content_hash'))
+                self.remember_url_page_fingerprints(resume.get('resume_url'), parse_page_fingerprints(resume.get('page_fingerprints')))
+        except Exception as e:
+            logger.error(f"Error loading resume hashes for user {user_id}: {str(e)}")
+
+    def has_cached(self, old_hash: Optional[str], new_hash: Optional[str]) -> bool:
+        """Memory-only check, cheap enough for request routing"""
+        if not self.enabled or not old_hash or not new_hash:
+            return False
+        with self.lock:
+            entry = self.entries.get((old_hash, new_hash))
+            return entry is not None and entry[1] > time.time()
+
+    def get(self, old_hash: Optional[str], new_hash: Optional[str]) -> Optional[Dict[str, List[str]]]:
+        """Returns the cached diff_text_lines result, or None on a miss or expired entry"""
+        if not self.enabled or not old_hash or not new_hash:
+            return None
+
+        cache_key = (old_hash, new_hash)
+        now = time.time()
+
+        with self.lock:
+            entry = self.entries.get(cache_key)
+            if entry:
+                diff_lines, expires_at = entry
+                if expires_at > now:
+                    self.entries.move_to_end(cache_key)
+                    logger.info(f"Diff cache hit (memory): {old_hash[:12]} -> {new_hash[:12]}")
+                    return diff_lines
+                del self.entries[cache_key]
+
+        try:
+            item = get_cached_diff(old_hash, new_hash)
+            if not item or 'result' not in item or item.get('diff_version') != self.diff_version:
+                return None
+
+            expires_at = float(item.get('expires_at', 0))
+            if expires_at <= now:
+                # DynamoDB TTL deletion is lazy, so expired items can still be returned
+                return None
+
+            diff_lines = json.loads(item['result'])
+            self._remember(cache_key, diff_lines, expires_at)
+            logger.info(f"Diff cache hit (dynamo): {old_hash[:12]} -> {new_hash[:12]}")
+            return diff_lines
+
+        except Exception as e:
+            logger.error(f"Error reading diff cache: {str(e)}")
+            return None
+
+    def put(self, old_hash: Optional[str], new_hash: Optional[str], diff_lines: Dict[str, List[str]]) -> bool:
+        if not self.enabled or not old_hash or not new_hash:
+            return False
+
+        expires_at = time.time() + self.ttl_seconds
+        self._remember((old_hash, new_hash), diff_lines, expires_at)
+
+        try:
+            return save_cached_diff(old_hash, new_hash, json.dumps(diff_lines), self.diff_version, expires_at)
+        except Exception as e:
+            logger.error(f"Error writing diff cache: {str(e)}")
+            return False
+
+    def _remember(self, cache_key, diff_lines: Dict[str, List[str]], expires_at: float):
+        with self.lock:
+            self.entries[cache_key] = (diff_lines, expires_at)
+            self.entries.move_to_end(cache_key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+# Global instance
+diff_cache = DiffCache()
+
+
+def hash_pdf_bytes(pdf_bytes):
+    """Convenience function for hashing PDF content"""
+    return diff_cache.hash_pdf_bytes(pdf_bytes)
+
+
+def remember_pdf_hash(pdf_url, content_hash):
+    """Convenience function for recording the content hash of a stored PDF URL"""
+    return diff_cache.remember_url_hash(pdf_url, content_hash)
+
+
+def get_known_pdf_hash(pdf_url):
+    """Convenience function for looking up a previously seen PDF URL's content hash"""
+    return diff_cache.get_url_hash(pdf_url)
+
+
+def remember_pdf_page_fingerprints(pdf_url, page_fingerprints):
+    """Convenience function for recording the page fingerprints of a stored PDF URL"""
+    return diff_cache.remember_url_page_fingerprints(pdf_url, page_fingerprints)
+
+
+def get_known_page_fingerprints(pdf_url):
+    """Convenience function for looking up a previously seen PDF URL's page fingerprints"""
+    return diff_cache.get_url_page_fingerprints(pdf_url)
+
+
+@traced()
+def remember_user_resume_hashes(user_id):
+    """Convenience function for loading the content hashes of a user's stored versions"""
+    return diff_cache.remember_user_resume_hashes(user_id)
+
+
+def has_cached_diff_for_urls(old_pdf_url, new_pdf_url):
+    """Convenience function for checking, without network calls, whether a diff between two URLs is cached"""
+    return diff_cache.has_cached(diff_cache.get_url_hash(old_pdf_url), diff_cache.get_url_hash(new_pdf_url))
+
+
+@traced()
+def get_cached_diff_lines(old_hash, new_hash):
+    """Convenience function for reading a cached diff"""
+    return diff_cache.get(old_hash, new_hash)
+
+
+@traced()
+def cache_diff_lines(old_hash, new_hash, diff_lines):
+    """Convenience function for caching a diff"""
+    return diff_cache.put(old_hash, new_hash, diff_lines)
@@ -0,0 +1,301 @@
+import os
+import bisect
+import difflib
+import logging
+import unicodedata
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import dotenv
+
+dotenv.load_dotenv()
+logger = logging.getLogger(__name__)
+
+ENGINES = ('patience', 'myers', 'difflib')
+
+# Edit distance at which Myers gives up and reports the remaining block as replaced.
+# Bounds the worst case at O((N+M) * MAX_EDIT_COST) for wholesale rewrites.
+MAX_EDIT_COST = 400
+
+# Changed blocks with more words, or more word edits, than this are a rewrite rather than a
+# reflow or small edit, so the word-level pass gives up and they are reported line by line
+MAX_REFINE_WORDS = 1500
+MAX_WORD_EDIT_COST = 100
+
+# PDF extractors emit different glyphs for the same bullet depending on the font
+BULLET_CHARS = '•●○◦▪▫■□►▶‣⁃∙·*'
+
+
+def normalize_line(line: str) -> str:
+    """Folds ligatures, bullet glyphs and whitespace runs so only real text changes show up in the diff"""
+    line = ' '.join(unicodedata.normalize('NFKC', line).split())
+    if line and line[0] in BULLET_CHARS:
+        line = '• ' + line[1:].lstrip()
+    return line
+
+
+def myers_matches(a: Sequence, b: Sequence, max_cost: int = MAX_EDIT_COST) -> List[Tuple[int, int]]:
+    """
+    Matched (i, j) index pairs of a shortest edit script between a and b (Myers, O((N+M)D)).
+    Returns no matches when the edit distance exceeds max_cost, so the block is treated as replaced.
+    """
+    n, m = len(a), len(b)
+    if not set(a).intersection(b):
+        return []
+
+    v = {1: 0}
+    trace = []
+
+    for d in range(min(n + m, max_cost) + 1):
+        trace.append(dict(v))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                return _backtrack_myers(trace, n, m)
+
+    return []
+
+
+def _backtrack_myers(trace: List[Dict[int, int]], n: int, m: int) -> List[Tuple[int, int]]:
+    matches = []
+    x, y = n, m
+
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k - 1] < v[k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            matches.append((x, y))
+
+        x, y = prev_x, prev_y
+
+    matches.reverse()
+    return matches
+
+
+def patience_matches(a: Sequence, b: Sequence, max_cost: int = MAX_EDIT_COST) -> List[Tuple[int, int]]:
+    """
+    Matched (i, j) index pairs using patience diff: lines that occur exactly once on both sides
+    anchor the alignment, and only the gaps between anchors fall back to Myers.
+    """
+    matches = []
+    _patience_range(a, b, 0, len(a), 0, len(b), matches, max_cost)
+    return matches
+
+
+def _patience_range(a, b, alo, ahi, blo, bhi, matches, max_cost):
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        matches.append((alo, blo))
+        alo += 1
+        blo += 1
+
+    suffix = []
+    while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+        ahi -= 1
+        bhi -= 1
+        suffix.append((ahi, bhi))
+
+    if alo < ahi and blo < bhi:
+        anchors = _unique_anchors(a, b, alo, ahi, blo, bhi)
+        if anchors:
+            i, j = alo, blo
+            for anchor_i, anchor_j in anchors:
+                if i < anchor_i and j < anchor_j:
+                    _patience_range(a, b, i, anchor_i, j, anchor_j, matches, max_cost)
+                matches.append((anchor_i, anchor_j))
+                i, j = anchor_i + 1, anchor_j + 1
+            if i < ahi and j < bhi:
+                _patience_range(a, b, i, ahi, j, bhi, matches, max_cost)
+        else:
+            for x, y in myers_matches(a[alo:ahi], b[blo:bhi], max_cost):
+                matches.append((alo + x, blo + y))
+
+    matches.extend(reversed(suffix))
+
+
+def _unique_anchors(a, b, alo, ahi, blo, bhi) -> List[Tuple[int, int]]:
+    counts = {}
+    for i in range(alo, ahi):
+        entry = counts.setdefault(a[i], [0, 0, i, 0])
+        entry[0] += 1
+    for j in range(blo, bhi):
+        entry = counts.get(b[j])
+        if entry is not None:
+            entry[1] += 1
+            entry[3] = j
+
+    # Lines unique to both sides, in old order; the longest run increasing in new order is kept
+    candidates = sorted((i, j) for a_count, b_count, i, j in counts.values() if a_count == 1 and b_count == 1)
+    if not candidates:
+        return []
+
+    pile_tops = []
+    pile_indices = []
+    previous = [-1] * len(candidates)
+    for index, (_, j) in enumerate(candidates):
+        pile = bisect.bisect_left(pile_tops, j)
+        if pile > 0:
+            previous[index] = pile_indices[pile - 1]
+        if pile == len(pile_tops):
+            pile_tops.append(j)
+            pile_indices.append(index)
+        else:
+            pile_tops[pile] = j
+            pile_indices[pile] = index
+
+    anchors = []
+    index = pile_indices[-1]
+    while index != -1:
+        anchors.append(candidates[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def change_blocks(matches: List[Tuple[int, int]], n: int, m: int) -> Iterator[Tuple[int, int, int, int]]:
+    """Yields (i1, i2, j1, j2) for every unmatched stretch between consecutive matches"""
+    i = j = 0
+    for match_i, match_j in matches + [(n, m)]:
+        if match_i > i or match_j > j:
+            yield i, match_i, j, match_j
+        i, j = match_i + 1, match_j + 1
+
+
+def split_words(lines: Sequence[str]) -> Tuple[List[str], List[Tuple[int, ...]]]:
+    """
+    Words of a block of lines and the line(s) each came from. A word hyphenated across a line
+    break is rejoined, so a reflow that splits or unsplits it doesn't register as a change.
+    """
+    words = []
+    origins = []
+    for line_index, line in enumerate(lines):
+        for position, word in enumerate(line.split()):
+            if position == 0 and words and words[-1].endswith('-') and len(words[-1]) > 1 and words[-1][-2].isalpha():
+                words[-1] = words[-1][:-1] + word
+                origins[-1] = origins[-1] + (line_index,)
+                continue
+            words.append(word)
+            origins.append((line_index,))
+    return words, origins
+
+
+class DiffEngine:
+    """
+    Line diff for extracted resume text. Patience (default) or Myers replaces difflib's
+    SequenceMatcher, which is quadratic on long runs of similar lines. Lines are normalized
+    before matching, and a word-level pass over each changed block drops lines whose words
+    didn't actually change, so reflowed paragraphs and one-word edits don't show up as whole
+    paragraphs removed and re-added.
+    """
+
+    def __init__(self, algorithm: Optional[str] = None, word_level: Optional[bool] = None,
+                 normalize: Optional[bool] = None, max_cost: int = MAX_EDIT_COST):
+        self.algorithm = (algorithm or os.getenv('DIFF_ENGINE', 'patience')).lower()
+        if self.algorithm not in ENGINES:
+            logger.error(f"Unknown DIFF_ENGINE {self.algorithm}, using patience")
+            self.algorithm = 'patience'
+        self.word_level = word_level if word_level is not None else os.getenv('DIFF_WORD_LEVEL', 'true').lower() == 'true'
+        self.normalize = normalize if normalize is not None else os.getenv('DIFF_NORMALIZE', 'true').lower() == 'true'
+        self.max_cost = max_cost
+
+    @property
+    def signature(self) -> str:
+        """Identifies the output format, so diffs cached under other settings aren't reused"""
+        if self.algorithm == 'difflib':
+            return 'difflib'
+        return f"{self.algorithm}{'+words' if self.word_level else ''}{'+norm' if self.normalize else ''}"
+
+    def iter_changes(self, old_lines: Sequence[str], new_lines: Sequence[str]) -> Iterator[Tuple[str, str]]:
+        """Yields ('+' | '-', line) for each changed line"""
+        if self.algorithm == 'difflib':
+            yield from self._iter_difflib_changes(old_lines, new_lines)
+            return
+
+        if self.normalize:
+            old_lines = [line for line in map(normalize_line, old_lines) if line]
+            new_lines = [line for line in map(normalize_line, new_lines) if line]
+        else:
+            old_lines = [line.strip() for line in old_lines]
+            new_lines = [line.strip() for line in new_lines]
+
+        matches = self._match(old_lines, new_lines)
+        for i1, i2, j1, j2 in change_blocks(matches, len(old_lines), len(new_lines)):
+            old_block = old_lines[i1:i2]
+            new_block = new_lines[j1:j2]
+
+            if self.word_level and old_block and new_block:
+                old_block, new_block = self._refine_block(old_block, new_block)
+
+            for line in old_block:
+                yield '-', line
+            for line in new_block:
+                yield '+', line
+
+    def _match(self, a: Sequence, b: Sequence, max_cost: Optional[int] = None) -> List[Tuple[int, int]]:
+        max_cost = max_cost or self.max_cost
+        if self.algorithm == 'myers':
+            return myers_matches(a, b, max_cost)
+        return patience_matches(a, b, max_cost)
+
+    def _refine_block(self, old_block: List[str], new_block: List[str]) -> Tuple[List[str], List[str]]:
+        """Keeps only the lines of a replaced block that contain a removed or added word"""
+        old_words, old_origins = split_words(old_block)
+        new_words, new_origins = split_words(new_block)
+        if len(old_words) + len(new_words) > MAX_REFINE_WORDS:
+            return old_block, new_block
+
+        matches = self._match(old_words, new_words, MAX_WORD_EDIT_COST)
+        if not matches:
+            return old_block, new_block
+
+        changed_old = set()
+        changed_new = set()
+        for i1, i2, j1, j2 in change_blocks(matches, len(old_words), len(new_words)):
+            for origin in old_origins[i1:i2]:
+                changed_old.update(origin)
+            for origin in new_origins[j1:j2]:
+                changed_new.update(origin)
+
+        return (
+            [line for index, line in enumerate(old_block) if index in changed_old],
+            [line for index, line in enumerate(new_block) if index in changed_new]
+        )
+
+    def _iter_difflib_changes(self, old_lines, new_lines):
+        # Previous behaviour, kept for comparison and as a fallback
+        matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag in ('replace', 'delete'):
+                for line in old_lines[i1:i2]:
+                    yield '-', line.strip()
+            if tag in ('replace', 'insert'):
+                for line in new_lines[j1:j2]:
+                    yield '+', line.strip()
+
+
+# Global instance
+diff_engine = DiffEngine()
+
+
+def iter_line_changes(old_lines, new_lines):
+    """Convenience function for diffing two lists of lines with the configured engine"""
+    return diff_engine.iter_changes(old_lines, new_lines)
+
+
+def get_diff_engine_signature():
+    """Convenience function for the configured engine's output format identifier"""
+    return diff_engine.signature
@@ -1,10 +1,31 @@
 import requests
 import logging
+from helpers.circuit_breaker import get_circuit_breaker
+from helpers.deadline import get_timeout
+from helpers.http_session import get_http_session
+from helpers.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
-def send_followup_message(application_id, interaction_token, content):
+def post_to_discord(method, url, payload, headers, deadline=None):
+    # Raises CircuitOpenError or DeadlineExceeded without touching the network when the call can't succeed
+    timeout = get_timeout(deadline, 10)
+    breaker = get_circuit_breaker('discord')
+    breaker.check()
+    
+    try:
+        response = method(url, json=payload, headers=headers, timeout=timeout)
+    except requests.RequestException as e:
+        breaker.record_exception(e, deadline_limited=timeout < 10)
+        raise
+    
+    breaker.record_status(response.status_code)
+    return response
+
+
+@traced()
+def send_followup_message(application_id, interaction_token, content, deadline=None):
     
     try:
         url = f"https://discord.com/api/v10/webhooks/{application_id}/{interaction_token}"
@@ -22,7 +43,7 @@ def send_followup_message(application_id, interaction_token, content):
             "Content-Type": "application/json"
         }
         
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
+        response = post_to_discord(get_http_session().post, url, payload, headers, deadline)
         response.raise_for_status()
         
         logger.info(log_message)
@@ -31,3 +52,31 @@ def send_followup_message(application_id, interaction_token, content):
     except Exception as e:
         logger.error(f"Failed to send follow-up message: {str(e)}")
         return False
+
+
+@traced()
+def edit_original_message(application_id, interaction_token, content, deadline=None):
+    
+    try:
+        # Edits the deferred "ResuRalph is thinking..." message in place
+        url = f"https://discord.com/api/v10/webhooks/{application_id}/{interaction_token}/messages/@original"
+        
+        if isinstance(content, dict) and "embeds" in content:
+            payload = content
+        else:
+            payload = {
+                "content": content
+            }
+        
+        headers = {
+            "Content-Type": "application/json"
+        }
+        
+        response = post_to_discord(get_http_session().patch, url, payload, headers, deadline)
+        response.raise_for_status()
+        
+        return True
+        
+    except Exception as e:
+        logger.error(f"Failed to edit original message: {str(e)}")
+        return False
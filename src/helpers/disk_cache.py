@@ -0,0 +1,201 @@
+import os
+import mmap
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+import dotenv
+from helpers.pdf_backends import get_pdf_text_backend_name
+
+dotenv.load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Namespaces stored under the cache directory
+PDF_NAMESPACE = 'pdf'
+TEXT_NAMESPACE = 'text'
+
+
+class DiskCache:
+    """
+    Size-bounded LRU cache of files in /tmp, which Lambda keeps for the life of a warm container.
+    Writes go to a temporary file that is atomically renamed into place, so a concurrent or
+    interrupted write never leaves a partial entry, and reads are memory-mapped.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.enabled = os.getenv('DISK_CACHE_ENABLED', 'true').lower() == 'true'
+        self.cache_dir = cache_dir or os.getenv('DISK_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'resuralph-cache'))
+        # Lambda's /tmp defaults to 512MB, shared with anything else the function writes
+        self.max_bytes = max_bytes or int(os.getenv('DISK_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        if self.enabled:
+            self._load_index()
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+
+        path = self._path(namespace, key)
+        with self.lock:
+            size = self.entries.get(path)
+            if size is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(path)
+
+        try:
+            with open(path, 'rb') as f:
+                # mmap can't map an empty file
+                if size == 0:
+                    data = b""
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        data = mapped[:]
+            # Keeps the order recoverable from mtimes if the index is rebuilt
+            os.utime(path)
+        except OSError as e:
+            logger.error(f"Error reading disk cache entry {path}: {str(e)}")
+            self._forget(path)
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+        return data
+
+    def put(self, namespace: str, key: str, data: bytes) -> bool:
+        if not self.enabled or len(data) > self.max_bytes:
+            return False
+
+        path = self._path(namespace, key)
+        directory = os.path.dirname(path)
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except Exception:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            logger.error(f"Error writing disk cache entry {path}: {str(e)}")
+            return False
+
+        with self.lock:
+            self.total_bytes -= self.entries.pop(path, 0)
+            self.entries[path] = len(data)
+            self.total_bytes += len(data)
+            evicted = self._evict_locked()
+
+        for evicted_path in evicted:
+            try:
+                os.unlink(evicted_path)
+            except OSError:
+                pass
+        return True
+
+    def get_text(self, namespace: str, key: str) -> Optional[str]:
+        data = self.get(namespace, key)
+        return data.decode('utf-8') if data is not None else None
+
+    def put_text(self, namespace: str, key: str, text: str) -> bool:
+        return self.put(namespace, key, text.encode('utf-8'))
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _path(self, namespace: str, key: str) -> str:
+        # Keys are URLs, so they're hashed into safe, fixed-length file names
+        return os.path.join(self.cache_dir, namespace, hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+    def _evict_locked(self):
+        evicted = []
+        while self.total_bytes > self.max_bytes and self.entries:
+            path, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            evicted.append(path)
+        return evicted
+
+    def _forget(self, path: str):
+        with self.lock:
+            self.total_bytes -= self.entries.pop(path, 0)
+
+    def _load_index(self):
+        # A new process in a reused container finds the previous process's entries still on disk
+        files = []
+        try:
+            for namespace in os.listdir(self.cache_dir):
+                directory = os.path.join(self.cache_dir, namespace)
+                for name in os.listdir(directory):
+                    path = os.path.join(directory, name)
+                    if name.endswith('.tmp'):
+                        os.unlink(path)
+                        continue
+                    stat = os.stat(path)
+                    files.append((stat.st_mtime, path, stat.st_size))
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.error(f"Error loading disk cache index: {str(e)}")
+
+        for _, path, size in sorted(files):
+            self.entries[path] = size
+            self.total_bytes += size
+
+        for path in self._evict_locked():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+# Global instance
+disk_cache = DiskCache()
+
+
+def get_cached_pdf(pdf_url):
+    """Convenience function for reading PDF bytes cached on disk"""
+    return disk_cache.get(PDF_NAMESPACE, pdf_url)
+
+
+def cache_pdf(pdf_url, pdf_bytes):
+    """Convenience function for caching PDF bytes on disk"""
+    return disk_cache.put(PDF_NAMESPACE, pdf_url, pdf_bytes)
+
+
+def pdf_text_key(pdf_url):
+    # Backends extract different text from the same PDF, so switching one mustn't serve the other's output
+    return f"{get_pdf_text_backend_name()}:{pdf_url}"
+
+
+def get_cached_pdf_text(pdf_url):
+    """Convenience function for reading a PDF's extracted text cached on disk"""
+    return disk_cache.get_text(TEXT_NAMESPACE, pdf_text_key(pdf_url))
+
+
+def cache_pdf_text(pdf_url, text):
+    """Convenience function for caching a PDF's extracted text on disk"""
+    return disk_cache.put_text(TEXT_NAMESPACE, pdf_text_key(pdf_url), text)
+
+
+def get_disk_cache_stats():
+    """Convenience function for reporting disk cache usage"""
+    return disk_cache.get_stats()
@@ -79,4 +79,17 @@ def create_warning_embed(title, description, fields=None):
     if fields:
         embed["fields"] = fields
     
-    return {"embeds": [embed]}
\ No newline at end of file
+    return {"embeds": [embed]}
+
+
+def create_service_unavailable_embed(service_name, retry_after_seconds=None):
+    
+    retry_text = "in a minute"
+    if retry_after_seconds:
+        retry_text = f"in about {max(1, round(retry_after_seconds))} seconds"
+    
+    return create_warning_embed(
+        "Service Unavailable",
+        f"{service_name} is having problems right now, so this request was stopped early. "
+        f"Please try again {retry_text}. 🔧"
+    )
\ No newline at end of file
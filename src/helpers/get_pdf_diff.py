@@ -1,71 +1,241 @@
-import requests
-import PyPDF2
-from io import BytesIO
-import difflib
 import logging
+from helpers.pdf_extractor import fetch_pdf_content
+from helpers.diff_engine import iter_line_changes
+from helpers.diff_cache import (hash_pdf_bytes, remember_pdf_hash, get_known_pdf_hash, get_cached_diff_lines, cache_diff_lines,
+                                remember_pdf_page_fingerprints, get_known_page_fingerprints)
+from helpers.pdf_sandbox import extract_pdf_text, extract_changed_pages
+from helpers.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# Discord caps embed field values at 1024 characters; leave room for the code fence and the "more" note
+DIFF_FIELD_BUDGET = 1024 - len("``````") - 64
 
-def extract_text_from_pdf_url(pdf_url):
+
+def extract_text_from_pdf_url(pdf_url, deadline=None):
    
     try:
-        # Download PDF
-        response = requests.get(pdf_url, timeout=30)
-        response.raise_for_status()
-        
-        # Extract text using PyPDF2
-        pdf_stream = BytesIO(response.content)
-        pdf_reader = PyPDF2.PdfReader(pdf_stream)
-        
-        text_content = ""
-        for page in pdf_reader.pages:
-            text_content += page.extract_text() + "\n"
-        
-        return text_content.strip()
+        return extract_text_from_pdf_bytes(fetch_pdf_bytes(pdf_url, deadline), deadline)
         
     except Exception as e:
         logger.error(f"Failed to extract text from PDF {pdf_url}: {str(e)}")
         raise
 
 
-def compare_text_diff(old_pdf_url, new_pdf_url):
+@traced()
+def fetch_pdf_bytes(pdf_url, deadline=None):
     
-    try:
-        logger.info(f"Comparing PDFs: {old_pdf_url} vs {new_pdf_url}")
-        
-        # Extract text from both PDFs
-        old_text = extract_text_from_pdf_url(old_pdf_url)
-        new_text = extract_text_from_pdf_url(new_pdf_url)
-        
-        # Split into lines for better diff analysis
-        old_lines = old_text.splitlines()
-        new_lines = new_text.splitlines()
-        
-        # Generate diff
-        diff = list(difflib.unified_diff(old_lines, new_lines, lineterm=''))
+    # Download PDF, or read it from the container's disk cache
+    pdf_bytes = fetch_pdf_content(pdf_url, deadline=deadline)
+    
+    # Remember the content hash so later diffs involving this URL can skip the download
+    remember_pdf_hash(pdf_url, hash_pdf_bytes(pdf_bytes))
+    return pdf_bytes
+
+
+def extract_text_from_pdf_bytes(pdf_bytes, deadline=None):
+    
+    # Extract text using PyPDF2, in the parsing sandbox since the PDF is user-supplied
+    return extract_pdf_text(pdf_bytes, deadline)
+
+
+@traced()
+def extract_changed_pages_text(old_pdf_url, old_bytes, new_pdf_url, new_bytes, deadline=None):
+    """
+    Extracts text only from the pages whose content fingerprints have no match in the other version.
+    Unchanged pages would diff to nothing, so skipping them saves both text extraction and diff work.
+    """
+    pages = extract_changed_pages(old_bytes, new_bytes, deadline)
+    
+    remember_pdf_page_fingerprints(old_pdf_url, pages['old_fingerprints'])
+    remember_pdf_page_fingerprints(new_pdf_url, pages['new_fingerprints'])
+    
+    logger.info(f"Extracted {len(pages['old_pages'])}/{len(pages['old_fingerprints'])} old and "
+                f"{len(pages['new_pages'])}/{len(pages['new_fingerprints'])} new pages")
+    
+    return pages['old_text'], pages['new_text']
+
+
+def iter_diff_changes(old_lines, new_lines):
+    """
+    Yields ('+' | '-', line) for each changed line, using the engine selected by DIFF_ENGINE.
+    Lines are matched up front; changed blocks are refined and yielded as they are consumed.
+    """
+    return iter_line_changes(old_lines, new_lines)
+
+
+class FieldFill:
+    """Tracks whether take_within_budget is certain to leave lines unrendered"""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.lines = 0
+        self.chars = 0
+
+    def add(self, line):
+        if line:
+            self.lines += 1
+            self.chars += len(line)
+
+    @property
+    def full(self):
+        # Past the budget with at least two lines, so at least one of them can't be rendered
+        return self.lines >= 2 and self.chars + self.lines - 1 > self.budget
+
+
+@traced()
+def diff_text_lines(old_text, new_text, budget=None):
+    """
+    Splits the diff into added and removed lines. With a budget, stops reading changes once
+    both would overflow a field of that size: the result is then marked truncated, and the
+    lines it holds are only the first of the changes.
+    """
+    added_lines = []
+    removed_lines = []
+    added_fill = FieldFill(budget)
+    removed_fill = FieldFill(budget)
+    truncated = False
+    
+    # Split into lines for better diff analysis
+    for tag, line in iter_diff_changes(old_text.splitlines(), new_text.splitlines()):
+        if budget is not None and added_fill.full and removed_fill.full:
+            truncated = True
+            break
+        if tag == '+':
+            added_lines.append(line)
+            added_fill.add(line)
+        else:
+            removed_lines.append(line)
+            removed_fill.add(line)
+    
+    return {
+        'added_lines': added_lines,
+        'removed_lines': removed_lines,
+        'truncated': truncated
+    }
+
+
+def take_within_budget(lines, budget=DIFF_FIELD_BUDGET):
+    """
+    Renders changed lines until the next one would overflow the budget and stops there.
+    Returns (text, remaining) where remaining counts the changed lines left unrendered.
+    When the diff was truncated, remaining is a lower bound.
+    """
+    rendered = []
+    used = 0
+    consumed = 0
+    
+    for line in lines:
+        if not line:
+            # Blank lines carry no content worth showing
+            consumed += 1
+            continue
         
-        added_lines = []
-        removed_lines = []
+        cost = len(line) + (1 if rendered else 0)
+        if used + cost > budget:
+            if not rendered:
+                # Cut a single overlong line rather than showing nothing
+                rendered.append(line[:budget - 3] + "...")
+                consumed += 1
+            break
         
-        for line in diff:
-            if line.startswith('+') and not line.startswith('+++'):
-                # Remove the '+' prefix
-                added_lines.append(line[1:].strip())
-            elif line.startswith('-') and not line.startswith('---'):
-                # Remove the '-' prefix
-                removed_lines.append(line[1:].strip())
+        rendered.append(line)
+        used += cost
+        consumed += 1
+    
+    remaining = sum(1 for line in lines[consumed:] if line)
+    return '\n'.join(rendered), remaining
+
+
+def format_diff_field_value(text, remaining, empty_message, truncated=False):
+    
+    if not text and not remaining:
+        return empty_message
+    
+    value = f"```{text}```" if text else ""
+    if remaining:
+        # A truncated diff stopped reading changes, so the count is only what was seen
+        value += f"\n...and {remaining}{'+' if truncated else ''} more changed line{'s' if remaining != 1 or truncated else ''}"
+    return value
+
+
+def render_full_diff(diff_lines):
+    
+    # Plain-text artifact with every change, for diffs too large for an embed
+    lines = ["Removed:"]
+    lines += [f"- {line}" for line in diff_lines['removed_lines'] if line]
+    lines += ["", "Added:"]
+    lines += [f"+ {line}" for line in diff_lines['added_lines'] if line]
+    return '\n'.join(lines) + '\n'
+
+
+@traced()
+def get_diff_lines(old_pdf_url, new_pdf_url, deadline=None, old_hash=None, new_hash=None, budget=None):
+    """
+    Returns diff_text_lines output for two PDFs, served from the diff cache when the
+    content hashes are known and downloading/extracting only on a miss. A miss computed
+    with a budget may come back truncated, and is then not cached.
+    """
+    old_hash = old_hash or get_known_pdf_hash(old_pdf_url)
+    new_hash = new_hash or get_known_pdf_hash(new_pdf_url)
+    
+    diff_lines = get_cached_diff_lines(old_hash, new_hash)
+    if diff_lines is not None:
+        return diff_lines
+    
+    # Identical pages (e.g. a re-export that only changed metadata) mean there is nothing to download
+    old_fingerprints = get_known_page_fingerprints(old_pdf_url)
+    new_fingerprints = get_known_page_fingerprints(new_pdf_url)
+    if old_fingerprints and old_fingerprints == new_fingerprints:
+        diff_lines = {'added_lines': [], 'removed_lines': [], 'truncated': False}
+        cache_diff_lines(old_hash, new_hash, diff_lines)
+        return diff_lines
+    
+    old_bytes = fetch_pdf_bytes(old_pdf_url, deadline)
+    new_bytes = fetch_pdf_bytes(new_pdf_url, deadline)
+    old_hash = hash_pdf_bytes(old_bytes)
+    new_hash = hash_pdf_bytes(new_bytes)
+    
+    # The same content may already have been diffed under different URLs
+    diff_lines = get_cached_diff_lines(old_hash, new_hash)
+    if diff_lines is not None:
+        return diff_lines
+    
+    # Extract text from the pages that differ between the two PDFs
+    old_text, new_text = extract_changed_pages_text(old_pdf_url, old_bytes, new_pdf_url, new_bytes, deadline)
+    
+    diff_lines = diff_text_lines(old_text, new_text, budget)
+    if not diff_lines['truncated']:
+        cache_diff_lines(old_hash, new_hash, diff_lines)
+    return diff_lines
+
+
+@traced()
+def precompute_diff(old_pdf_url, new_pdf_url, old_hash=None, new_hash=None, deadline=None):
+    """Computes and caches the diff between two versions ahead of it being requested"""
+    try:
+        get_diff_lines(old_pdf_url, new_pdf_url, deadline, old_hash, new_hash)
+        logger.info(f"Precomputed diff: {old_pdf_url} -> {new_pdf_url}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to precompute diff {old_pdf_url} -> {new_pdf_url}: {str(e)}")
+        return False
+
+
+@traced()
+def compare_text_diff(old_pdf_url, new_pdf_url, deadline=None, old_hash=None, new_hash=None, include_full_diff=False):
+    
+    try:
+        logger.info(f"Comparing PDFs: {old_pdf_url} vs {new_pdf_url}")
         
-        # Join lines and truncate if too long (Discord embed field limit is 1024 chars)
-        added_text = '\n'.join(added_lines)
-        removed_text = '\n'.join(removed_lines)
+        # Without the full diff artifact, a diff computed here only needs to read as far as the embed shows
+        budget = None if include_full_diff else DIFF_FIELD_BUDGET
+        diff_lines = get_diff_lines(old_pdf_url, new_pdf_url, deadline, old_hash, new_hash, budget)
+        truncated = diff_lines.get('truncated', False)
         
-        # Truncate if too long for Discord embed
-        max_length = 1000  
-        if len(added_text) > max_length:
-            added_text = added_text[:max_length] + "...\n(truncated)"
-        if len(removed_text) > max_length:
-            removed_text = removed_text[:max_length] + "...\n(truncated)"
+        # Only as much as fits in a Discord embed field is rendered; the rest is just counted
+        added_text, added_remaining = take_within_budget(diff_lines['added_lines'])
+        removed_text, removed_remaining = take_within_budget(diff_lines['removed_lines'])
         
         # Filter out empty or whitespace-only changes
         if not added_text.strip():
@@ -75,11 +245,19 @@ def compare_text_diff(old_pdf_url, new_pdf_url):
             
         logger.info(f"Diff comparison completed. Added: {len(added_text or '')} chars, Removed: {len(removed_text or '')} chars")
         
-        return {
+        result = {
             'added_text': added_text,
-            'removed_text': removed_text
+            'removed_text': removed_text,
+            'added_remaining': added_remaining,
+            'removed_remaining': removed_remaining,
+            'truncated': truncated
         }
         
+        if include_full_diff:
+            result['full_diff'] = render_full_diff(diff_lines)
+        
+        return result
+        
     except Exception as e:
         logger.error(f"Failed to compare PDF differences: {str(e)}")
         raise
\ No newline at end of file
@@ -0,0 +1,436 @@
+import os
+import json
+import math
+import time
+import random
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass, asdict
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from openai import APIStatusError
+import dotenv
+
+dotenv.load_dotenv()
+logger = logging.getLogger(__name__)
+
+OFF = 'off'
+RECORD = 'record'
+REPLAY = 'replay'
+
+DEFAULT_CASSETTE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                    'benchmarks', 'cassettes')
+
+# Hosts whose traffic is recorded and replayed, named like their circuit breakers.
+# Everything else (S3 objects, Discord CDN attachments) always goes to the network.
+SERVICE_HOSTS = {
+    'discord.com': 'discord',
+    'api.hypothes.is': 'hypothesis',
+}
+OPENAI_ROUTE = 'POST /v1/chat/completions'
+
+# Only these response headers are kept; the rest can carry account or request identifiers
+KEPT_HEADERS = {'content-type', 'retry-after', 'x-ratelimit-limit', 'x-ratelimit-remaining', 'x-ratelimit-reset-after'}
+
+# Response fields that can hold resume text, URLs or account details
+REDACTED_FIELDS = {
+    'content', 'description', 'value', 'title', 'text', 'exact', 'prefix', 'suffix', 'uri', 'source',
+    'links', 'document', 'user', 'username', 'global_name', 'email', 'token', 'avatar', 'user_info'
+}
+REDACTED = '[redacted]'
+
+# Stands in for recorded feedback quotes; filled from the resume in the prompt on replay
+RESUME_QUOTE = '{resume_quote}'
+
+
+@dataclass
+class FaultProfile:
+    """
+    Latency and error distribution of one dependency. Latency is log-normal, fitted to p50 and p99;
+    rate limits, server errors and timeouts are drawn independently per call.
+    """
+    p50_ms: float
+    p99_ms: float
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    retry_after_seconds: float = 1.0
+
+    def sample_latency_ms(self, rng: random.Random) -> float:
+        # z(0.99) = 2.326, so the fitted distribution passes through both percentiles
+        sigma = max(0.0, math.log(self.p99_ms / self.p50_ms) / 2.326) if self.p50_ms > 0 else 0.0
+        return self.p50_ms * math.exp(rng.gauss(0.0, sigma)) if self.p50_ms > 0 else 0.0
+
+
+# Roughly what each API looks like from us-east-1 on a normal day
+DEFAULT_FAULT_PROFILES = {
+    'discord': FaultProfile(p50_ms=120, p99_ms=700, rate_limit_rate=0.01, server_error_rate=0.002, timeout_rate=0.001),
+    'hypothesis': FaultProfile(p50_ms=300, p99_ms=2000, rate_limit_rate=0.02, server_error_rate=0.01, timeout_rate=0.005),
+    'openai': FaultProfile(p50_ms=7000, p99_ms=25000, rate_limit_rate=0.02, server_error_rate=0.01, timeout_rate=0.005,
+                           retry_after_seconds=20.0),
+}
+
+RATE_LIMIT_BODIES = {
+    'discord': {'message': 'You are being rate limited.', 'retry_after': 1.0, 'global': False},
+    'hypothesis': {'status': 'failure', 'reason': 'Too many requests'},
+    'openai': {'error': {'message': 'Rate limit reached', 'type': 'requests', 'code': 'rate_limit_exceeded'}},
+}
+
+
+class ReplayedAPIStatusError(APIStatusError):
+    """Raised in place of the OpenAI SDK's status errors, which need a live HTTP response to construct"""
+
+    def __init__(self, status_code: int, body: Dict):
+        Exception.__init__(self, f"Error code: {status_code} - {body}")
+        self.message = str(self)
+        self.status_code = status_code
+        self.body = body
+        self.response = None
+        self.request = None
+        self.request_id = None
+        self.code = None
+        self.param = None
+        self.type = None
+
+
+class ReplayTimeoutError(TimeoutError):
+    pass
+
+
+def get_service(url: str) -> Optional[str]:
+    return SERVICE_HOSTS.get(urlsplit(url).hostname or '')
+
+
+def route_template(method: str, url: str) -> str:
+    """Method and path with IDs and tokens replaced, so the same call matches whoever made it"""
+    segments = []
+    for segment in urlsplit(url).path.split('/'):
+        if segment.isdigit() and len(segment) >= 6:
+            segments.append('{id}')
+        elif len(segment) >= 24 and all(char.isalnum() or char in '-_.' for char in segment):
+            segments.append('{token}')
+        else:
+            segments.append(segment)
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+def redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        redacted = {}
+        for key, item in value.items():
+            if key in REDACTED_FIELDS:
+                redacted[key] = REDACTED if isinstance(item, str) else type(item)() if isinstance(item, (dict, list)) else item
+            else:
+                redacted[key] = redact(item)
+        return redacted
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def sanitize_completion(content: str) -> str:
+    """Recorded feedback keeps its comments and shape, but quotes from the resume are replaced"""
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return RESUME_QUOTE
+    for item in data.get('feedback', []):
+        item['selected_text'] = RESUME_QUOTE
+    return json.dumps(data)
+
+
+def fill_resume_quotes(content: str, prompt: str) -> str:
+    """Anchors replayed feedback on lines of the resume actually being reviewed"""
+    resume = prompt
+    if 'Resume Content:' in prompt:
+        resume = prompt.split('Resume Content:', 1)[1].split('Please respond with', 1)[0]
+    lines = [line.strip().lstrip('-•* ') for line in resume.split('\n') if len(line.strip()) > 40] or ['']
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return content
+    for index, item in enumerate(data.get('feedback', [])):
+        if item.get('selected_text') == RESUME_QUOTE:
+            item['selected_text'] = ' '.join(lines[index % len(lines)].split()[:10])
+    return json.dumps(data)
+
+
+class Cassette:
+    """Recorded responses of one service, replayed round-robin per route so runs are deterministic"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.interactions: List[Dict] = []
+        self.positions: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.interactions = json.load(f).get('interactions', [])
+
+    def add(self, interaction: Dict):
+        with self.lock:
+            self.interactions.append(interaction)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path))
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'interactions': self.interactions}, f, indent=2)
+            os.replace(temp_path, self.path)
+
+    def next(self, route: str) -> Optional[Dict]:
+        with self.lock:
+            matches = [interaction for interaction in self.interactions if interaction['route'] == route]
+            if not matches:
+                return None
+            position = self.positions.get(route, 0)
+            self.positions[route] = position + 1
+            return matches[position % len(matches)]
+
+
+class HTTPReplay:
+    """
+    Records sanitized responses from Discord, Hypothes.is and OpenAI, and replays them offline
+    with latency, rate limits, server errors and timeouts drawn from per-service fault profiles.
+    HTTP_REPLAY_MODE is 'off' (default), 'record' or 'replay'.
+    """
+
+    def __init__(self):
+        self.mode = os.getenv('HTTP_REPLAY_MODE', OFF).lower()
+        if self.mode not in (OFF, RECORD, REPLAY):
+            logger.error(f"Unknown HTTP_REPLAY_MODE {self.mode}, using {OFF}")
+            self.mode = OFF
+        self.directory = os.getenv('HTTP_REPLAY_DIR', DEFAULT_CASSETTE_DIR)
+        self.profiles = self._load_profiles(os.getenv('HTTP_REPLAY_PROFILE'))
+        # One seeded generator so a single-threaded run draws the same faults every time
+        self.rng = random.Random(int(os.getenv('HTTP_REPLAY_SEED', '0')))
+        self.cassettes: Dict[str, Cassette] = {}
+        self.lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _load_profiles(self, path: Optional[str]) -> Dict[str, FaultProfile]:
+        profiles = dict(DEFAULT_FAULT_PROFILES)
+        if not path:
+            return profiles
+        # {"openai": {"p50_ms": 9000, "timeout_rate": 0.05}, ...}; omitted fields keep their defaults
+        with open(path) as f:
+            for service, overrides in json.load(f).items():
+                base = asdict(profiles.get(service, FaultProfile(p50_ms=0, p99_ms=0)))
+                base.update(overrides)
+                profiles[service] = FaultProfile(**base)
+        return profiles
+
+    def cassette(self, service: str) -> Cassette:
+        with self.lock:
+            if service not in self.cassettes:
+                self.cassettes[service] = Cassette(os.path.join(self.directory, f"{service}.json"))
+            return self.cassettes[service]
+
+    def count(self, service: str, event: str):
+        with self.lock:
+            service_stats = self.stats.setdefault(service, {})
+            service_stats[event] = service_stats.get(event, 0) + 1
+
+    def draw_fault(self, service: str) -> Tuple[Optional[str], float]:
+        """(fault, latency_ms), where fault is None, 'rate_limit', 'server_error' or 'timeout'"""
+        profile = self.profiles.get(service) or FaultProfile(p50_ms=0, p99_ms=0)
+        with self.lock:
+            latency_ms = profile.sample_latency_ms(self.rng)
+            roll = self.rng.random()
+        if roll < profile.timeout_rate:
+            return 'timeout', latency_ms
+        roll -= profile.timeout_rate
+        if roll < profile.rate_limit_rate:
+            return 'rate_limit', latency_ms
+        roll -= profile.rate_limit_rate
+        if roll < profile.server_error_rate:
+            return 'server_error', latency_ms
+        return None, latency_ms
+
+    def wait(self, service: str, fault: Optional[str], latency_ms: float, timeout: Optional[float]) -> bool:
+        """Sleeps for the call's latency; returns False when the caller's timeout expires first"""
+        if fault == 'timeout' or (timeout is not None and latency_ms / 1000 > timeout):
+            time.sleep(timeout if timeout is not None else latency_ms / 1000)
+            self.count(service, 'timeouts')
+            return False
+        time.sleep(latency_ms / 1000)
+        return True
+
+    def fault_response(self, service: str, fault: str) -> Tuple[int, Dict, Dict]:
+        self.count(service, fault)
+        if fault == 'rate_limit':
+            retry_after = self.profiles[service].retry_after_seconds if service in self.profiles else 1.0
+            return 429, {'Content-Type': 'application/json', 'Retry-After': str(retry_after)}, RATE_LIMIT_BODIES.get(service, {})
+        return 503, {'Content-Type': 'application/json'}, {'error': 'Service Unavailable'}
+
+    def replay_request(self, request: requests.PreparedRequest, timeout: Any) -> requests.Response:
+        service = get_service(request.url)
+        route = route_template(request.method, request.url)
+
+        fault, latency_ms = self.draw_fault(service)
+        if isinstance(timeout, tuple):
+            timeout = timeout[-1]
+        if not self.wait(service, fault, latency_ms, timeout):
+            raise requests.ReadTimeout(f"Replayed {service} call timed out after {timeout}s", request=request)
+        if fault:
+            status, headers, body = self.fault_response(service, fault)
+            return self._build_response(request, status, headers, json.dumps(body).encode('utf-8'))
+
+        interaction = self.cassette(service).next(route)
+        if interaction is None:
+            self.count(service, 'misses')
+            raise requests.ConnectionError(f"No recorded {service} response for {route}", request=request)
+
+        self.count(service, 'replayed')
+        return self._build_response(request, interaction['status'], interaction['headers'],
+                                    json.dumps(interaction['body']).encode('utf-8'))
+
+    def record_response(self, request: requests.PreparedRequest, response: requests.Response, elapsed_ms: float):
+        service = get_service(request.url)
+        try:
+            body = redact(response.json())
+        except ValueError:
+            body = {}
+        self.cassette(service).add({
+            'route': route_template(request.method, request.url),
+            'status': response.status_code,
+            'headers': {key: value for key, value in response.headers.items() if key.lower() in KEPT_HEADERS},
+            'body': body,
+            'recorded_latency_ms': round(elapsed_ms, 1)
+        })
+        self.count(service, 'recorded')
+
+    def _build_response(self, request, status: int, headers: Dict, content: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = content
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+    def replay_completion(self, request: Dict) -> str:
+        """Content of the next recorded completion; raises the error a faulty call would"""
+        fault, latency_ms = self.draw_fault('openai')
+        if not self.wait('openai', fault, latency_ms, request.get('timeout')):
+            raise ReplayTimeoutError("Replayed OpenAI request timed out")
+        if fault:
+            status, _, body = self.fault_response('openai', fault)
+            raise ReplayedAPIStatusError(status, body)
+
+        interaction = self.cassette('openai').next(OPENAI_ROUTE)
+        if interaction is None:
+            self.count('openai', 'misses')
+            raise ReplayTimeoutError(f"No recorded openai response for {OPENAI_ROUTE}")
+
+        self.count('openai', 'replayed')
+        return fill_resume_quotes(interaction['body']['content'], request['messages'][-1]['content'])
+
+    def record_completion(self, request: Dict, content: str, elapsed_ms: float):
+        self.cassette('openai').add({
+            'route': OPENAI_ROUTE,
+            'status': 200,
+            'headers': {},
+            'body': {'model': request.get('model'), 'content': sanitize_completion(content)},
+            'recorded_latency_ms': round(elapsed_ms, 1)
+        })
+        self.count('openai', 'recorded')
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {'mode': self.mode, 'services': {service: dict(stats) for service, stats in self.stats.items()}}
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Transport adapter for the shared session; passes through hosts that aren't recorded"""
+
+    def __init__(self, replay: HTTPReplay, **kwargs):
+        super().__init__(**kwargs)
+        self.replay = replay
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if get_service(request.url) is None:
+            return super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+
+        if self.replay.mode == REPLAY:
+            return self.replay.replay_request(request, timeout)
+
+        start_time = time.monotonic()
+        response = super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        self.replay.record_response(request, response, (time.monotonic() - start_time) * 1000)
+        return response
+
+
+class ReplayOpenAIClient:
+    """
+    Stands in for the OpenAI client behind ResumeAnalyzer. Records completions from the wrapped
+    client in record mode; in replay mode answers from the cassette without a client or API key.
+    """
+
+    def __init__(self, replay: HTTPReplay, client: Any = None, chunk_chars: int = 40):
+        self.replay = replay
+        self.client = client
+        self.chunk_chars = chunk_chars
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, stream: bool = False, **request):
+        if self.replay.mode == REPLAY:
+            return self._replay(request, stream)
+
+        start_time = time.monotonic()
+        if stream:
+            return self._record_stream(request, self.client.chat.completions.create(stream=True, **request), start_time)
+        response = self.client.chat.completions.create(**request)
+        self.replay.record_completion(request, response.choices[0].message.content or '',
+                                      (time.monotonic() - start_time) * 1000)
+        return response
+
+    def _replay(self, request: Dict, stream: bool):
+        content = self.replay.replay_completion(request)
+        if stream:
+            # The sampled latency is spent before the first chunk, which is where streaming waits in practice
+            return self._stream_chunks(content)
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    def _stream_chunks(self, content: str) -> Iterator[SimpleNamespace]:
+        for start in range(0, len(content), self.chunk_chars):
+            delta = SimpleNamespace(content=content[start:start + self.chunk_chars])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    def _record_stream(self, request: Dict, stream, start_time: float):
+        parts = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+            yield chunk
+        self.replay.record_completion(request, ''.join(parts), (time.monotonic() - start_time) * 1000)
+
+
+# Global instance
+http_replay = HTTPReplay()
+
+
+def get_http_replay_mode():
+    """Convenience function for the configured record/replay mode"""
+    return http_replay.mode
+
+
+def create_replay_adapter(**kwargs):
+    """Convenience function for a transport adapter that records or replays through the global instance"""
+    return ReplayAdapter(http_replay, **kwargs)
+
+
+def wrap_openai_client(client=None):
+    """Convenience function for recording or replaying OpenAI completions; returns the client unchanged when off"""
+    if http_replay.mode == OFF:
+        return client
+    return ReplayOpenAIClient(http_replay, client)
+
+
+def get_http_replay_stats():
+    """Convenience function for replayed, recorded and injected fault counts per service"""
+    return http_replay.get_stats()
@@ -0,0 +1,37 @@
+import os
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+import dotenv
+from helpers.http_replay import get_http_replay_mode, create_replay_adapter, OFF
+
+dotenv.load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+def create_http_session() -> requests.Session:
+    """
+    Session shared by every outbound HTTP call (Discord, Hypothes.is, PDF downloads). Keeps
+    connections alive across calls in a warm container, and is where record/replay plugs in.
+    """
+    pool_size = int(os.getenv('HTTP_POOL_SIZE', '10'))
+    session = requests.Session()
+
+    if get_http_replay_mode() == OFF:
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    else:
+        adapter = create_replay_adapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        logger.info(f"HTTP {get_http_replay_mode()} enabled for Discord and Hypothes.is")
+
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# Global instance
+http_session = create_http_session()
+
+
+def get_http_session():
+    """Convenience function for the shared HTTP session"""
+    return http_session
@@ -3,9 +3,16 @@ import logging
 import requests
 from typing import List, Dict, Optional
 import time
+from helpers.circuit_breaker import get_circuit_breaker
+from helpers.deadline import Deadline, DeadlineExceeded, get_timeout
+from helpers.http_session import get_http_session
+from helpers.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# Rough cost of one annotation including the rate-limit delay, used to stop before the deadline
+ANNOTATION_BUDGET_MS = float(os.getenv('HYPOTHESIS_ANNOTATION_BUDGET_MS', '1500'))
+
 
 class HypothesisClient:
     def __init__(self):
@@ -15,18 +22,30 @@ class HypothesisClient:
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json'
         }
+        self.breaker = get_circuit_breaker('hypothesis')
     
-    def create_annotation(self, annotation_data: Dict) -> Optional[Dict]:
+    def create_annotation(self, annotation_data: Dict, deadline: Optional[Deadline] = None) -> Optional[Dict]:
+        
+        try:
+            timeout = get_timeout(deadline, 10)
+        except DeadlineExceeded as e:
+            logger.warning(f"Skipping annotation: {str(e)}")
+            return None
+        
+        if not self.breaker.allow_request():
+            logger.warning("Hypothesis circuit is open, skipping annotation")
+            return None
         
         try:
             url = f"{self.base_url}/annotations"
             
-            response = requests.post(
+            response = get_http_session().post(
                 url,
                 json=annotation_data,
                 headers=self.headers,
-                timeout=10
+                timeout=timeout
             )
+            self.breaker.record_status(response.status_code)
             
             if response.status_code == 200:
                 annotation = response.json()
@@ -37,27 +56,45 @@ class HypothesisClient:
                 return None
                 
         except requests.RequestException as e:
+            self.breaker.record_exception(e, deadline_limited=timeout < 10)
             logger.error(f"Network error creating annotation: {str(e)}")
             return None
         except Exception as e:
             logger.error(f"Unexpected error creating annotation: {str(e)}")
             return None
     
-    def create_bulk_annotations(self, annotations: List[Dict]) -> Dict:
+    def create_bulk_annotations(self, annotations: List[Dict], deadline: Optional[Deadline] = None) -> Dict:
         
         results = {
             'created': [],
             'failed': [],
+            'skipped': [],
             'total': len(annotations)
         }
         
         for i, annotation_data in enumerate(annotations):
+            # Stop before the deadline and report what was posted rather than timing out mid-way
+            if deadline and not deadline.has_time_for(ANNOTATION_BUDGET_MS):
+                results['skipped'] = [
+                    {'text': remaining.get('text', '')[:50] + '...'} for remaining in annotations[i:]
+                ]
+                logger.warning(f"Out of time, skipping {len(results['skipped'])} remaining annotation(s)")
+                break
+            
             try:
+                # Once Hypothesis is failing, fail the rest immediately instead of waiting out each timeout
+                if self.breaker.is_open():
+                    results['failed'].append({
+                        'error': 'Annotation service unavailable',
+                        'text': annotation_data.get('text', '')[:50] + '...'
+                    })
+                    continue
+                
                 # Add small delay between requests to avoid rate limiting
                 if i > 0:
                     time.sleep(0.5)
                 
-                created_annotation = self.create_annotation(annotation_data)
+                created_annotation = self.create_annotation(annotation_data, deadline)
                 
                 if created_annotation:
                     results['created'].append({
@@ -109,14 +146,16 @@ class HypothesisClient:
 hypothesis_client = HypothesisClient()
 
 
-def create_annotation(annotation_data: Dict) -> Optional[Dict]:
+@traced()
+def create_annotation(annotation_data: Dict, deadline: Optional[Deadline] = None) -> Optional[Dict]:
     """Convenience function for creating single annotation"""
-    return hypothesis_client.create_annotation(annotation_data)
+    return hypothesis_client.create_annotation(annotation_data, deadline)
 
 
-def create_bulk_annotations(annotations: List[Dict]) -> Dict:
+@traced()
+def create_bulk_annotations(annotations: List[Dict], deadline: Optional[Deadline] = None) -> Dict:
     """Convenience function for creating multiple annotations"""
-    return hypothesis_client.create_bulk_annotations(annotations)
+    return hypothesis_client.create_bulk_annotations(annotations, deadline)
 
 
 def validate_annotation_data(annotation_data: Dict) -> bool:
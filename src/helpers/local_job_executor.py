@@ -0,0 +1,208 @@
+import os
+import time
+import queue
+import threading
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LocalJobExecutor:
+    """
+    Fixed-size worker pool with a bounded job queue for local async command processing.
+    Command jobs run through command_processor.run_command_job and background jobs through
+    command_processor.run_background_job, the same code paths as the SQS Lambda.
+    """
+
+    def __init__(self, worker_count: Optional[int] = None, max_queue_size: Optional[int] = None, submit_timeout: Optional[float] = None):
+        self.worker_count = worker_count or int(os.getenv('LOCAL_WORKER_COUNT', '2'))
+        self.max_queue_size = max_queue_size or int(os.getenv('LOCAL_QUEUE_SIZE', '10'))
+        # How long a request may wait for queue space before being rejected (backpressure)
+        self.submit_timeout = submit_timeout if submit_timeout is not None else float(os.getenv('LOCAL_QUEUE_SUBMIT_TIMEOUT', '0.5'))
+
+        self.jobs = queue.Queue(maxsize=self.max_queue_size)
+        self.workers = []
+        self.lock = threading.Lock()
+        self.metrics = {
+            'submitted': 0,
+            'rejected': 0,
+            'completed': 0,
+            'failed': 0,
+            'active': 0,
+            'total_wait_time': 0.0,
+            'max_wait_time': 0.0,
+            'total_run_time': 0.0,
+            'max_run_time': 0.0
+        }
+
+    def start(self):
+        with self.lock:
+            if self.workers:
+                return
+
+            for i in range(self.worker_count):
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"local-job-worker-{i}",
+                    daemon=True  # Workers die when main process exits
+                )
+                worker.start()
+                self.workers.append(worker)
+
+        logger.info(f"Started local job executor with {self.worker_count} worker(s), queue size {self.max_queue_size}")
+
+    def submit(self, interaction_data: Dict[str, Any], command_type: str, application_id: str, interaction_token: str) -> bool:
+        """
+        Queue a command job for processing.
+
+        Returns:
+            bool: True if the job was queued, False if the queue is full
+        """
+        self.start()
+
+        return self._enqueue({
+            'kind': 'command',
+            'name': command_type,
+            'interaction_data': interaction_data,
+            'command_type': command_type,
+            'application_id': application_id,
+            'interaction_token': interaction_token
+        })
+
+    def submit_background(self, job_type: str, payload: Dict[str, Any]) -> bool:
+        """
+        Queue a background job (no Discord follow-up) for processing.
+
+        Returns:
+            bool: True if the job was queued, False if the queue is full
+        """
+        self.start()
+
+        return self._enqueue({
+            'kind': 'background',
+            'name': job_type,
+            'job_type': job_type,
+            'payload': payload
+        })
+
+    def _enqueue(self, job: Dict[str, Any]) -> bool:
+        job['enqueued_at'] = time.monotonic()
+
+        try:
+            self.jobs.put(job, timeout=self.submit_timeout)
+        except queue.Full:
+            with self.lock:
+                self.metrics['rejected'] += 1
+            logger.warning(f"Local job queue is full ({self.max_queue_size}), rejecting '{job['name']}' {job['kind']} job")
+            return False
+
+        with self.lock:
+            self.metrics['submitted'] += 1
+
+        logger.info(f"Queued '{job['name']}' {job['kind']} job (queue depth: {self.jobs.qsize()})")
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        """Lets each worker finish the jobs queued ahead of it, then stops it"""
+        with self.lock:
+            workers, self.workers = self.workers, []
+        for _ in workers:
+            self.jobs.put(None)
+        for worker in workers:
+            worker.join(timeout)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            metrics = dict(self.metrics)
+
+        finished = metrics['completed'] + metrics['failed']
+        started = finished + metrics['active']
+
+        return {
+            'workers': self.worker_count,
+            'queue_depth': self.jobs.qsize(),
+            'max_queue_size': self.max_queue_size,
+            'submitted': metrics['submitted'],
+            'rejected': metrics['rejected'],
+            'active': metrics['active'],
+            'completed': metrics['completed'],
+            'failed': metrics['failed'],
+            'avg_wait_time': metrics['total_wait_time'] / started if started else 0.0,
+            'max_wait_time': metrics['max_wait_time'],
+            'avg_run_time': metrics['total_run_time'] / finished if finished else 0.0,
+            'max_run_time': metrics['max_run_time']
+        }
+
+    def _worker_loop(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self.jobs.task_done()
+                return
+            try:
+                self._run_job(job)
+            finally:
+                self.jobs.task_done()
+
+    def _run_job(self, job: Dict[str, Any]):
+        from command_processor import run_command_job, run_background_job
+
+        name = job['name']
+        wait_time = time.monotonic() - job['enqueued_at']
+
+        with self.lock:
+            self.metrics['active'] += 1
+            self.metrics['total_wait_time'] += wait_time
+            self.metrics['max_wait_time'] = max(self.metrics['max_wait_time'], wait_time)
+
+        logger.info(f"Processing {name} {job['kind']} job in local worker (waited {wait_time:.2f}s)")
+
+        start_time = time.monotonic()
+        success = False
+        try:
+            if job['kind'] == 'background':
+                result = run_background_job(job['job_type'], job['payload'])
+            else:
+                result = run_command_job(
+                    job['interaction_data'],
+                    job['command_type'],
+                    job['application_id'],
+                    job['interaction_token']
+                )
+            success = result.get('success', False)
+        except Exception as e:
+            logger.error(f"Error in local worker processing {name}: {str(e)}")
+        finally:
+            run_time = time.monotonic() - start_time
+            with self.lock:
+                self.metrics['active'] -= 1
+                self.metrics['completed' if success else 'failed'] += 1
+                self.metrics['total_run_time'] += run_time
+                self.metrics['max_run_time'] = max(self.metrics['max_run_time'], run_time)
+
+        logger.info(f"Finished {name} {job['kind']} job in {run_time:.2f}s (queue depth: {self.jobs.qsize()})")
+
+
+# Global instance
+local_job_executor = LocalJobExecutor()
+
+
+def submit_local_job(interaction_data, command_type, application_id, interaction_token):
+    """Convenience function for queueing a command job on the local executor"""
+    return local_job_executor.submit(interaction_data, command_type, application_id, interaction_token)
+
+
+def submit_local_background_job(job_type, payload):
+    """Convenience function for queueing a background job on the local executor"""
+    return local_job_executor.submit_background(job_type, payload)
+
+
+def get_local_job_metrics():
+    """Convenience function for reading local executor metrics"""
+    return local_job_executor.get_metrics()
+
+
+def stop_local_job_executor():
+    """Convenience function for stopping the local executor's workers before exiting"""
+    local_job_executor.stop()
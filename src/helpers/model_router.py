@@ -0,0 +1,124 @@
+import os
+import json
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import dotenv
+
+dotenv.load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelRoute:
+    """A model the analyzer may use, with the largest input it should handle and a latency prior"""
+    model: str
+    max_input_chars: int
+    max_output_tokens: int
+    expected_latency_ms: float
+
+
+@dataclass
+class RouteDecision:
+    model: str
+    max_output_tokens: int
+    estimated_latency_ms: float
+    budget_ms: float
+
+
+# Preferred route first; later routes are faster fallbacks. Output caps sit above the analyzer's floor
+# for a complete response (~2000 tokens) and below what the largest inputs would otherwise get.
+DEFAULT_ROUTES = [
+    ModelRoute(model="gpt-4o-mini", max_input_chars=16000, max_output_tokens=2400, expected_latency_ms=12000),
+    ModelRoute(model="gpt-4.1-nano", max_input_chars=16000, max_output_tokens=2100, expected_latency_ms=6000),
+]
+
+
+class ModelRouter:
+    """
+    Picks a model and output budget for an analysis request from the input size,
+    a latency SLO and the time left in the invocation, using observed latencies per model.
+    """
+
+    def __init__(self, routes: Optional[List[ModelRoute]] = None, latency_slo_ms: Optional[float] = None,
+                 safety_margin_ms: Optional[float] = None, window_size: int = 50):
+        self.routes = routes or self._load_routes()
+        self.latency_slo_ms = latency_slo_ms or float(os.getenv('AI_REVIEW_LATENCY_SLO_MS', '25000'))
+        # Time kept back for annotation posting and the Discord follow-up after the model returns
+        self.safety_margin_ms = safety_margin_ms if safety_margin_ms is not None else float(os.getenv('AI_REVIEW_SAFETY_MARGIN_MS', '15000'))
+        self.window_size = window_size
+        self.latencies: Dict[str, deque] = {}
+        self.lock = threading.Lock()
+
+    def choose(self, input_chars: int, remaining_time_ms: Optional[float] = None, min_output_tokens: int = 0) -> RouteDecision:
+        budget_ms = self.latency_slo_ms
+        if remaining_time_ms is not None:
+            budget_ms = min(budget_ms, remaining_time_ms - self.safety_margin_ms)
+
+        candidates = [route for route in self.routes if route.max_input_chars >= input_chars]
+        if not candidates:
+            # Nothing is sized for this input, so use whichever route accepts the most
+            candidates = [max(self.routes, key=lambda route: route.max_input_chars)]
+
+        chosen = None
+        for route in candidates:
+            if self.estimate_latency_ms(route) <= budget_ms:
+                chosen = route
+                break
+
+        if chosen is None:
+            chosen = min(candidates, key=self.estimate_latency_ms)
+            logger.warning(f"No model fits the {budget_ms:.0f}ms budget, using fastest: {chosen.model}")
+
+        # Output scales with the amount of text reviewed, raised to what a complete response needs
+        # (truncated structured output fails validation entirely) and capped per route
+        if chosen.max_output_tokens < min_output_tokens:
+            logger.warning(f"{chosen.model} caps output at {chosen.max_output_tokens} tokens, below the "
+                           f"{min_output_tokens} a complete response needs")
+        max_output_tokens = min(chosen.max_output_tokens, max(min_output_tokens, 400 + input_chars // 8))
+
+        decision = RouteDecision(
+            model=chosen.model,
+            max_output_tokens=max_output_tokens,
+            estimated_latency_ms=self.estimate_latency_ms(chosen),
+            budget_ms=budget_ms
+        )
+        logger.info(f"Routed {input_chars} chars to {decision.model} (estimate {decision.estimated_latency_ms:.0f}ms, budget {budget_ms:.0f}ms)")
+        return decision
+
+    def record_latency(self, model: str, latency_ms: float):
+        with self.lock:
+            self.latencies.setdefault(model, deque(maxlen=self.window_size)).append(latency_ms)
+
+    def estimate_latency_ms(self, route: ModelRoute) -> float:
+        # p95 of recent calls once there are enough samples, otherwise the configured prior
+        with self.lock:
+            samples = sorted(self.latencies.get(route.model, []))
+        if len(samples) < 5:
+            return route.expected_latency_ms
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def get_stats(self) -> Dict[str, Dict]:
+        stats = {}
+        for route in self.routes:
+            with self.lock:
+                samples = list(self.latencies.get(route.model, []))
+            stats[route.model] = {
+                'samples': len(samples),
+                'estimated_latency_ms': self.estimate_latency_ms(route)
+            }
+        return stats
+
+    def _load_routes(self) -> List[ModelRoute]:
+        # AI_REVIEW_MODEL_ROUTES accepts a JSON list of ModelRoute fields to override the defaults
+        routes_json = os.getenv('AI_REVIEW_MODEL_ROUTES')
+        if not routes_json:
+            return list(DEFAULT_ROUTES)
+
+        try:
+            return [ModelRoute(**route) for route in json.loads(routes_json)]
+        except Exception as e:
+            logger.error(f"Invalid AI_REVIEW_MODEL_ROUTES, using defaults: {str(e)}")
+            return list(DEFAULT_ROUTES)
@@ -0,0 +1,122 @@
+import hashlib
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import PyPDF2
+
+logger = logging.getLogger(__name__)
+
+# Hex characters kept per page; collisions only matter between pages of two versions of one resume
+FINGERPRINT_LENGTH = 16
+# Back-references to the page tree; following them would hash the whole document into every page
+SKIPPED_KEYS = {'/Parent', '/P', '/StructParents'}
+
+
+def _object_digest(obj: Any, digests: Dict[Tuple[int, int], bytes]) -> bytes:
+    """
+    Digest of a PDF object and everything it references: dictionaries by sorted key, arrays in
+    order, streams by their dictionary and decoded data. Indirect objects are hashed once per
+    document, so fonts and XObjects shared between pages cost nothing after the first page.
+    """
+    reference = (obj.idnum, obj.generation) if hasattr(obj, 'idnum') else None
+    if reference is not None:
+        if reference in digests:
+            return digests[reference]
+        # Placeholder so reference cycles terminate
+        digests[reference] = b'cycle'
+        obj = obj.get_object()
+
+    hasher = hashlib.sha256()
+    if isinstance(obj, dict):
+        hasher.update(b'dict')
+        for key in sorted(obj.keys()):
+            if key in SKIPPED_KEYS:
+                continue
+            hasher.update(str(key).encode('utf-8'))
+            hasher.update(_object_digest(obj[key] if not hasattr(obj, 'raw_get') else obj.raw_get(key), digests))
+        if hasattr(obj, 'get_data'):
+            hasher.update(b'stream')
+            hasher.update(obj.get_data())
+    elif isinstance(obj, list):
+        hasher.update(b'array')
+        for item in obj:
+            hasher.update(_object_digest(item, digests))
+    elif isinstance(obj, bytes):
+        hasher.update(b'bytes')
+        hasher.update(obj)
+    else:
+        hasher.update(f"{type(obj).__name__}:{obj}".encode('utf-8', 'surrogatepass'))
+
+    digest = hasher.digest()
+    if reference is not None:
+        digests[reference] = digest
+    return digest
+
+
+def fingerprint_page(page, digests: Optional[Dict[Tuple[int, int], bytes]] = None) -> str:
+    """
+    Hash of what a page draws: its decoded content stream plus its resources, including form
+    XObjects (text drawn via /Fm0 Do) and font dictionaries and encodings. When the resources
+    can't be resolved, the page's extracted text is hashed instead.
+    """
+    digests = {} if digests is None else digests
+    hasher = hashlib.sha256()
+    try:
+        contents = page.get_contents()
+        hasher.update(contents.get_data() if contents is not None else b"")
+        # Resources may be inherited from an ancestor in the page tree
+        node = page
+        while node is not None and '/Resources' not in node:
+            parent = node.get('/Parent')
+            node = parent.get_object() if parent is not None else None
+        if node is not None:
+            hasher.update(_object_digest(node.raw_get('/Resources'), digests))
+    except Exception as e:
+        logger.warning(f"Falling back to text fingerprint for page: {str(e)}")
+        hasher = hashlib.sha256(b'text')
+        hasher.update((page.extract_text() or '').encode('utf-8', 'surrogatepass'))
+    return hasher.hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def compute_page_fingerprints(pdf_reader: PyPDF2.PdfReader) -> List[str]:
+    digests = {}
+    return [fingerprint_page(page, digests) for page in pdf_reader.pages]
+
+
+def serialize_page_fingerprints(fingerprints: Optional[Sequence[str]]) -> Optional[str]:
+    # Stored as a single string attribute so resume items keep converting from plain S/N values
+    if not fingerprints:
+        return None
+    return ','.join(fingerprints)
+
+
+def parse_page_fingerprints(value: Optional[str]) -> Optional[List[str]]:
+    if not value:
+        return None
+    return value.split(',')
+
+
+def changed_page_indices(old_fingerprints: Sequence[str], new_fingerprints: Sequence[str]) -> Tuple[List[int], List[int]]:
+    """
+    Indices of the pages in each version with no identical page in the other. Pages are matched
+    by fingerprint rather than position, so inserting or removing a page doesn't mark the pages
+    after it as changed. As a consequence a pure reorder of otherwise identical pages reports no
+    changed pages; the line diff would only show the moved text anyway.
+    """
+    unmatched_new = Counter(new_fingerprints)
+    old_changed = []
+    for index, fingerprint in enumerate(old_fingerprints):
+        if unmatched_new[fingerprint] > 0:
+            unmatched_new[fingerprint] -= 1
+        else:
+            old_changed.append(index)
+
+    unmatched_old = Counter(old_fingerprints)
+    new_changed = []
+    for index, fingerprint in enumerate(new_fingerprints):
+        if unmatched_old[fingerprint] > 0:
+            unmatched_old[fingerprint] -= 1
+        else:
+            new_changed.append(index)
+
+    return old_changed, new_changed
@@ -0,0 +1,203 @@
+import os
+import abc
+import logging
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Sequence
+import dotenv
+from helpers.page_fingerprints import fingerprint_page
+
+dotenv.load_dotenv()
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = 'pypdf2'
+
+
+class PDFTextBackend(abc.ABC):
+    """
+    Text extraction library behind the PDF sandbox. Subclasses open a document from bytes and
+    return per-page text; backends that expose raw content streams also provide page fingerprints.
+    """
+    name = ''
+    module = ''
+
+    def is_available(self) -> bool:
+        try:
+            __import__(self.module)
+            return True
+        except ImportError:
+            return False
+
+    @abc.abstractmethod
+    def open(self, pdf_bytes: bytes) -> Any:
+        ...
+
+    @abc.abstractmethod
+    def page_count(self, document: Any) -> int:
+        ...
+
+    @abc.abstractmethod
+    def page_text(self, document: Any, index: int) -> str:
+        ...
+
+    def page_fingerprints(self, document: Any) -> Optional[List[str]]:
+        """None when the backend can't read content streams; callers then fingerprint with PyPDF2"""
+        return None
+
+    def close(self, document: Any):
+        pass
+
+    def count_pages(self, pdf_bytes: bytes) -> int:
+        document = self.open(pdf_bytes)
+        try:
+            return self.page_count(document)
+        finally:
+            self.close(document)
+
+    def extract_text(self, pdf_bytes: bytes, page_indices: Optional[Sequence[int]] = None) -> str:
+        document = self.open(pdf_bytes)
+        try:
+            return self.extract_document_text(document, page_indices)
+        finally:
+            self.close(document)
+
+    def extract_document_text(self, document: Any, page_indices: Optional[Sequence[int]] = None) -> str:
+        if page_indices is None:
+            page_indices = range(self.page_count(document))
+
+        text_content = ""
+        for index in page_indices:
+            text_content += self.page_text(document, index) + "\n"
+        return text_content.strip()
+
+
+class PyPDF2Backend(PDFTextBackend):
+    name = 'pypdf2'
+    module = 'PyPDF2'
+
+    def open(self, pdf_bytes):
+        import PyPDF2
+        return PyPDF2.PdfReader(BytesIO(pdf_bytes))
+
+    def page_count(self, document):
+        return len(document.pages)
+
+    def page_text(self, document, index):
+        return document.pages[index].extract_text()
+
+    def page_fingerprints(self, document):
+        digests = {}
+        return [fingerprint_page(page, digests) for page in document.pages]
+
+
+class PypdfBackend(PyPDF2Backend):
+    """pypdf is PyPDF2's maintained successor; its extractor handles more font encodings but does more work per page"""
+    name = 'pypdf'
+    module = 'pypdf'
+
+    def open(self, pdf_bytes):
+        import pypdf
+        return pypdf.PdfReader(BytesIO(pdf_bytes))
+
+
+class PdfiumBackend(PDFTextBackend):
+    """PDFium bindings (pip install pypdfium2); native extraction, fastest on large documents"""
+    name = 'pypdfium2'
+    module = 'pypdfium2'
+
+    def open(self, pdf_bytes):
+        import pypdfium2
+        return pypdfium2.PdfDocument(pdf_bytes)
+
+    def page_count(self, document):
+        return len(document)
+
+    def page_text(self, document, index):
+        page = document[index]
+        try:
+            text_page = page.get_textpage()
+            try:
+                return text_page.get_text_range()
+            finally:
+                text_page.close()
+        finally:
+            page.close()
+
+    def close(self, document):
+        document.close()
+
+
+class PdfminerBackend(PDFTextBackend):
+    """pdfminer.six (pip install pdfminer.six); slow but the most faithful reading order"""
+    name = 'pdfminer'
+    module = 'pdfminer'
+
+    def open(self, pdf_bytes):
+        # pdfminer works on a stream per call, so the document is just the bytes
+        return pdf_bytes
+
+    def page_count(self, document):
+        from pdfminer.pdfpage import PDFPage
+        return sum(1 for _ in PDFPage.get_pages(BytesIO(document)))
+
+    def page_text(self, document, index):
+        from pdfminer.high_level import extract_text
+        return extract_text(BytesIO(document), page_numbers=[index])
+
+    def extract_document_text(self, document, page_indices=None):
+        # One layout pass over the selected pages instead of one per page
+        from pdfminer.high_level import extract_text
+        if page_indices is not None and not page_indices:
+            return ""
+        page_numbers = set(page_indices) if page_indices is not None else None
+        return extract_text(BytesIO(document), page_numbers=page_numbers).strip()
+
+
+BACKENDS: Dict[str, PDFTextBackend] = {
+    backend.name: backend for backend in (PyPDF2Backend(), PypdfBackend(), PdfiumBackend(), PdfminerBackend())
+}
+
+
+def get_available_backends() -> List[str]:
+    return [name for name, backend in BACKENDS.items() if backend.is_available()]
+
+
+def load_backend(name: Optional[str] = None) -> PDFTextBackend:
+    """Backend named by PDF_TEXT_BACKEND, falling back to PyPDF2 when it's unknown or not installed"""
+    name = (name or os.getenv('PDF_TEXT_BACKEND', DEFAULT_BACKEND)).lower()
+    backend = BACKENDS.get(name)
+
+    if backend is None:
+        logger.error(f"Unknown PDF_TEXT_BACKEND {name}, falling back to {DEFAULT_BACKEND}. "
+                     f"Available: {', '.join(get_available_backends())}")
+        return BACKENDS[DEFAULT_BACKEND]
+    if not backend.is_available():
+        logger.error(f"PDF_TEXT_BACKEND {name} is set but {backend.module} is not installed (add it to "
+                     f"requirements.txt), falling back to {DEFAULT_BACKEND}")
+        return BACKENDS[DEFAULT_BACKEND]
+    logger.info(f"Using PDF text backend {name}")
+    return backend
+
+
+# Global instance
+configured_backend_name = os.getenv('PDF_TEXT_BACKEND', DEFAULT_BACKEND).lower()
+pdf_text_backend = load_backend(configured_backend_name)
+
+
+def get_pdf_text_backend():
+    """Convenience function for the configured text extraction backend"""
+    return pdf_text_backend
+
+
+def get_pdf_text_backend_name():
+    """Convenience function for the configured backend's name, which also versions cached extraction output"""
+    return pdf_text_backend.name
+
+
+def get_pdf_text_backend_stats():
+    """Convenience function for reporting the backend in use, and whether it is the configured one"""
+    return {
+        'configured': configured_backend_name,
+        'active': pdf_text_backend.name,
+        'fallback': pdf_text_backend.name != configured_backend_name,
+        'available': get_available_backends()
+    }
@@ -1,39 +1,113 @@
 import os
 import logging
 import requests
-import io
-from PyPDF2 import PdfReader
-from typing import Optional
+from dataclasses import dataclass
+from typing import Optional, List, Tuple
+from helpers.circuit_breaker import get_circuit_breaker, CircuitOpenError
+from helpers.deadline import Deadline, DeadlineExceeded, get_timeout
+from helpers.http_session import get_http_session
+from helpers.disk_cache import get_cached_pdf, cache_pdf, get_cached_pdf_text, cache_pdf_text
+from helpers.pdf_sandbox import extract_pdf_text, PDFSandboxError
+from helpers.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# Canonical section name -> headings that introduce it (compared lowercase, without trailing punctuation)
+SECTION_HEADINGS = {
+    'summary': ['summary', 'professional summary', 'profile', 'objective', 'about me'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'relevant experience', 'internships',
+                   'internship experience', 'technical experience'],
+    'projects': ['projects', 'personal projects', 'technical projects', 'academic projects',
+                 'selected projects', 'side projects'],
+    'education': ['education', 'academic background', 'education and training'],
+    'skills': ['skills', 'technical skills', 'technologies', 'skills and interests', 'core competencies'],
+    'awards': ['awards', 'honors', 'honors and awards', 'achievements', 'certifications',
+               'certifications and awards'],
+    'activities': ['activities', 'leadership', 'extracurricular activities', 'volunteering',
+                   'volunteer experience', 'leadership and activities'],
+}
 
-def extract_text_from_pdf_url(pdf_url: str) -> Optional[str]:
+MAX_HEADING_LENGTH = 40
+
+
+@dataclass
+class ResumeSection:
+    """A contiguous section of resume text with character offsets into the source text"""
+    name: str      # Canonical section name, 'header' for text before the first heading
+    heading: str   # Heading line as it appears in the text
+    start: int     # Offset of the heading (or 0 for the header)
+    end: int       # Offset one past the last character of the section
+    text: str
+
+
+@traced()
+def download_pdf(pdf_url: str, breaker_name: str = 'pdf_storage', deadline: Optional[Deadline] = None) -> requests.Response:
+    """
+    Downloads a PDF through the named dependency's circuit breaker, with a timeout that fits the deadline.
+    Raises CircuitOpenError or DeadlineExceeded without a network call when the download can't succeed.
+    """
+    timeout = get_timeout(deadline, 30)
+    breaker = get_circuit_breaker(breaker_name)
+    breaker.check()
     
     try:
-        # Download PDF content
-        response = requests.get(pdf_url, timeout=30)
-        response.raise_for_status()
+        response = get_http_session().get(pdf_url, timeout=timeout)
+    except requests.RequestException as e:
+        breaker.record_exception(e, deadline_limited=timeout < 30)
+        raise
+    
+    breaker.record_status(response.status_code)
+    return response
+
+
+@traced()
+def fetch_pdf_content(pdf_url: str, breaker_name: str = 'pdf_storage', deadline: Optional[Deadline] = None) -> bytes:
+    """
+    Returns a PDF's bytes from the /tmp disk cache, downloading and caching them on a miss.
+    Stored resumes and Discord attachments never change under the same URL, so a hit needs no revalidation.
+    """
+    pdf_bytes = get_cached_pdf(pdf_url)
+    if pdf_bytes is not None:
+        logger.info(f"PDF served from disk cache: {pdf_url}")
+        return pdf_bytes
+    
+    response = download_pdf(pdf_url, breaker_name, deadline)
+    response.raise_for_status()
+    
+    cache_pdf(pdf_url, response.content)
+    return response.content
+
+
+@traced()
+def extract_text_from_pdf_url(pdf_url: str, deadline: Optional[Deadline] = None) -> Optional[str]:
+    
+    try:
+        cached_text = get_cached_pdf_text(pdf_url)
+        if cached_text:
+            logger.info(f"Extracted text served from disk cache: {pdf_url}")
+            return cached_text
         
-        # Create PDF reader from bytes
-        pdf_buffer = io.BytesIO(response.content)
-        pdf_reader = PdfReader(pdf_buffer)
+        # Download PDF content
+        pdf_bytes = fetch_pdf_content(pdf_url, deadline=deadline)
         
-        # Extract text from all pages
-        text_content = ""
-        for page in pdf_reader.pages:
-            text_content += page.extract_text() + "\n"
+        # Extract text from all pages, in the parsing sandbox since the PDF is user-supplied
+        text_content = extract_pdf_text(pdf_bytes, deadline)
         
         if not text_content.strip():
             logger.warning(f"No text content extracted from PDF: {pdf_url}")
             return None
             
         logger.info(f"Successfully extracted {len(text_content)} characters from PDF")
+        cache_pdf_text(pdf_url, text_content.strip())
         return text_content.strip()
         
-    except requests.RequestException as e:
+    except (requests.RequestException, CircuitOpenError, DeadlineExceeded) as e:
         logger.error(f"Error downloading PDF from {pdf_url}: {str(e)}")
         return None
+    except PDFSandboxError as e:
+        logger.error(f"Error parsing PDF from {pdf_url} ({e.error_type}): {str(e)}")
+        return None
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
         return None
@@ -71,4 +145,61 @@ def validate_resume_content(text: str) -> bool:
     found_indicators = sum(1 for indicator in resume_indicators if indicator in text_lower)
     
     # If we find at least 3 resume indicators, consider it a resume
-    return found_indicators >= 3
\ No newline at end of file
+    return found_indicators >= 3
+
+
+def match_section_heading(line: str) -> Optional[str]:
+    
+    candidate = line.strip().rstrip(':').strip().lower()
+    if not candidate or len(candidate) > MAX_HEADING_LENGTH:
+        return None
+    
+    candidate = ' '.join(candidate.replace('&', 'and').split())
+    for section_name, headings in SECTION_HEADINGS.items():
+        if candidate in headings:
+            return section_name
+    
+    return None
+
+
+def segment_resume_sections(text: str) -> List[ResumeSection]:
+    """
+    Split resume text into sections at recognised headings.
+    Offsets index into the given text so they can be reused for diffs and annotation anchoring.
+    """
+    if not text:
+        return []
+    
+    boundaries: List[Tuple[int, str, str]] = []  # (offset, name, heading)
+    offset = 0
+    for line in text.split('\n'):
+        section_name = match_section_heading(line)
+        if section_name:
+            boundaries.append((offset, section_name, line.strip()))
+        offset += len(line) + 1
+    
+    sections = []
+    first_offset = boundaries[0][0] if boundaries else len(text)
+    if text[:first_offset].strip():
+        sections.append(ResumeSection('header', '', 0, first_offset, text[:first_offset]))
+    
+    for i, (start, section_name, heading) in enumerate(boundaries):
+        end = boundaries[i + 1][0] if i + 1 < len(boundaries) else len(text)
+        sections.append(ResumeSection(section_name, heading, start, end, text[start:end]))
+    
+    return sections
+
+
+def extract_relevant_sections(text: str, section_names=('experience', 'projects')) -> str:
+    """
+    Return only the text of the requested sections, in document order.
+    Falls back to the full text when none of them can be found.
+    """
+    sections = [section for section in segment_resume_sections(text) if section.name in section_names]
+    if not sections:
+        logger.info("No relevant resume sections detected, using full text")
+        return text
+    
+    relevant_text = '\n'.join(section.text.strip() for section in sections)
+    logger.info(f"Selected {len(sections)} resume section(s): {len(relevant_text)}/{len(text)} chars")
+    return relevant_text
\ No newline at end of file
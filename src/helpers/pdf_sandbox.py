@@ -0,0 +1,359 @@
+import os
+import time
+import queue
+import signal
+import logging
+import threading
+import multiprocessing
+from io import BytesIO
+from typing import Any, Dict, List, Optional
+import PyPDF2
+import dotenv
+from helpers.deadline import Deadline, get_timeout
+from helpers.page_fingerprints import compute_page_fingerprints, changed_page_indices
+from helpers.pdf_backends import get_pdf_text_backend, get_pdf_text_backend_stats
+from helpers.tracing import span
+
+try:
+    import resource
+except ImportError:  # Not available on Windows dev machines
+    resource = None
+
+dotenv.load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Error types reported back by the sandbox
+PARSE_ERROR = 'parse_error'
+TIMEOUT = 'timeout'
+CPU_LIMIT = 'cpu_limit'
+MEMORY_LIMIT = 'memory_limit'
+CRASHED = 'crashed'
+BUSY = 'busy'
+
+
+class PDFSandboxError(Exception):
+    """Raised when a PDF can't be parsed, or its parse was stopped for exceeding a limit."""
+
+    def __init__(self, error_type: str, message: str):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+def _op_page_count(pdf_bytes: bytes) -> int:
+    return get_pdf_text_backend().count_pages(pdf_bytes)
+
+
+def _op_extract_text(pdf_bytes: bytes) -> str:
+    return get_pdf_text_backend().extract_text(pdf_bytes)
+
+
+def _op_page_fingerprints(pdf_bytes: bytes) -> List[str]:
+    return compute_page_fingerprints(PyPDF2.PdfReader(BytesIO(pdf_bytes)))
+
+
+def _op_extract_changed_pages(old_bytes: bytes, new_bytes: bytes) -> Dict[str, Any]:
+    backend = get_pdf_text_backend()
+    old_document = backend.open(old_bytes)
+    new_document = backend.open(new_bytes)
+    try:
+        # Backends without access to content streams are fingerprinted with PyPDF2, which only parses
+        old_fingerprints = backend.page_fingerprints(old_document) or _op_page_fingerprints(old_bytes)
+        new_fingerprints = backend.page_fingerprints(new_document) or _op_page_fingerprints(new_bytes)
+        old_pages, new_pages = changed_page_indices(old_fingerprints, new_fingerprints)
+        return {
+            'old_text': backend.extract_document_text(old_document, old_pages),
+            'new_text': backend.extract_document_text(new_document, new_pages),
+            'old_fingerprints': old_fingerprints,
+            'new_fingerprints': new_fingerprints,
+            'old_pages': old_pages,
+            'new_pages': new_pages
+        }
+    finally:
+        backend.close(old_document)
+        backend.close(new_document)
+
+
+OPERATIONS = {
+    'page_count': _op_page_count,
+    'extract_text': _op_extract_text,
+    'page_fingerprints': _op_page_fingerprints,
+    'extract_changed_pages': _op_extract_changed_pages,
+}
+
+
+def _address_space_bytes() -> int:
+    # A forked worker starts with the fork server's address space, so its limit is set relative to that
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+
+
+# How often an idle worker checks that the process that forked it is still alive
+PARENT_CHECK_SECONDS = 1.0
+# Workers are forked by multiprocessing's fork server, a single-threaded process started with exec
+# that has imported this module. A plain fork of the application process would copy locks held by
+# its other threads (logging, urllib3, imports), and a worker could hang on one of them.
+START_METHOD = 'forkserver'
+
+
+def _worker_main(conn, memory_limit_bytes: int, cpu_seconds: int):
+    """Worker loop: one request at a time, {'op', 'args'} in and {'ok', 'result' | 'error_type', 'message'} out"""
+    # The fork server exits when the application process does, so a changed parent means we're orphaned
+    parent_pid = os.getppid()
+
+    if resource is not None:
+        try:
+            limit = _address_space_bytes() + memory_limit_bytes
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (OSError, ValueError) as e:
+            logger.warning(f"PDF sandbox worker running without a memory limit: {str(e)}")
+
+    while True:
+        try:
+            # If the parent was killed before closing its pipe ends, exit instead of waiting forever
+            while not conn.poll(PARENT_CHECK_SECONDS):
+                if os.getppid() != parent_pid:
+                    return
+            request = conn.recv()
+        except (EOFError, OSError):
+            return
+        if request is None:
+            return
+
+        if resource is not None:
+            # RLIMIT_CPU counts the worker's lifetime, so each request gets its allowance on top of what's used
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            soft_limit = int(usage.ru_utime + usage.ru_stime) + cpu_seconds
+            resource.setrlimit(resource.RLIMIT_CPU, (soft_limit, resource.RLIM_INFINITY))
+
+        try:
+            result = OPERATIONS[request['op']](*request['args'])
+            conn.send({'ok': True, 'result': result})
+        except MemoryError:
+            # The heap may be fragmented past recovery, so report and let the pool replace this worker
+            conn.send({'ok': False, 'error_type': MEMORY_LIMIT, 'message': "PDF needed more memory than allowed"})
+            return
+        except Exception as e:
+            conn.send({'ok': False, 'error_type': PARSE_ERROR, 'message': str(e) or type(e).__name__})
+
+
+class SandboxWorker:
+    def __init__(self, context, memory_limit_bytes: int, cpu_seconds: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, memory_limit_bytes, cpu_seconds),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.join(1)
+        except Exception:
+            pass
+        self.conn.close()
+
+
+class PDFSandbox:
+    """
+    Pool of pre-forked worker processes that parse untrusted PDFs. Each worker runs under an
+    address-space limit and a per-request CPU limit, and the caller kills it if it doesn't answer
+    within the wall-clock timeout. A worker that hits a limit or crashes is replaced straight away,
+    so one pathological upload fails fast without taking the Lambda or other requests with it.
+    Handlers call start() at import so the pool is up before the first request needs it.
+    """
+
+    def __init__(self, pool_size: Optional[int] = None, timeout_seconds: Optional[float] = None,
+                 cpu_seconds: Optional[int] = None, memory_mb: Optional[int] = None):
+        self.enabled = os.getenv('PDF_SANDBOX_ENABLED', 'true').lower() == 'true'
+        if self.enabled and START_METHOD not in multiprocessing.get_all_start_methods():
+            logger.warning(f"{START_METHOD} is unavailable, PDF parsing will run in-process")
+            self.enabled = False
+
+        self.pool_size = pool_size or int(os.getenv('PDF_SANDBOX_WORKERS', '2'))
+        self.timeout_seconds = timeout_seconds or float(os.getenv('PDF_SANDBOX_TIMEOUT_SECONDS', '10'))
+        self.cpu_seconds = cpu_seconds or int(os.getenv('PDF_SANDBOX_CPU_SECONDS', '8'))
+        self.memory_limit_bytes = (memory_mb or int(os.getenv('PDF_SANDBOX_MEMORY_MB', '256'))) * 1024 * 1024
+
+        self.idle_workers = queue.Queue()
+        # Every live worker, idle or checked out
+        self.workers: List[SandboxWorker] = []
+        self.started = False
+        self.runs = 0
+        self.respawns = 0
+        self.failures: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def run(self, op: str, *args, deadline: Optional[Deadline] = None) -> Any:
+        """Runs an operation in a worker and returns its result, raising PDFSandboxError on failure"""
+        with span(f"sandbox.{op}", isolated=self.enabled):
+            return self._run(op, *args, deadline=deadline)
+
+    def _run(self, op: str, *args, deadline: Optional[Deadline] = None) -> Any:
+        if not self.enabled:
+            try:
+                return OPERATIONS[op](*args)
+            except Exception as e:
+                raise PDFSandboxError(PARSE_ERROR, str(e) or type(e).__name__)
+
+        # Waiting for a free worker and the parse itself share one timeout
+        timeout = get_timeout(deadline, self.timeout_seconds)
+        expires_at = time.monotonic() + timeout
+        worker = self._checkout(timeout)
+        started_at = time.monotonic()
+
+        try:
+            worker.conn.send({'op': op, 'args': args})
+            if not worker.conn.poll(max(0.0, expires_at - time.monotonic())):
+                self._replace(worker)
+                self._fail(TIMEOUT, f"PDF parsing took longer than {timeout:.1f}s")
+            response = worker.conn.recv()
+        except (EOFError, OSError):
+            worker.process.join(1)
+            cpu_killed = worker.process.exitcode == -signal.SIGXCPU
+            self._replace(worker)
+            if cpu_killed:
+                self._fail(CPU_LIMIT, "PDF parsing used more CPU time than allowed")
+            self._fail(CRASHED, "PDF parsing worker exited unexpectedly")
+
+        with self.lock:
+            self.runs += 1
+
+        if response.get('error_type') == MEMORY_LIMIT:
+            self._replace(worker)
+        else:
+            self.idle_workers.put(worker)
+
+        if not response['ok']:
+            self._fail(response['error_type'], response['message'])
+
+        logger.info(f"PDF sandbox {op} took {(time.monotonic() - started_at) * 1000:.0f}ms")
+        return response['result']
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'enabled': self.enabled,
+                'workers': self.pool_size if self.started else 0,
+                'idle': self.idle_workers.qsize(),
+                'runs': self.runs,
+                'respawns': self.respawns,
+                'failures': dict(self.failures),
+                # A configured backend that isn't installed shows up here as a fallback
+                'text_backend': get_pdf_text_backend_stats()
+            }
+
+    def _checkout(self, timeout: float) -> SandboxWorker:
+        self.start()
+        expires_at = time.monotonic() + timeout
+        try:
+            worker = self.idle_workers.get(timeout=timeout)
+            while not worker.is_alive():
+                self._replace(worker)
+                worker = self.idle_workers.get(timeout=max(0.0, expires_at - time.monotonic()))
+        except queue.Empty:
+            self._fail(BUSY, "All PDF parsing workers are busy")
+        return worker
+
+    def start(self):
+        """Starts the fork server and the workers; later calls do nothing"""
+        if not self.enabled:
+            return
+        with self.lock:
+            if self.started:
+                return
+            for _ in range(self.pool_size):
+                self.idle_workers.put(self._spawn())
+            self.started = True
+            logger.info(f"Started {self.pool_size} PDF sandbox workers")
+
+    def _replace(self, worker: SandboxWorker):
+        """Kills a worker and forks its replacement now, so the next request doesn't pay for the fork"""
+        worker.kill()
+        with self.lock:
+            if worker in self.workers:
+                self.workers.remove(worker)
+            replacement = self._spawn()
+            self.respawns += 1
+        self.idle_workers.put(replacement)
+
+    def _spawn(self) -> SandboxWorker:
+        # Called with self.lock held
+        context = multiprocessing.get_context(START_METHOD)
+        # The fork server imports this module once, so each worker starts with the parsers loaded
+        context.set_forkserver_preload([__name__])
+        worker = SandboxWorker(context, self.memory_limit_bytes, self.cpu_seconds)
+        self.workers.append(worker)
+        return worker
+
+    def shutdown(self):
+        """Stops every worker; used by benchmarks and tools that exit without multiprocessing's atexit cleanup"""
+        with self.lock:
+            workers, self.workers = self.workers, []
+            self.started = False
+        for worker in workers:
+            try:
+                worker.conn.send(None)
+            except (OSError, ValueError):
+                pass
+            worker.process.join(1)
+            worker.kill()
+        while not self.idle_workers.empty():
+            try:
+                self.idle_workers.get_nowait()
+            except queue.Empty:
+                break
+
+    def _fail(self, error_type: str, message: str):
+        with self.lock:
+            self.failures[error_type] = self.failures.get(error_type, 0) + 1
+        logger.warning(f"PDF sandbox {error_type}: {message}")
+        raise PDFSandboxError(error_type, message)
+
+
+# Global instance
+pdf_sandbox = PDFSandbox()
+
+
+def count_pdf_pages(pdf_bytes, deadline=None):
+    """Convenience function for counting pages of an untrusted PDF in the sandbox"""
+    return pdf_sandbox.run('page_count', pdf_bytes, deadline=deadline)
+
+
+def extract_pdf_text(pdf_bytes, deadline=None):
+    """Convenience function for extracting all text from an untrusted PDF in the sandbox"""
+    return pdf_sandbox.run('extract_text', pdf_bytes, deadline=deadline)
+
+
+def fingerprint_pdf_pages(pdf_bytes, deadline=None):
+    """Convenience function for fingerprinting an untrusted PDF's pages, returning None if it can't be parsed"""
+    try:
+        return pdf_sandbox.run('page_fingerprints', pdf_bytes, deadline=deadline)
+    except Exception as e:
+        logger.error(f"Failed to fingerprint PDF pages: {str(e)}")
+        return None
+
+
+def extract_changed_pages(old_bytes, new_bytes, deadline=None):
+    """Convenience function for extracting the text of pages that differ between two PDFs in the sandbox"""
+    return pdf_sandbox.run('extract_changed_pages', old_bytes, new_bytes, deadline=deadline)
+
+
+def start_pdf_sandbox():
+    """Convenience function for starting the sandbox workers ahead of the first PDF"""
+    pdf_sandbox.start()
+
+
+def get_pdf_sandbox_stats():
+    """Convenience function for reporting sandbox usage and failures"""
+    return pdf_sandbox.get_stats()
+
+
+def shutdown_pdf_sandbox():
+    """Convenience function for stopping the sandbox workers before exiting"""
+    pdf_sandbox.shutdown()
@@ -0,0 +1,283 @@
+import os
+import sys
+import json
+import time
+import queue
+import logging
+import tempfile
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional
+import dotenv
+from aws.s3 import save_s3_profile
+from helpers.tracing import get_current_trace
+
+dotenv.load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Deeper stacks are cut from the root end, keeping the frames nearest the sample
+MAX_STACK_DEPTH = 64
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def format_frame(code) -> str:
+    """Short, stable name for a code object, e.g. commands/update.py:handle_update_command"""
+    filename = code.co_filename
+    if filename.startswith(SRC_DIR):
+        filename = os.path.relpath(filename, SRC_DIR)
+    elif 'site-packages' in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[-1]
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{code.co_name}"
+
+
+class ProfileSession:
+    """Stack samples for one invocation on one thread"""
+
+    def __init__(self, name: str, path: str, threshold_ms: float):
+        self.name = name
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self.start = time.perf_counter()
+        self.samples = Counter()
+
+    @property
+    def duration_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def add(self, frame):
+        # Code objects are hashable and cheap to collect; names are only built for kept profiles
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        self.samples[tuple(reversed(stack))] += 1
+
+
+class _ProfileContext:
+    def __init__(self, profiler: 'SamplingProfiler', name: str, path: str):
+        self.profiler = profiler
+        self.name = name
+        self.path = path
+        self.session = None
+
+    def __enter__(self):
+        self.session = self.profiler.begin(self.name, self.path)
+        return self.session
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.session is not None:
+            self.profiler.end(self.session)
+        return False
+
+
+class SamplingProfiler:
+    """
+    Tail-sampled profiling of commands and jobs. While any invocation is running, one
+    background thread samples the stacks of the threads running them every interval; an
+    invocation that finishes under its threshold just drops its samples. A slow one is
+    written as collapsed stacks (flamegraph/speedscope input) together with its trace spans,
+    to S3 on Lambda or to /tmp locally. Interaction profiles are written by a background writer
+    thread so a slow interaction never also waits on the upload before answering Discord.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv('PROFILER_ENABLED', 'true').lower() == 'true'
+        self.interval = float(os.getenv('PROFILER_INTERVAL_MS', '10')) / 1000
+        # Interactions are slow well before Discord's 3s limit; jobs normally wait seconds on OpenAI
+        self.thresholds_ms = {
+            'interaction': float(os.getenv('PROFILE_INTERACTION_THRESHOLD_MS', '2000')),
+            'command_job': float(os.getenv('PROFILE_JOB_THRESHOLD_MS', '20000')),
+            'background_job': float(os.getenv('PROFILE_JOB_THRESHOLD_MS', '20000'))
+        }
+        on_lambda = bool(os.getenv('AWS_LAMBDA_FUNCTION_NAME')) and bool(os.getenv('S3_BUCKET_NAME'))
+        self.output = os.getenv('PROFILE_OUTPUT', 's3' if on_lambda else 'tmp').lower()
+        self.profile_dir = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'resuralph-profiles'))
+        # Lambda's /tmp is shared with the disk cache, so only the newest profiles are kept there
+        self.max_files = int(os.getenv('PROFILE_MAX_FILES', '20'))
+        self.sessions: Dict[int, ProfileSession] = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        # Bounded so a burst of slow interactions can't pile up profiles in memory
+        self.pending_writes = queue.Queue(maxsize=int(os.getenv('PROFILE_WRITE_QUEUE_SIZE', '8')))
+        self.writer = None
+        self.stats = {'profiled': 0, 'kept': 0, 'discarded': 0, 'dropped': 0, 'samples': 0, 'write_errors': 0}
+
+    def profile(self, name: str, path: str) -> _ProfileContext:
+        """Profiles the block; the result is kept only if it runs past the path's threshold"""
+        return _ProfileContext(self, name, path)
+
+    def begin(self, name: str, path: str) -> Optional[ProfileSession]:
+        if not self.enabled:
+            return None
+        thread_id = threading.get_ident()
+        session = ProfileSession(name, path, self.thresholds_ms.get(path, self.thresholds_ms['command_job']))
+
+        with self.lock:
+            # A job run inline by the local processor is already covered by the outer invocation
+            if thread_id in self.sessions:
+                return None
+            self.sessions[thread_id] = session
+            self.stats['profiled'] += 1
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._sample_loop, name='sampling-profiler', daemon=True)
+                self.thread.start()
+        self.wake.set()
+        return session
+
+    def end(self, session: ProfileSession):
+        with self.lock:
+            self.sessions.pop(threading.get_ident(), None)
+            sample_count = sum(session.samples.values())
+            self.stats['samples'] += sample_count
+
+        duration_ms = session.duration_ms
+        if duration_ms < session.threshold_ms:
+            with self.lock:
+                self.stats['discarded'] += 1
+            return
+
+        # The trace lives in this thread's context, so it is captured before handing off
+        profile_job = (session, duration_ms, sample_count, get_current_trace())
+        if session.path != 'interaction':
+            # Jobs have no Discord deadline to protect, and a Lambda may be frozen right after they return
+            self._save(*profile_job)
+            return
+
+        self._ensure_writer()
+        try:
+            self.pending_writes.put_nowait(profile_job)
+        except queue.Full:
+            with self.lock:
+                self.stats['dropped'] += 1
+            logger.warning(f"Profile write queue is full, dropping profile for {session.name}")
+
+    def _ensure_writer(self):
+        with self.lock:
+            if self.writer is None:
+                self.writer = threading.Thread(target=self._write_loop, name='profile-writer', daemon=True)
+                self.writer.start()
+
+    def _write_loop(self):
+        while True:
+            profile_job = self.pending_writes.get()
+            try:
+                self._save(*profile_job)
+            finally:
+                self.pending_writes.task_done()
+
+    def _save(self, session: ProfileSession, duration_ms: float, sample_count: int, trace: Optional[Dict[str, Any]]):
+        try:
+            location = self.write(self.build_profile(session, duration_ms, sample_count, trace))
+            with self.lock:
+                self.stats['kept'] += 1
+            logger.warning(f"{session.name} took {duration_ms:.0f}ms (threshold {session.threshold_ms:.0f}ms), "
+                           f"profile saved to {location}")
+        except Exception as e:
+            with self.lock:
+                self.stats['write_errors'] += 1
+            logger.error(f"Error saving profile for {session.name}: {str(e)}")
+
+    def wait_for_writes(self):
+        """Blocks until queued interaction profiles are written, e.g. before a benchmark exits"""
+        self.pending_writes.join()
+
+    def _sample_loop(self):
+        while True:
+            if not self.sessions:
+                self.wake.wait()
+                self.wake.clear()
+                continue
+
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, session in self.sessions.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        session.add(frame)
+            del frames
+            time.sleep(self.interval)
+
+    def build_profile(self, session: ProfileSession, duration_ms: float, sample_count: int,
+                      trace: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        stacks = Counter()
+        leaves = Counter()
+        for stack, count in session.samples.items():
+            names = [format_frame(code) for code in stack]
+            stacks[';'.join(names)] += count
+            leaves[names[-1]] += count
+
+        return {
+            'command': session.name,
+            'path': session.path,
+            'timestamp': time.time(),
+            'duration_ms': round(duration_ms, 1),
+            'threshold_ms': session.threshold_ms,
+            'interval_ms': self.interval * 1000,
+            'sample_count': sample_count,
+            'trace': trace,
+            'hot_frames': [{'frame': name, 'samples': count} for name, count in leaves.most_common(20)],
+            # "frame;frame;frame count" lines, as read by flamegraph.pl and speedscope
+            'collapsed_stacks': [f"{stack} {count}" for stack, count in stacks.most_common()]
+        }
+
+    def write(self, profile: Dict[str, Any]) -> str:
+        trace = profile['trace'] or {}
+        timestamp = datetime.fromtimestamp(profile['timestamp']).strftime('%Y%m%dT%H%M%S%f')
+        filename = f"{timestamp}-{trace.get('trace_id', 'untraced')}.json"
+        profile_json = json.dumps(profile, default=str)
+
+        if self.output == 's3':
+            key = save_s3_profile(profile_json, f"profiles/{profile['command']}/{filename}")
+            if key is None:
+                raise RuntimeError("S3 upload failed")
+            return f"s3://{os.getenv('S3_BUCKET_NAME')}/{key}"
+
+        directory = os.path.join(self.profile_dir, profile['command'])
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, filename)
+        with open(path, 'w') as f:
+            f.write(profile_json)
+        self._prune()
+        return path
+
+    def _prune(self):
+        files = []
+        for root, _, names in os.walk(self.profile_dir):
+            files.extend(os.path.join(root, name) for name in names if name.endswith('.json'))
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            stats['active'] = len(self.sessions)
+        stats['pending_writes'] = self.pending_writes.qsize()
+        stats['enabled'] = self.enabled
+        stats['interval_ms'] = self.interval * 1000
+        stats['thresholds_ms'] = self.thresholds_ms
+        stats['output'] = self.output
+        return stats
+
+
+# Global instance
+profiler = SamplingProfiler()
+
+
+def profile_invocation(name, path):
+    """Convenience function for profiling one command or job, keeping the profile only if it is slow"""
+    return profiler.profile(name, path)
+
+
+def get_profiler_stats():
+    """Convenience function for profile counts and settings"""
+    return profiler.get_stats()
@@ -0,0 +1,266 @@
+import os
+import time
+import uuid
+import threading
+import logging
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EmulatedLambdaContext:
+    """Minimal stand-in for the Lambda context object passed to command_processor.handler"""
+
+    def __init__(self, timeout_seconds: float):
+        self.deadline = time.monotonic() + timeout_seconds
+        self.function_name = "resuralph-command-processor-emulated"
+        self.aws_request_id = str(uuid.uuid4())
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self.deadline - time.monotonic()) * 1000))
+
+
+class QueueEmulator:
+    """
+    In-process queue with SQS semantics: visibility timeouts, receive counts,
+    a dead letter queue after max_receive_count, and batch delivery to
+    command_processor.handler in the same event shape Lambda uses.
+    """
+
+    def __init__(self, visibility_timeout: Optional[float] = None, max_receive_count: Optional[int] = None,
+                 batch_size: Optional[int] = None, concurrency: Optional[int] = None,
+                 function_timeout: Optional[float] = None):
+        # Defaults mirror the CDK stack: 60s visibility, 3 receives before DLQ, batch size 1
+        self.visibility_timeout = visibility_timeout or float(os.getenv('QUEUE_EMULATOR_VISIBILITY_TIMEOUT', '60'))
+        self.max_receive_count = max_receive_count or int(os.getenv('QUEUE_EMULATOR_MAX_RECEIVE_COUNT', '3'))
+        self.batch_size = batch_size or int(os.getenv('QUEUE_EMULATOR_BATCH_SIZE', '1'))
+        self.concurrency = concurrency or int(os.getenv('QUEUE_EMULATOR_CONCURRENCY', '2'))
+        self.function_timeout = function_timeout or float(os.getenv('QUEUE_EMULATOR_FUNCTION_TIMEOUT', '60'))
+
+        self.messages = deque()
+        self.in_flight = {}
+        self.dead_letters = []
+        self.condition = threading.Condition()
+        self.pollers = []
+        self.stopping = False
+        self.stats = {
+            'sent': 0,
+            'received': 0,
+            'deleted': 0,
+            'redriven': 0,
+            'invocations': 0,
+            'invocation_errors': 0,
+            'total_invocation_time': 0.0
+        }
+
+    def send_message(self, body: str, message_attributes: Optional[Dict[str, Any]] = None) -> str:
+        message_id = str(uuid.uuid4())
+        message = {
+            'message_id': message_id,
+            'body': body,
+            'message_attributes': message_attributes or {},
+            'sent_at': time.time(),
+            'first_received_at': None,
+            'receive_count': 0,
+            'visible_at': time.monotonic()
+        }
+
+        with self.condition:
+            self.messages.append(message)
+            self.stats['sent'] += 1
+            self.condition.notify()
+
+        return message_id
+
+    def receive_messages(self, max_messages: int = 1, wait_time: float = 0.0) -> List[Dict[str, Any]]:
+        """Receive up to max_messages visible messages as Lambda SQS event records"""
+        deadline = time.monotonic() + wait_time
+
+        with self.condition:
+            while True:
+                if self.stopping:
+                    return []
+                self._release_expired_locked()
+                records = []
+
+                pending = len(self.messages)
+                for _ in range(pending):
+                    if len(records) >= max_messages:
+                        break
+                    message = self.messages.popleft()
+
+                    # Redrive to the DLQ once the receive count would exceed the limit
+                    if message['receive_count'] >= self.max_receive_count:
+                        self.dead_letters.append(message)
+                        self.stats['redriven'] += 1
+                        logger.warning(f"Message {message['message_id']} moved to DLQ after {message['receive_count']} receives")
+                        continue
+
+                    message['receive_count'] += 1
+                    if message['first_received_at'] is None:
+                        message['first_received_at'] = time.time()
+                    receipt_handle = str(uuid.uuid4())
+                    message['receipt_handle'] = receipt_handle
+                    message['visible_at'] = time.monotonic() + self.visibility_timeout
+                    self.in_flight[receipt_handle] = message
+                    records.append(self._to_record(message))
+
+                if records:
+                    self.stats['received'] += len(records)
+                    return records
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self.condition.wait(timeout=min(remaining, self._next_visibility_delay_locked()))
+
+    def delete_message(self, receipt_handle: str) -> bool:
+        with self.condition:
+            message = self.in_flight.pop(receipt_handle, None)
+            if message is None:
+                # Handle already expired; SQS would reject the stale receipt handle
+                return False
+            self.stats['deleted'] += 1
+            self.condition.notify_all()
+            return True
+
+    def start(self):
+        """Start poller threads that drive command_processor.handler like the SQS event source"""
+        with self.condition:
+            if self.pollers:
+                return
+            for i in range(self.concurrency):
+                poller = threading.Thread(target=self._poll_loop, name=f"queue-emulator-poller-{i}", daemon=True)
+                poller.start()
+                self.pollers.append(poller)
+
+        logger.info(f"Queue emulator started: concurrency={self.concurrency}, batch_size={self.batch_size}, "
+                    f"visibility_timeout={self.visibility_timeout}s, max_receive_count={self.max_receive_count}")
+
+    def stop(self, timeout: float = 5.0):
+        """Stops the pollers once their current invocation finishes; queued messages stay where they are"""
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+            pollers, self.pollers = self.pollers, []
+        for poller in pollers:
+            poller.join(timeout)
+
+    def wait_until_drained(self, timeout: Optional[float] = None) -> bool:
+        """Block until no messages are queued or in flight. Returns False on timeout."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        with self.condition:
+            while self.messages or self.in_flight:
+                remaining = deadline - time.monotonic() if deadline is not None else 1.0
+                if remaining <= 0:
+                    return False
+                self.condition.wait(timeout=min(remaining, 1.0))
+                self._release_expired_locked()
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.condition:
+            stats = dict(self.stats)
+            stats['visible'] = len(self.messages)
+            stats['in_flight'] = len(self.in_flight)
+            stats['dead_letters'] = len(self.dead_letters)
+
+        invocations = stats['invocations']
+        stats['avg_invocation_time'] = stats['total_invocation_time'] / invocations if invocations else 0.0
+        return stats
+
+    def _poll_loop(self):
+        from command_processor import handler
+
+        while not self.stopping:
+            records = self.receive_messages(max_messages=self.batch_size, wait_time=20.0)
+            if not records:
+                continue
+
+            context = EmulatedLambdaContext(self.function_timeout)
+            start_time = time.monotonic()
+            try:
+                response = handler({'Records': records}, context)
+            except Exception as e:
+                # Lambda leaves the whole batch on the queue; it reappears after the visibility timeout
+                logger.error(f"Emulated command processor invocation failed: {str(e)}")
+                with self.condition:
+                    self.stats['invocations'] += 1
+                    self.stats['invocation_errors'] += 1
+                    self.stats['total_invocation_time'] += time.monotonic() - start_time
+                continue
+
+            with self.condition:
+                self.stats['invocations'] += 1
+                self.stats['total_invocation_time'] += time.monotonic() - start_time
+
+            # Honour partial batch responses the same way the SQS event source does
+            failed_ids = set()
+            if isinstance(response, dict):
+                for failure in response.get('batchItemFailures', []):
+                    failed_ids.add(failure.get('itemIdentifier'))
+
+            for record in records:
+                if record['messageId'] not in failed_ids:
+                    self.delete_message(record['receiptHandle'])
+
+    def _release_expired_locked(self):
+        now = time.monotonic()
+        expired = [handle for handle, message in self.in_flight.items() if message['visible_at'] <= now]
+        for handle in expired:
+            message = self.in_flight.pop(handle)
+            self.messages.append(message)
+
+    def _next_visibility_delay_locked(self) -> float:
+        if not self.in_flight:
+            return 1.0
+        now = time.monotonic()
+        next_visible = min(message['visible_at'] for message in self.in_flight.values())
+        return max(0.01, min(1.0, next_visible - now))
+
+    def _to_record(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        message_attributes = {}
+        for name, attribute in message['message_attributes'].items():
+            message_attributes[name] = {
+                'stringValue': attribute.get('StringValue'),
+                'dataType': attribute.get('DataType', 'String')
+            }
+
+        return {
+            'messageId': message['message_id'],
+            'receiptHandle': message['receipt_handle'],
+            'body': message['body'],
+            'attributes': {
+                'ApproximateReceiveCount': str(message['receive_count']),
+                'SentTimestamp': str(int(message['sent_at'] * 1000)),
+                'ApproximateFirstReceiveTimestamp': str(int(message['first_received_at'] * 1000))
+            },
+            'messageAttributes': message_attributes,
+            'eventSource': 'aws:sqs',
+            'eventSourceARN': 'arn:aws:sqs:local:000000000000:resuralph-command-queue',
+            'awsRegion': 'local'
+        }
+
+
+_queue_emulator = None
+_queue_emulator_lock = threading.Lock()
+
+
+def get_queue_emulator() -> QueueEmulator:
+    """Returns the process-wide queue emulator, starting its pollers on first use"""
+    global _queue_emulator
+    with _queue_emulator_lock:
+        if _queue_emulator is None:
+            _queue_emulator = QueueEmulator()
+            _queue_emulator.start()
+        return _queue_emulator
+
+
+def stop_queue_emulator():
+    """Stops the process-wide queue emulator's pollers, if it was ever started"""
+    with _queue_emulator_lock:
+        emulator = _queue_emulator
+    if emulator is not None:
+        emulator.stop()
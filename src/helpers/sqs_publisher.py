@@ -2,20 +2,71 @@ import json
 import logging
 import boto3
 import os
-from typing import Dict, Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Tuple
+from helpers.tracing import traced
 
 logger = logging.getLogger(__name__)
 
-def publish_command_to_queue(interaction_data: Dict[str, Any], command_type: str) -> bool:
-    # Publish a command processing job to the SQS queue for async execution.
-    try:
+class SQSQueueBackend:
+    # Sends command jobs to the real SQS queue consumed by the command processor Lambda.
+    
+    def send_message(self, message_body: str, message_attributes: Dict[str, Any]) -> Optional[str]:
         queue_url = os.getenv('COMMAND_QUEUE_URL')
         if not queue_url:
             logger.error("COMMAND_QUEUE_URL environment variable not set")
-            return False
+            return None
             
         sqs_client = boto3.client('sqs')
         
+        response = sqs_client.send_message(
+            QueueUrl=queue_url,
+            MessageBody=message_body,
+            MessageAttributes=message_attributes
+        )
+        return response['MessageId']
+
+
+class EmulatedQueueBackend:
+    # Sends command jobs to the in-process SQS emulator, which drives command_processor.handler locally.
+    
+    def send_message(self, message_body: str, message_attributes: Dict[str, Any]) -> Optional[str]:
+        from helpers.queue_emulator import get_queue_emulator
+        return get_queue_emulator().send_message(message_body, message_attributes)
+
+
+QUEUE_BACKENDS = {
+    'sqs': SQSQueueBackend,
+    'emulator': EmulatedQueueBackend
+}
+
+_queue_backend = None
+
+# Set while a command job runs; background jobs it publishes are run by the processor after the follow-up
+_deferred_jobs: ContextVar[Optional[List[Tuple[str, Dict[str, Any]]]]] = ContextVar('deferred_background_jobs', default=None)
+
+
+def get_queue_backend():
+    # Backend is selected with COMMAND_QUEUE_BACKEND ('sqs' by default, 'emulator' for local load testing).
+    global _queue_backend
+    if _queue_backend is None:
+        backend_name = os.getenv('COMMAND_QUEUE_BACKEND', 'sqs').lower()
+        if backend_name not in QUEUE_BACKENDS:
+            logger.warning(f"Unknown COMMAND_QUEUE_BACKEND '{backend_name}', falling back to sqs")
+            backend_name = 'sqs'
+        _queue_backend = QUEUE_BACKENDS[backend_name]()
+    return _queue_backend
+
+
+def uses_queue_emulator() -> bool:
+    return isinstance(get_queue_backend(), EmulatedQueueBackend)
+
+
+@traced()
+def publish_command_to_queue(interaction_data: Dict[str, Any], command_type: str) -> bool:
+    # Publish a command processing job to the configured queue backend for async execution.
+    try:
         message_body = {
             'interaction_data': interaction_data,
             'command_type': command_type,
@@ -23,19 +74,19 @@ def publish_command_to_queue(interaction_data: Dict[str, Any], command_type: str
             'interaction_token': interaction_data.get('token')
         }
         
-        # Send message to SQS
-        response = sqs_client.send_message(
-            QueueUrl=queue_url,
-            MessageBody=json.dumps(message_body),
-            MessageAttributes={
+        message_id = get_queue_backend().send_message(
+            json.dumps(message_body),
+            {
                 'command_type': {
                     'StringValue': command_type,
                     'DataType': 'String'
                 }
             }
         )
+        if not message_id:
+            return False
         
-        logger.info(f"Command '{command_type}' queued successfully. MessageId: {response['MessageId']}")
+        logger.info(f"Command '{command_type}' queued successfully. MessageId: {message_id}")
         return True
         
     except Exception as e:
@@ -43,6 +94,53 @@ def publish_command_to_queue(interaction_data: Dict[str, Any], command_type: str
         return False
 
 
+@traced()
+def publish_background_job(job_type: str, payload: Dict[str, Any]) -> bool:
+    # Publish work that runs after the response and has no Discord follow-up, e.g. precomputing a diff.
+    deferred_jobs = _deferred_jobs.get()
+    if deferred_jobs is not None:
+        # The command processor has no queue to publish to, and is about to be idle anyway
+        deferred_jobs.append((job_type, payload))
+        logger.info(f"Background job '{job_type}' deferred until after the follow-up")
+        return True
+    
+    try:
+        if os.getenv("ENVIRONMENT", "DEV") != "PROD" and not uses_queue_emulator():
+            # The local dev server has no queue; its bounded worker pool stands in for the job Lambda
+            from helpers.local_job_executor import submit_local_background_job
+            return submit_local_background_job(job_type, payload)
+        
+        message_id = get_queue_backend().send_message(
+            json.dumps({'job_type': job_type, 'payload': payload}),
+            {
+                'job_type': {
+                    'StringValue': job_type,
+                    'DataType': 'String'
+                }
+            }
+        )
+        if not message_id:
+            return False
+        
+        logger.info(f"Background job '{job_type}' queued successfully. MessageId: {message_id}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Failed to queue background job '{job_type}': {str(e)}")
+        return False
+
+
+@contextmanager
+def defer_background_jobs():
+    """Collects the background jobs published inside the block instead of queueing them"""
+    deferred_jobs = []
+    token = _deferred_jobs.set(deferred_jobs)
+    try:
+        yield deferred_jobs
+    finally:
+        _deferred_jobs.reset(token)
+
+
 def create_deferred_response() -> Dict[str, Any]:
     return {
         "type": 5  # deferred response type ie 'ResuRalph is thinking...'
@@ -0,0 +1,289 @@
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import logging
+import functools
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+import dotenv
+
+dotenv.load_dotenv()
+logger = logging.getLogger(__name__)
+
+# CloudWatch accepts at most 100 metrics per EMF document
+MAX_EMF_METRICS = 100
+
+
+class Span:
+    """One timed stage of a workflow. Children are the stages it called while it was current."""
+    __slots__ = ('name', 'attributes', 'start', 'end', 'children', 'error')
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attributes = attributes or {}
+        self.start = time.perf_counter()
+        self.end = None
+        self.children: List['Span'] = []
+        self.error = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_dict(self, trace_start: float) -> Dict[str, Any]:
+        span = {
+            'name': self.name,
+            'offset_ms': round((self.start - trace_start) * 1000, 2),
+            'duration_ms': round(self.duration_ms, 2)
+        }
+        if self.attributes:
+            span['attributes'] = self.attributes
+        if self.error:
+            span['error'] = self.error
+        if self.children:
+            span['children'] = [child.to_dict(trace_start) for child in self.children]
+        return span
+
+
+class _NoopSpan:
+    """Returned when nothing is being traced, so callers can set attributes unconditionally"""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    def __init__(self, root: Span, max_spans: int):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.root = root
+        self.max_spans = max_spans
+        self.span_count = 1
+        self.dropped_spans = 0
+
+    def iter_spans(self):
+        stack = list(self.root.children)
+        while stack:
+            span = stack.pop()
+            yield span
+            stack.extend(span.children)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar('current_trace', default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+class _SpanContext:
+    def __init__(self, tracer: 'Tracer', name: str, attributes: Dict[str, Any], root: bool):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.root = root
+        self.span = None
+        self.tokens = None
+
+    def __enter__(self):
+        trace = _current_trace.get()
+        if self.root and trace is None:
+            if not self.tracer.should_sample():
+                return NOOP_SPAN
+            self.span = Span(self.name, self.attributes)
+            trace = Trace(self.span, self.tracer.max_spans)
+        elif trace is None:
+            return NOOP_SPAN
+        else:
+            # A nested trace() call is just another stage of the trace already running
+            if trace.span_count >= trace.max_spans:
+                trace.dropped_spans += 1
+                return NOOP_SPAN
+            self.span = Span(self.name, self.attributes)
+            _current_span.get().children.append(self.span)
+            trace.span_count += 1
+
+        self.tokens = (_current_trace.set(trace), _current_span.set(self.span))
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.span is None:
+            return False
+        self.span.end = time.perf_counter()
+        if exc_type is not None:
+            self.span.error = exc_type.__name__
+
+        trace = _current_trace.get()
+        _current_span.reset(self.tokens[1])
+        _current_trace.reset(self.tokens[0])
+        if trace.root is self.span:
+            self.tracer.finish(trace)
+        return False
+
+
+class Tracer:
+    """
+    Per-invocation trace trees built from nested spans. The current span is kept in a
+    contextvar, so helpers add stages without being passed anything. A sampled trace is
+    written as one CloudWatch Embedded Metric Format line with a latency metric per stage,
+    and/or logged as an indented tree; recent traces are kept for /local/traces.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv('TRACING_ENABLED', 'true').lower() == 'true'
+        self.sample_rate = float(os.getenv('TRACE_SAMPLE_RATE', '1.0'))
+        # Bounds the cost of a runaway loop of traced calls
+        self.max_spans = int(os.getenv('TRACE_MAX_SPANS', '256'))
+        default_outputs = 'emf' if os.getenv('AWS_LAMBDA_FUNCTION_NAME') else 'log'
+        self.outputs = {output.strip() for output in os.getenv('TRACE_OUTPUT', default_outputs).lower().split(',') if output.strip()}
+        # Only log trees of traces at least this slow; EMF metrics are written for every sampled trace
+        self.log_threshold_ms = float(os.getenv('TRACE_LOG_THRESHOLD_MS', '0'))
+        self.namespace = os.getenv('TRACE_METRIC_NAMESPACE', 'ResuRalph')
+        self.recent = deque(maxlen=int(os.getenv('TRACE_HISTORY_SIZE', '50')))
+        self.lock = threading.Lock()
+        self.stats = {'started': 0, 'sampled_out': 0, 'finished': 0, 'dropped_spans': 0}
+
+    def should_sample(self) -> bool:
+        if not self.enabled:
+            return False
+        sampled = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+        with self.lock:
+            self.stats['started' if sampled else 'sampled_out'] += 1
+        return sampled
+
+    def trace(self, name: str, **attributes) -> _SpanContext:
+        """Starts a trace for one command or job; inside an existing trace it is an ordinary span"""
+        return _SpanContext(self, name, attributes, root=True)
+
+    def span(self, name: str, **attributes) -> _SpanContext:
+        """Times a stage of the current trace; does nothing outside one"""
+        return _SpanContext(self, name, attributes, root=False)
+
+    def finish(self, trace: Trace):
+        with self.lock:
+            self.stats['finished'] += 1
+            self.stats['dropped_spans'] += trace.dropped_spans
+
+        self.recent.append(self.to_record(trace))
+
+        try:
+            if 'emf' in self.outputs:
+                sys.stdout.write(json.dumps(self.build_emf(trace)) + "\n")
+                sys.stdout.flush()
+            if 'log' in self.outputs and trace.root.duration_ms >= self.log_threshold_ms:
+                logger.info(self.format_tree(trace))
+        except Exception as e:
+            logger.error(f"Error writing trace {trace.trace_id}: {str(e)}")
+
+    def to_record(self, trace: Trace) -> Dict[str, Any]:
+        return {
+            'trace_id': trace.trace_id,
+            'timestamp': time.time(),
+            'dropped_spans': trace.dropped_spans,
+            'root': trace.root.to_dict(trace.root.start)
+        }
+
+    def build_emf(self, trace: Trace) -> Dict[str, Any]:
+        root = trace.root
+        durations: Dict[str, List[float]] = {'Total': [round(root.duration_ms, 2)]}
+        for span in trace.iter_spans():
+            if span.name in durations or len(durations) < MAX_EMF_METRICS:
+                durations.setdefault(span.name, []).append(round(span.duration_ms, 2))
+
+        document = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': self.namespace,
+                    'Dimensions': [['Command', 'Path']],
+                    'Metrics': [{'Name': name, 'Unit': 'Milliseconds'} for name in durations]
+                }]
+            },
+            'Command': root.name,
+            'Path': root.attributes.get('path', 'unknown'),
+            'TraceId': trace.trace_id
+        }
+        # EMF takes a list of values per metric, so repeated stages keep every duration
+        for name, values in durations.items():
+            document[name] = values if len(values) > 1 else values[0]
+        return document
+
+    def format_tree(self, trace: Trace) -> str:
+        lines = [f"Trace {trace.trace_id} {trace.root.name} {trace.root.duration_ms:.1f}ms"]
+
+        def add(span: Span, depth: int):
+            error = f" !{span.error}" if span.error else ""
+            lines.append(f"{'  ' * depth}{span.name} {span.duration_ms:.1f}ms{error}")
+            for child in span.children:
+                add(child, depth + 1)
+
+        for child in trace.root.children:
+            add(child, 1)
+        if trace.dropped_spans:
+            lines.append(f"  ({trace.dropped_spans} spans dropped)")
+        return "\n".join(lines)
+
+    def get_recent_traces(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        traces = list(self.recent)
+        return traces[-limit:] if limit else traces
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+        stats['sample_rate'] = self.sample_rate
+        stats['outputs'] = sorted(self.outputs)
+        return stats
+
+
+# Global instance
+tracer = Tracer()
+
+
+def start_trace(name, **attributes):
+    """Convenience function for tracing one command or job"""
+    return tracer.trace(name, **attributes)
+
+
+def span(name, **attributes):
+    """Convenience function for timing a stage of the current trace"""
+    return tracer.span(name, **attributes)
+
+
+def traced(name=None):
+    """Convenience decorator that runs the function inside a span named after it"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Skip building a span context entirely when nothing is being traced
+            if _current_trace.get() is None:
+                return func(*args, **kwargs)
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_current_trace():
+    """Convenience function for the trace running in this context so far, or None"""
+    trace = _current_trace.get()
+    return tracer.to_record(trace) if trace else None
+
+
+def get_recent_traces(limit=None):
+    """Convenience function for the latest finished traces, newest last"""
+    return tracer.get_recent_traces(limit)
+
+
+def get_tracing_stats():
+    """Convenience function for trace counts and settings"""
+    return tracer.get_stats()
@@ -1,8 +1,11 @@
 import requests
-import PyPDF2
-from io import BytesIO
 import logging
 from models.resume import DiscordAttachment
+from helpers.pdf_extractor import fetch_pdf_content
+from helpers.circuit_breaker import CircuitOpenError
+from helpers.deadline import DeadlineExceeded
+from helpers.pdf_sandbox import count_pdf_pages, PDFSandboxError, TIMEOUT, CPU_LIMIT, MEMORY_LIMIT
+from helpers.tracing import traced
 
 
 logger = logging.getLogger(__name__)
@@ -40,7 +43,8 @@ def validate_attachment_data(interaction_data, user_id):
     
     return attachment, None
 
-def validate_pdf(attachment_info):
+@traced()
+def validate_pdf(attachment_info, deadline=None):
     
     try:
         # Check content type
@@ -69,24 +73,28 @@ def validate_pdf(attachment_info):
         
         print(f"Downloading PDF from: {download_url}")
         
-        response = requests.get(download_url, timeout=30)
-        response.raise_for_status()
+        # Attachments are served from Discord's CDN, so they share Discord's breaker.
+        # A retried command finds the file in the disk cache instead of downloading it again.
+        file_bytes = fetch_pdf_content(download_url, 'discord', deadline)
         
-        file_bytes = response.content
-        
-        # Validate it's actually a PDF by trying to read it
+        # Validate it's actually a PDF by trying to read it, in the parsing sandbox since it's untrusted
         try:
-            pdf_stream = BytesIO(file_bytes)
-            pdf_reader = PyPDF2.PdfReader(pdf_stream)
-            
             # Try to get the number of pages (this will fail if it's not a valid PDF)
-            page_count = len(pdf_reader.pages)
+            page_count = count_pdf_pages(file_bytes, deadline)
             
             if page_count == 0:
                 raise PDFValidationError("PDF appears to have no pages")
 
             print(f"Successfully validated PDF: {page_count} pages, {len(file_bytes)} bytes")
             
+        except PDFSandboxError as e:
+            if e.error_type in (TIMEOUT, CPU_LIMIT, MEMORY_LIMIT):
+                raise PDFValidationError("This PDF is too complex to process. Please export it again and retry.")
+            raise PDFValidationError(f"Invalid PDF file: {str(e)}")
+        except PDFValidationError:
+            raise
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             raise PDFValidationError(f"Invalid PDF file: {str(e)}")
         
@@ -94,6 +102,10 @@ def validate_pdf(attachment_info):
         
     except requests.RequestException as e:
         raise PDFValidationError(f"Failed to download file: {str(e)}")
+    except DeadlineExceeded:
+        raise PDFValidationError("Ran out of time downloading the file. Please try again.")
+    except CircuitOpenError as e:
+        raise PDFValidationError(f"Discord attachments are temporarily unavailable. Please try again in {max(1, round(e.retry_after))} seconds.")
     except ValueError:
         # Re-raise our custom exceptions
         raise
@@ -0,0 +1,121 @@
+import os
+import time
+import logging
+from dotenv import load_dotenv
+from commands.upload import handle_upload_command
+from commands.update import handle_update_command
+from commands.get_latest_resume import handle_get_latest_resume_command
+from commands.clear_resumes import handle_clear_resumes_command
+from commands.get_annotations import handle_get_annotations_command
+from commands.get_resume_diff import handle_get_resume_diff_command
+from commands.get_all_resumes import handle_get_all_resumes_command
+from helpers.sqs_publisher import publish_command_to_queue, create_deferred_response, uses_queue_emulator
+from helpers.embed_helper import create_error_embed
+from helpers.local_async_processor import handle_async_command_local
+from helpers.deadline import Deadline
+from helpers.command_router import should_defer_command, record_command_latency
+from helpers.tracing import start_trace
+from helpers.profiler import profile_invocation
+
+# Routing shared by the Flask app (main.py, local dev) and the native Lambda handler (lambda_handler.py).
+# Nothing here may import Flask, so the Lambda path doesn't pay for it.
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+def is_local_environment():
+    return os.getenv("ENVIRONMENT", "DEV") != "PROD"
+
+DISCORD_PUBLIC_KEY = os.getenv("DEV_DISCORD_PUBLIC_KEY") if is_local_environment() else os.getenv("DISCORD_PUBLIC_KEY")
+
+
+def process_interaction(raw_request):
+    # Returns the interaction response body for a verified interaction
+    try:
+        if raw_request["type"] == 1:
+            logger.info("Discord health check received")
+            return {"type": 1}
+        
+        data = raw_request["data"]
+        command_name = data["name"]
+        user_id = raw_request.get('member', {}).get('user', {}).get('id', 'unknown')
+        logger.info(f"Processing command '{command_name}' for user {user_id}")
+        
+        # Everything below shares the 3 second interaction budget
+        deadline = Deadline.for_interaction()
+        with start_trace(command_name, path='interaction', user_id=user_id), profile_invocation(command_name, 'interaction'):
+            response_content = handle_command_routing(command_name, raw_request, deadline)
+            response_data = format_command_response(command_name, response_content)
+        
+        return response_data
+    
+    except Exception as e:
+        logger.error(f"Error processing Discord interaction: {str(e)}")
+        error_embed = create_error_embed(
+            "Processing Error",
+            "An error occurred while processing your request. 😔"
+        )
+        return {
+            "type": 4,
+            "data": error_embed,
+        }
+
+def handle_command_routing(command_name, raw_request, deadline=None):
+    
+    # Commands the command processor can run; the router decides which of them actually get deferred
+    async_commands = {
+        "update": "update",
+        "ai_review": "ai_review",
+        "upload": "upload",
+        "get_annotations": "get_annotations",
+        "get_resume_diff": "get_resume_diff"
+    }
+    
+    sync_command_handlers = {
+        "get_latest_resume": handle_get_latest_resume_command,
+        "upload": handle_upload_command,
+        "update": handle_update_command,
+        "get_annotations": handle_get_annotations_command,
+        "clear_resumes": handle_clear_resumes_command,
+        "get_resume_diff": handle_get_resume_diff_command,
+        "get_all_resumes": handle_get_all_resumes_command,
+    }
+    
+    if command_name in sync_command_handlers and not should_defer_command(command_name, raw_request, deadline):
+        start_time = time.monotonic()
+        response = sync_command_handlers[command_name](raw_request, deadline)
+        record_command_latency(command_name, raw_request, (time.monotonic() - start_time) * 1000)
+        return response
+    elif command_name in async_commands:
+        if is_local_environment() and not uses_queue_emulator():
+            # Local development: Use the bounded local worker pool for async processing
+            return handle_async_command_local(raw_request, async_commands[command_name])
+        else:
+            # Production environment (or local SQS emulator): Use the queue for async processing
+            success = publish_command_to_queue(raw_request, async_commands[command_name])
+            if success:
+                logger.info(f"Command '{command_name}' queued for async processing")
+                return create_deferred_response()
+            else:
+                logger.error(f"Failed to queue command '{command_name}'")
+                return create_error_embed(
+                    "Processing Error",
+                    "Failed to queue your request for processing. Please try again."
+                )
+    else:
+        logger.warning(f"Unimplemented command: {command_name}")
+        return create_error_embed(
+            "Command Not Found",
+            f"Command '{command_name}' is not implemented yet."
+        )
+
+def format_command_response(command_name, response_content):
+    # Deferred commands return responses that are already formatted
+    if isinstance(response_content, dict) and "type" in response_content:
+        return response_content # deferred response already handled in async processing
+
+    if isinstance(response_content, dict) and "embeds" in response_content:
+        return {"type": 4, "data": response_content}
+    else:
+        return {"type": 4, "data": {"content": response_content}}
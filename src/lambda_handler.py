@@ -0,0 +1,54 @@
+import json
+import base64
+import logging
+from typing import Dict, Any
+from discord_interactions import verify_key, InteractionType, InteractionResponseType
+from interaction_router import DISCORD_PUBLIC_KEY, process_interaction
+from helpers.pdf_sandbox import start_pdf_sandbox
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Started during init so no interaction waits for the PDF parsing workers
+start_pdf_sandbox()
+
+
+def respond(status_code: int, body: Any, content_type: str = 'application/json') -> Dict[str, Any]:
+    return {
+        'statusCode': status_code,
+        'headers': {'Content-Type': content_type},
+        'body': json.dumps(body) if content_type == 'application/json' else body
+    }
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    # AWS Lambda handler for Discord interactions arriving through a Function URL (or API Gateway).
+    # Does what main.handler does without Mangum, ASGI and Flask in between.
+    method = event.get('requestContext', {}).get('http', {}).get('method') or event.get('httpMethod')
+    if method != 'POST':
+        return respond(405, {'error': 'Method not allowed'})
+
+    body = event.get('body') or ''
+    raw_body = base64.b64decode(body) if event.get('isBase64Encoded') else body.encode('utf-8')
+
+    # Function URLs lowercase header names, API Gateway REST APIs keep them as sent
+    headers = {name.lower(): value for name, value in (event.get('headers') or {}).items()}
+    signature = headers.get('x-signature-ed25519')
+    timestamp = headers.get('x-signature-timestamp')
+    if signature is None or timestamp is None or not verify_key(raw_body, signature, timestamp, DISCORD_PUBLIC_KEY):
+        return respond(401, 'Bad request signature', 'text/plain')
+
+    try:
+        raw_request = json.loads(raw_body)
+    except ValueError:
+        logger.error("Discord interaction body is not valid JSON")
+        return respond(400, {'error': 'Invalid JSON'})
+
+    # Answered here like verify_key_decorator does, before any routing
+    if raw_request.get('type') == InteractionType.PING:
+        return respond(200, {'type': InteractionResponseType.PONG})
+
+    return respond(200, process_interaction(raw_request))
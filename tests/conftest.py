@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Application modules import each other rooted at src/, as they do in the Lambda image
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+os.environ.setdefault('BUCKET_REGION', 'us-east-1')
+os.environ.setdefault('OPENAI_API_KEY', 'test')
+os.environ.setdefault('AI_REVIEW_CACHE_ENABLED', 'false')
+os.environ.setdefault('TRACING_ENABLED', 'false')
+os.environ.setdefault('PROFILER_ENABLED', 'false')
@@ -0,0 +1,70 @@
+import json
+from types import SimpleNamespace
+from helpers.ai_resume_analyzer import ResumeAnalyzer
+
+PREVIOUS_RESUME = """Jordan Lee
+Experience
+● Led team of 5 engineers to ship product
+● Cut API latency by 40% by caching hot queries
+Education
+B.S. Computer Science"""
+
+UPDATED_RESUME = PREVIOUS_RESUME.replace("Led team of 5 engineers", "Led team of 8 engineers")
+
+
+class RecordingClient:
+    """Answers chat.completions.create with one feedback item and keeps the prompts it was sent"""
+
+    def __init__(self):
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        self.prompts.append(request['messages'][-1]['content'])
+        content = json.dumps({'feedback': [{'selected_text': 'Led team of 8 engineers', 'comment': 'Say what shipped.'}]})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_incremental_review_sends_changed_bullet_lines():
+    client = RecordingClient()
+    analyzer = ResumeAnalyzer(client=client)
+    previous_feedback = [{'selected_text': 'Cut API latency by 40%', 'comment': 'Name the queries.'}]
+
+    feedback = analyzer.analyze_resume_incremental(PREVIOUS_RESUME, previous_feedback, UPDATED_RESUME)
+
+    assert len(client.prompts) == 1
+    assert 'Led team of 8 engineers to ship product' in client.prompts[0]
+    assert {item['selected_text'] for item in feedback} == {'Led team of 8 engineers', 'Cut API latency by 40%'}
+
+
+def test_incremental_review_falls_back_when_nothing_is_left_to_carry_over():
+    client = RecordingClient()
+    analyzer = ResumeAnalyzer(client=client)
+    stale_feedback = [{'selected_text': 'Managed a budget of $2M', 'comment': 'Say what it bought.'}]
+
+    assert analyzer.analyze_resume_incremental(PREVIOUS_RESUME, stale_feedback, PREVIOUS_RESUME) is None
+    assert client.prompts == []
+
+
+def test_hypothesis_selectors_are_quotes_without_line_breaks():
+    analyzer = ResumeAnalyzer(client=RecordingClient())
+    feedback = [{'selected_text': 'Led team of 5 engineers to ship product Cut API latency', 'comment': 'Split these.'}]
+
+    annotations = analyzer.format_feedback_for_hypothesis(feedback, 'https://example.com/resume.pdf', PREVIOUS_RESUME)
+
+    selectors = annotations[0]['target'][0]['selector']
+    # PyPDF2 offsets don't line up with the PDF.js text Hypothesis anchors against
+    assert [selector['type'] for selector in selectors] == ['TextQuoteSelector']
+    assert selectors[0]['exact'] == 'Led team of 5 engineers to ship product ● Cut API latency'
+    assert not any('\n' in selectors[0][field] for field in ('exact', 'prefix', 'suffix'))
+
+
+def test_incremental_review_returns_carried_feedback_without_time_left():
+    client = RecordingClient()
+    analyzer = ResumeAnalyzer(client=client)
+    previous_feedback = [{'selected_text': 'Cut API latency by 40% by caching hot queries', 'comment': 'Name the cache.'}]
+
+    feedback = analyzer.analyze_resume_incremental(PREVIOUS_RESUME, previous_feedback, UPDATED_RESUME, remaining_time_ms=1000)
+
+    assert client.prompts == []
+    assert feedback == previous_feedback
@@ -0,0 +1,107 @@
+import pytest
+import requests
+from helpers import circuit_breaker
+from helpers.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def open_breaker(clock, **settings):
+    breaker = CircuitBreaker('test', failure_rate_threshold=0.5, minimum_calls=4, window_seconds=60,
+                             open_seconds=30, **settings)
+    for _ in range(4):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    return breaker
+
+
+def test_opens_on_failure_rate_only_after_minimum_calls(clock):
+    breaker = CircuitBreaker('test', failure_rate_threshold=0.5, minimum_calls=4, window_seconds=60, open_seconds=30)
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_success()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert breaker.get_stats()['rejected'] == 1
+
+
+def test_failures_outside_the_window_are_forgotten(clock):
+    breaker = CircuitBreaker('test', failure_rate_threshold=0.5, minimum_calls=4, window_seconds=60, open_seconds=30)
+    for _ in range(3):
+        breaker.record_failure()
+    clock[0] += 61
+
+    breaker.record_failure()
+
+    assert breaker.state == CLOSED
+    assert breaker.get_stats()['calls'] == 1
+
+
+def test_half_open_admits_only_the_trial_calls(clock):
+    breaker = open_breaker(clock, half_open_max_calls=1)
+    assert breaker.retry_after() == 30
+    clock[0] += 30
+
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_trial_call_reopens_for_another_full_period(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 30
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    clock[0] += 29
+    assert not breaker.allow_request()
+    clock[0] += 1
+    assert breaker.allow_request()
+
+
+def test_trial_that_never_reports_back_does_not_wedge_half_open(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 30
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    clock[0] += 31
+
+    assert breaker.allow_request()
+
+
+def test_deadline_limited_timeout_releases_the_trial_slot(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 30
+    assert breaker.allow_request()
+
+    breaker.record_exception(requests.Timeout(), deadline_limited=True)
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_client_errors_are_not_failures(clock):
+    breaker = CircuitBreaker('test', failure_rate_threshold=0.5, minimum_calls=4, window_seconds=60, open_seconds=30)
+    for status_code in (400, 404, 422, 400):
+        breaker.record_status(status_code)
+    assert breaker.state == CLOSED
+
+    for status_code in (429, 503, 500, 502):
+        breaker.record_status(status_code)
+    assert breaker.state == OPEN
@@ -0,0 +1,54 @@
+import json
+import command_processor
+from helpers import sqs_publisher
+from helpers.deadline import Deadline
+
+
+class FailingQueueBackend:
+    def send_message(self, message_body, message_attributes):
+        raise AssertionError("the command processor has no queue to publish to")
+
+
+def test_background_jobs_published_by_a_command_run_after_its_follow_up(monkeypatch):
+    monkeypatch.setenv('ENVIRONMENT', 'PROD')
+    monkeypatch.setattr(sqs_publisher, '_queue_backend', FailingQueueBackend())
+    events = []
+
+    def process_command(interaction_data, command_type, deadline=None):
+        assert sqs_publisher.publish_background_job('precompute_diff', {'old_resume_url': 'a'})
+        events.append('processed')
+        return 'Resume Updated'
+
+    monkeypatch.setattr(command_processor, 'process_command', process_command)
+    monkeypatch.setattr(command_processor, 'send_followup_message',
+                        lambda application_id, token, message, deadline=None: events.append('follow-up') or True)
+    monkeypatch.setattr(command_processor, 'run_background_job',
+                        lambda job_type, payload, deadline=None: events.append(job_type) or {'success': True})
+
+    result = command_processor.run_command_job({}, 'update', 'app', 'token', Deadline.after_ms(60000))
+
+    assert result['success']
+    assert events == ['processed', 'follow-up', 'precompute_diff']
+
+
+def test_deferred_background_job_is_skipped_without_time_left(monkeypatch):
+    ran = []
+    monkeypatch.setattr(command_processor, 'run_background_job', lambda job_type, payload, deadline=None: ran.append(job_type))
+
+    command_processor.run_deferred_background_jobs([('precompute_diff', {})], Deadline.after_ms(4000))
+
+    assert ran == []
+
+
+def test_failed_precompute_message_is_not_retried(monkeypatch):
+    def failing_precompute(*args, **kwargs):
+        raise RuntimeError("PDF download failed")
+
+    monkeypatch.setattr('helpers.get_pdf_diff.precompute_diff', failing_precompute)
+    body = json.dumps({'job_type': 'precompute_diff', 'payload': {'old_resume_url': 'a', 'new_resume_url': 'b'}})
+
+    response = command_processor.handler({'Records': [{'messageId': '1', 'body': body}]}, None)
+
+    # No exception and no batchItemFailures, so SQS deletes the message
+    assert 'batchItemFailures' not in response
+    assert response['results'][0]['success'] is False
@@ -0,0 +1,31 @@
+from helpers import command_router
+from helpers.command_router import CommandRouter
+
+REQUEST = {'data': {'name': 'get_annotations', 'options': []}}
+
+
+def test_slow_inline_runs_defer_the_command(monkeypatch):
+    monkeypatch.setenv('ADAPTIVE_COMMAND_ROUTING', 'true')
+    router = CommandRouter(sync_budget_ms=2000)
+    assert not router.should_defer('get_annotations', REQUEST)
+
+    for _ in range(5):
+        router.record_latency('get_annotations', REQUEST, 4000)
+
+    assert router.should_defer('get_annotations', REQUEST)
+
+
+def test_deferred_command_is_tried_inline_again_once_slow_samples_expire(monkeypatch):
+    monkeypatch.setenv('ADAPTIVE_COMMAND_ROUTING', 'true')
+    now = [1000.0]
+    monkeypatch.setattr(command_router.time, 'monotonic', lambda: now[0])
+    router = CommandRouter(sync_budget_ms=2000, max_sample_age_s=300)
+    for _ in range(5):
+        router.record_latency('get_annotations', REQUEST, 4000)
+    assert router.should_defer('get_annotations', REQUEST)
+
+    # Deferred commands record nothing, so only expiry can bring the prediction back down
+    now[0] += 301
+
+    assert not router.should_defer('get_annotations', REQUEST)
+    assert router.get_stats()['commands']['get_annotations']['samples'] == 0
@@ -0,0 +1,96 @@
+import random
+from helpers.diff_engine import DiffEngine, myers_matches, patience_matches, normalize_line
+
+
+def lcs_length(a, b):
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b):
+            current.append(previous[j] + 1 if x == y else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def assert_common_subsequence(matches, a, b):
+    assert all(a[i] == b[j] for i, j in matches)
+    assert all(i1 < i2 and j1 < j2 for (i1, j1), (i2, j2) in zip(matches, matches[1:]))
+
+
+def changes(engine, old_text, new_text):
+    return list(engine.iter_changes(old_text.splitlines(), new_text.splitlines()))
+
+
+def test_myers_matches_as_many_lines_as_the_lcs():
+    rng = random.Random(7)
+    for _ in range(300):
+        a = [rng.choice('abcdefgh') for _ in range(rng.randint(0, 40))]
+        b = [rng.choice('abcdefgh') for _ in range(rng.randint(0, 40))]
+        matches = myers_matches(a, b, max_cost=10 ** 6)
+        assert_common_subsequence(matches, a, b)
+        assert len(matches) == lcs_length(a, b)
+
+
+def test_patience_matches_the_lcs_when_lines_are_unique():
+    # Resume lines rarely repeat; with repeats patience may trade optimality for anchoring
+    rng = random.Random(11)
+    for _ in range(300):
+        lines = rng.sample(range(1000), 40)
+        a = rng.sample(lines, rng.randint(0, 40))
+        b = rng.sample(lines, rng.randint(0, 40))
+        matches = patience_matches(a, b, max_cost=10 ** 6)
+        assert_common_subsequence(matches, a, b)
+        assert len(matches) == lcs_length(a, b)
+
+
+def test_patience_returns_a_common_subsequence_with_repeated_lines():
+    rng = random.Random(13)
+    for _ in range(300):
+        a = [rng.choice('abcd') for _ in range(rng.randint(0, 30))]
+        b = [rng.choice('abcd') for _ in range(rng.randint(0, 30))]
+        matches = patience_matches(a, b, max_cost=10 ** 6)
+        assert_common_subsequence(matches, a, b)
+        assert len(matches) <= lcs_length(a, b)
+
+
+def test_myers_gives_up_past_max_cost():
+    a = ['shared'] + [f"old {index}" for index in range(50)]
+    b = ['shared'] + [f"new {index}" for index in range(50)]
+
+    assert myers_matches(a, b, max_cost=20) == []
+    assert myers_matches(a, b, max_cost=200) == [(0, 0)]
+
+
+def test_reflowed_paragraph_is_not_a_change():
+    engine = DiffEngine(algorithm='patience', word_level=True, normalize=True)
+    old_text = "Experience\nBuilt a data pipeline that ingests\nclickstream events for the analytics team"
+    new_text = "Experience\nBuilt a data pipeline that ingests click-\nstream events for the analytics team"
+
+    assert changes(engine, old_text, new_text) == []
+
+
+def test_one_word_edit_in_a_reflowed_paragraph_shows_only_its_lines():
+    engine = DiffEngine(algorithm='patience', word_level=True, normalize=True)
+    old_text = "Led migration of billing services to Kubernetes,\nreducing deploy time by 40%\nacross 12 teams"
+    new_text = "Led migration of billing services to\nKubernetes, reducing deploy time by 60% across\n12 teams"
+
+    assert changes(engine, old_text, new_text) == [
+        ('-', 'reducing deploy time by 40%'),
+        ('+', 'Kubernetes, reducing deploy time by 60% across'),
+    ]
+
+
+def test_bullet_edit_shows_the_edited_bullet_only():
+    for algorithm in ('patience', 'myers'):
+        engine = DiffEngine(algorithm=algorithm, word_level=True, normalize=True)
+        old_text = "Experience\n● Led team of 5 engineers\n● Cut API latency by 40%"
+        new_text = "Experience\n• Led team of 8 engineers\n▪ Cut API latency by 40%"
+
+        assert changes(engine, old_text, new_text) == [
+            ('-', '• Led team of 5 engineers'),
+            ('+', '• Led team of 8 engineers'),
+        ]
+
+
+def test_normalize_line_folds_ligatures_bullets_and_spacing():
+    assert normalize_line("▪  Eﬃcient   caching") == "• Efficient caching"
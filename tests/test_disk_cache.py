@@ -0,0 +1,91 @@
+import os
+import pytest
+from helpers.disk_cache import DiskCache
+
+
+@pytest.fixture(autouse=True)
+def enable_disk_cache(monkeypatch):
+    monkeypatch.setenv('DISK_CACHE_ENABLED', 'true')
+
+
+def set_mtime(cache, namespace, key, mtime):
+    os.utime(cache._path(namespace, key), (mtime, mtime))
+
+
+def test_round_trips_bytes_text_and_empty_entries(tmp_path):
+    cache = DiskCache(cache_dir=str(tmp_path), max_bytes=100)
+
+    assert cache.put('pdf', 'a', b'%PDF-1.4')
+    assert cache.put_text('text', 'a', 'Résumé')
+    assert cache.put('pdf', 'empty', b'')
+
+    assert cache.get('pdf', 'a') == b'%PDF-1.4'
+    assert cache.get_text('text', 'a') == 'Résumé'
+    assert cache.get('pdf', 'empty') == b''
+    assert cache.get('pdf', 'missing') is None
+    assert (cache.get_stats()['hits'], cache.get_stats()['misses']) == (3, 1)
+
+
+def test_evicts_least_recently_used_entries_past_max_bytes(tmp_path):
+    cache = DiskCache(cache_dir=str(tmp_path), max_bytes=30)
+    cache.put('pdf', 'a', b'a' * 10)
+    cache.put('pdf', 'b', b'b' * 10)
+    cache.put('pdf', 'c', b'c' * 10)
+    # Reading 'a' makes 'b' the least recently used
+    assert cache.get('pdf', 'a')
+
+    assert cache.put('pdf', 'd', b'd' * 10)
+
+    assert cache.get('pdf', 'b') is None
+    assert not os.path.exists(cache._path('pdf', 'b'))
+    assert [cache.get('pdf', key) is not None for key in 'acd'] == [True, True, True]
+    assert cache.get_stats()['bytes'] == 30
+
+
+def test_rejects_entries_larger_than_the_whole_cache(tmp_path):
+    cache = DiskCache(cache_dir=str(tmp_path), max_bytes=30)
+    cache.put('pdf', 'a', b'a' * 10)
+
+    assert not cache.put('pdf', 'big', b'x' * 31)
+    assert cache.get('pdf', 'a') == b'a' * 10
+
+
+def test_cold_start_rebuilds_the_lru_order_from_mtimes(tmp_path):
+    cache = DiskCache(cache_dir=str(tmp_path), max_bytes=30)
+    for key, mtime in (('a', 3000), ('b', 1000), ('c', 2000)):
+        cache.put('pdf', key, key.encode() * 10)
+        set_mtime(cache, 'pdf', key, mtime)
+    # An interrupted write from the previous process
+    (tmp_path / 'pdf' / 'orphan.tmp').write_bytes(b'partial')
+
+    restarted = DiskCache(cache_dir=str(tmp_path), max_bytes=30)
+
+    assert restarted.get_stats()['entries'] == 3
+    assert restarted.get_stats()['bytes'] == 30
+    assert not (tmp_path / 'pdf' / 'orphan.tmp').exists()
+    restarted.put('text', 'd', b'd' * 10)
+    # 'b' has the oldest mtime, so it goes first
+    assert restarted.get('pdf', 'b') is None
+    assert restarted.get('pdf', 'c') == b'c' * 10
+
+
+def test_cold_start_with_a_smaller_limit_evicts_the_oldest_entries(tmp_path):
+    cache = DiskCache(cache_dir=str(tmp_path), max_bytes=30)
+    for key, mtime in (('a', 1000), ('b', 2000), ('c', 3000)):
+        cache.put('pdf', key, key.encode() * 10)
+        set_mtime(cache, 'pdf', key, mtime)
+
+    restarted = DiskCache(cache_dir=str(tmp_path), max_bytes=20)
+
+    assert not os.path.exists(restarted._path('pdf', 'a'))
+    assert restarted.get('pdf', 'b') == b'b' * 10
+    assert restarted.get_stats()['bytes'] == 20
+
+
+def test_entry_removed_behind_the_index_is_a_miss(tmp_path):
+    cache = DiskCache(cache_dir=str(tmp_path), max_bytes=30)
+    cache.put('pdf', 'a', b'a' * 10)
+    os.unlink(cache._path('pdf', 'a'))
+
+    assert cache.get('pdf', 'a') is None
+    assert cache.get_stats()['bytes'] == 0
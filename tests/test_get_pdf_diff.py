@@ -0,0 +1,38 @@
+from helpers import get_pdf_diff
+from helpers.get_pdf_diff import diff_text_lines, take_within_budget, format_diff_field_value
+
+OLD_TEXT = '\n'.join(f"Removed bullet {index} about an earlier role and its responsibilities" for index in range(200))
+NEW_TEXT = '\n'.join(f"Added bullet {index} about a later role and what it achieved" for index in range(200))
+
+
+def test_budgeted_diff_stops_reading_changes_once_both_fields_are_full(monkeypatch):
+    consumed = []
+    original = get_pdf_diff.iter_diff_changes
+
+    def counting_changes(old_lines, new_lines):
+        for change in original(old_lines, new_lines):
+            consumed.append(change)
+            yield change
+
+    monkeypatch.setattr(get_pdf_diff, 'iter_diff_changes', counting_changes)
+
+    diff_lines = diff_text_lines(OLD_TEXT, NEW_TEXT, budget=500)
+
+    assert diff_lines['truncated']
+    assert len(consumed) < 400
+    added_text, added_remaining = take_within_budget(diff_lines['added_lines'], 500)
+    assert added_text.startswith('Added bullet 0 ') and len(added_text) <= 500
+    assert added_remaining >= 1
+
+
+def test_budgeted_diff_matches_the_full_diff_when_it_fits():
+    old_text = "Experience\nLed team of 5 engineers"
+    new_text = "Experience\nLed team of 8 engineers"
+
+    assert diff_text_lines(old_text, new_text, budget=500) == diff_text_lines(old_text, new_text)
+    assert not diff_text_lines(old_text, new_text, budget=500)['truncated']
+
+
+def test_truncated_count_is_shown_as_a_lower_bound():
+    assert format_diff_field_value('a', 3, 'none', truncated=True).endswith('...and 3+ more changed lines')
+    assert format_diff_field_value('a', 1, 'none').endswith('...and 1 more changed line')
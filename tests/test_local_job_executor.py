@@ -0,0 +1,47 @@
+import threading
+import command_processor
+from helpers import sqs_publisher
+from helpers.local_job_executor import LocalJobExecutor
+
+
+def test_background_jobs_run_on_the_bounded_pool_and_reject_when_full(monkeypatch):
+    executor = LocalJobExecutor(worker_count=1, max_queue_size=1, submit_timeout=0.01)
+    started = threading.Event()
+    release = threading.Event()
+    ran = []
+
+    def blocking_background_job(job_type, payload):
+        ran.append((job_type, payload, threading.current_thread().name))
+        started.set()
+        release.wait(5)
+        return {'success': True, 'job_type': job_type}
+
+    monkeypatch.setattr(command_processor, 'run_background_job', blocking_background_job)
+
+    assert executor.submit_background('precompute_diff', {'n': 1})
+    assert started.wait(5)
+    # One running and one queued fill the pool, so a third is turned away instead of getting its own thread
+    assert executor.submit_background('precompute_diff', {'n': 2})
+    assert not executor.submit_background('precompute_diff', {'n': 3})
+
+    release.set()
+    executor.stop()
+
+    assert [payload['n'] for _, payload, _ in ran] == [1, 2]
+    assert {thread_name for _, _, thread_name in ran} == {'local-job-worker-0'}
+    metrics = executor.get_metrics()
+    assert (metrics['submitted'], metrics['rejected'], metrics['completed']) == (2, 1, 2)
+
+
+def test_local_publish_background_job_uses_the_executor(monkeypatch):
+    monkeypatch.setenv('ENVIRONMENT', 'DEV')
+    monkeypatch.setattr(sqs_publisher, '_queue_backend', sqs_publisher.SQSQueueBackend())
+    submitted = []
+    monkeypatch.setattr('helpers.local_job_executor.local_job_executor.submit_background',
+                        lambda job_type, payload: submitted.append((job_type, payload)) or True)
+    threads_before = threading.active_count()
+
+    assert sqs_publisher.publish_background_job('precompute_diff', {'old_resume_url': 'a'})
+
+    assert submitted == [('precompute_diff', {'old_resume_url': 'a'})]
+    assert threading.active_count() == threads_before
@@ -0,0 +1,37 @@
+from helpers.model_router import ModelRouter
+from helpers.ai_resume_analyzer import ResumeAnalyzer
+
+
+def test_output_budget_fits_a_full_feedback_response():
+    analyzer = ResumeAnalyzer(client=object(), router=ModelRouter())
+
+    for input_chars in (600, 4000, 15000):
+        decision = analyzer.router.choose(input_chars, None, analyzer.min_output_tokens)
+        assert decision.max_output_tokens >= analyzer.MAX_FEEDBACK_ITEMS * 120
+
+
+def test_output_budget_still_scales_with_input_without_a_floor():
+    router = ModelRouter()
+    assert router.choose(800).max_output_tokens < router.choose(8000).max_output_tokens
+
+
+def test_route_caps_bound_large_inputs_above_the_floor():
+    analyzer = ResumeAnalyzer(client=object(), router=ModelRouter())
+    preferred, fallback = [analyzer.router.choose(16000, remaining_time_ms, analyzer.min_output_tokens)
+                           for remaining_time_ms in (None, 15000 + 8000)]
+
+    assert (preferred.model, fallback.model) == ('gpt-4o-mini', 'gpt-4.1-nano')
+    # The faster fallback gets a smaller output budget, and both still fit a complete response
+    assert analyzer.min_output_tokens <= fallback.max_output_tokens < preferred.max_output_tokens
+
+
+def test_no_request_is_sent_without_time_left():
+    class UnusedClient:
+        @property
+        def chat(self):
+            raise AssertionError("no request should be sent")
+
+    analyzer = ResumeAnalyzer(client=UnusedClient(), router=ModelRouter(safety_margin_ms=15000))
+
+    assert analyzer.router.choose(4000, 10000).budget_ms < 0
+    assert analyzer.analyze_resume("Experience\nLed team of 5 engineers", remaining_time_ms=10000) is None
@@ -0,0 +1,49 @@
+from io import BytesIO
+import PyPDF2
+from helpers.page_fingerprints import compute_page_fingerprints, changed_page_indices
+
+
+def build_form_xobject_pdf(text):
+    """One page whose content stream only says /Fm0 Do; the text lives in the form XObject"""
+    page_stream = b"q /Fm0 Do Q"
+    form_stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode('latin-1')
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /XObject << /Fm0 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(page_stream), page_stream),
+        b"<< /Type /XObject /Subtype /Form /BBox [0 0 612 792] /Resources << /Font << /F1 6 0 R >> >> "
+        b"/Length %d >>\nstream\n%s\nendstream" % (len(form_stream), form_stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+
+    pdf = BytesIO()
+    pdf.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(pdf.tell())
+        pdf.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref_offset = pdf.tell()
+    pdf.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        pdf.write(b"%010d 00000 n \n" % offset)
+    pdf.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+    return pdf.getvalue()
+
+
+def fingerprints(pdf_bytes):
+    return compute_page_fingerprints(PyPDF2.PdfReader(BytesIO(pdf_bytes)))
+
+
+def test_text_drawn_through_form_xobject_changes_fingerprint():
+    old = fingerprints(build_form_xobject_pdf("Led team of 5 engineers"))
+    new = fingerprints(build_form_xobject_pdf("Led team of 8 engineers"))
+
+    assert old != new
+    assert changed_page_indices(old, new) == ([0], [0])
+
+
+def test_identical_pages_keep_their_fingerprint():
+    pdf = build_form_xobject_pdf("Led team of 5 engineers")
+    assert fingerprints(pdf) == fingerprints(pdf)
@@ -0,0 +1,52 @@
+import logging
+import pytest
+from helpers import disk_cache, pdf_backends
+from helpers.pdf_backends import PDFTextBackend, load_backend
+from test_page_fingerprints import build_form_xobject_pdf
+
+
+def test_backend_without_text_extraction_cannot_be_instantiated():
+    class CountOnlyBackend(PDFTextBackend):
+        name = 'count-only'
+
+        def open(self, pdf_bytes):
+            return pdf_bytes
+
+        def page_count(self, document):
+            return 1
+
+    with pytest.raises(TypeError):
+        CountOnlyBackend()
+
+
+def test_cached_text_is_keyed_by_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, 'disk_cache', disk_cache.DiskCache(cache_dir=str(tmp_path)))
+    url = 'https://example.com/resume.pdf'
+
+    monkeypatch.setattr(pdf_backends, 'pdf_text_backend', pdf_backends.BACKENDS['pypdf2'])
+    disk_cache.cache_pdf_text(url, 'text from PyPDF2')
+    assert disk_cache.get_cached_pdf_text(url) == 'text from PyPDF2'
+
+    monkeypatch.setattr(pdf_backends, 'pdf_text_backend', pdf_backends.BACKENDS['pdfminer'])
+    assert disk_cache.get_cached_pdf_text(url) is None
+
+
+def test_uninstalled_backend_falls_back_with_an_error(monkeypatch, caplog):
+    monkeypatch.setattr(pdf_backends.BACKENDS['pdfminer'], 'is_available', lambda: False)
+
+    with caplog.at_level(logging.ERROR, logger='helpers.pdf_backends'):
+        backend = load_backend('pdfminer')
+
+    assert backend.name == 'pypdf2'
+    assert 'pdfminer is not installed' in caplog.text
+
+
+def test_pdfium_backend_extracts_form_xobject_text():
+    pytest.importorskip('pypdfium2')
+    pdf_bytes = build_form_xobject_pdf("Led team of 5 engineers")
+
+    backend = load_backend('pypdfium2')
+
+    assert backend.name == 'pypdfium2'
+    assert backend.count_pages(pdf_bytes) == 1
+    assert backend.extract_text(pdf_bytes) == "Led team of 5 engineers"
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+# Starts the pool, prints the worker pids and exits without multiprocessing's atexit cleanup
+ABANDON_POOL = """
+import os, sys
+from helpers.pdf_sandbox import pdf_sandbox
+pdf_sandbox.start()
+print(' '.join(str(worker.process.pid) for worker in pdf_sandbox.workers), flush=True)
+os._exit(0)
+"""
+
+
+def is_running(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split()[2] != 'Z'
+    except FileNotFoundError:
+        return False
+
+
+def test_workers_exit_when_parent_dies_without_cleanup():
+    output = subprocess.run([sys.executable, '-c', ABANDON_POOL], cwd=SRC_DIR, capture_output=True, text=True,
+                            check=True, timeout=30).stdout
+    pids = [int(pid) for pid in output.split()]
+    assert pids
+
+    deadline = time.monotonic() + 5
+    while any(is_running(pid) for pid in pids) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert not any(is_running(pid) for pid in pids)
+
+
+def test_shutdown_stops_workers():
+    from helpers.pdf_sandbox import PDFSandbox
+
+    sandbox = PDFSandbox(pool_size=2)
+    if not sandbox.enabled:
+        return
+    sandbox.start()
+    processes = [worker.process for worker in sandbox.workers]
+
+    sandbox.shutdown()
+
+    assert not any(process.is_alive() for process in processes)
+    assert sandbox.get_stats()['workers'] == 0
+
+
+def test_busy_pool_fails_within_the_deadline():
+    from helpers.deadline import Deadline
+    from helpers.pdf_sandbox import PDFSandbox, PDFSandboxError, BUSY
+
+    sandbox = PDFSandbox(pool_size=1)
+    if not sandbox.enabled:
+        return
+    sandbox.start()
+    checked_out = sandbox.idle_workers.get()
+    try:
+        started_at = time.monotonic()
+        try:
+            sandbox.run('page_count', b'%PDF-1.4', deadline=Deadline.after_ms(500))
+            raise AssertionError("expected the checkout to fail")
+        except PDFSandboxError as e:
+            assert e.error_type == BUSY
+        assert time.monotonic() - started_at < 1.0
+    finally:
+        sandbox.idle_workers.put(checked_out)
+        sandbox.shutdown()
+
+
+def test_workers_run_operations_and_are_forked_by_the_fork_server():
+    from helpers.pdf_sandbox import PDFSandbox, PDFSandboxError
+    from test_page_fingerprints import build_form_xobject_pdf
+
+    sandbox = PDFSandbox(pool_size=1)
+    if not sandbox.enabled:
+        return
+    sandbox.start()
+    try:
+        assert sandbox.run('page_count', build_form_xobject_pdf("Led team of 5 engineers")) == 1
+        with open(f"/proc/{sandbox.workers[0].process.pid}/stat") as f:
+            assert int(f.read().split()[3]) != os.getpid()
+        try:
+            sandbox.run('page_count', b'not a pdf')
+        except PDFSandboxError:
+            pass
+        assert sandbox.run('page_count', build_form_xobject_pdf("Still parses")) == 1
+    finally:
+        sandbox.shutdown()
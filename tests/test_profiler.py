@@ -0,0 +1,44 @@
+import os
+import time
+import threading
+from helpers.profiler import SamplingProfiler
+
+
+def test_slow_interaction_profile_is_written_after_the_interaction_returns(tmp_path, monkeypatch):
+    monkeypatch.setenv('PROFILER_ENABLED', 'true')
+    monkeypatch.setenv('PROFILE_OUTPUT', 'tmp')
+    monkeypatch.setenv('PROFILE_DIR', str(tmp_path))
+    monkeypatch.setenv('PROFILE_INTERACTION_THRESHOLD_MS', '20')
+    profiler = SamplingProfiler()
+    written = []
+    release = threading.Event()
+
+    def slow_write(profile):
+        release.wait(5)
+        written.append(profile)
+        return 'memory'
+
+    profiler.write = slow_write
+
+    with profiler.profile('update', 'interaction'):
+        time.sleep(0.05)
+    # The interaction has returned while the upload is still blocked
+    assert written == []
+    release.set()
+    profiler.wait_for_writes()
+
+    assert [profile['command'] for profile in written] == ['update']
+    assert profiler.get_stats()['kept'] == 1
+
+
+def test_fast_interaction_profile_is_discarded(tmp_path, monkeypatch):
+    monkeypatch.setenv('PROFILE_DIR', str(tmp_path))
+    monkeypatch.setenv('PROFILER_ENABLED', 'true')
+    profiler = SamplingProfiler()
+
+    with profiler.profile('ping', 'interaction'):
+        pass
+    profiler.wait_for_writes()
+
+    assert profiler.get_stats()['discarded'] == 1
+    assert not os.listdir(tmp_path)
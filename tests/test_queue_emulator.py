@@ -0,0 +1,85 @@
+import threading
+import command_processor
+from helpers.queue_emulator import QueueEmulator
+
+
+def test_unacknowledged_message_is_redelivered_after_the_visibility_timeout():
+    queue = QueueEmulator(visibility_timeout=0.05, max_receive_count=3)
+    message_id = queue.send_message('{"job_type": "precompute_diff"}')
+
+    first = queue.receive_messages()
+    assert [record['messageId'] for record in first] == [message_id]
+    assert queue.receive_messages() == []
+
+    second = queue.receive_messages(wait_time=2.0)
+
+    assert [record['messageId'] for record in second] == [message_id]
+    assert second[0]['attributes']['ApproximateReceiveCount'] == '2'
+    # The first receipt handle went stale when the message became visible again
+    assert not queue.delete_message(first[0]['receiptHandle'])
+    assert queue.delete_message(second[0]['receiptHandle'])
+    assert queue.wait_until_drained(timeout=1.0)
+
+
+def test_message_moves_to_the_dlq_after_max_receive_count():
+    queue = QueueEmulator(visibility_timeout=0.01, max_receive_count=2)
+    message_id = queue.send_message('poison')
+
+    assert len(queue.receive_messages(wait_time=1.0)) == 1
+    assert len(queue.receive_messages(wait_time=1.0)) == 1
+    assert queue.receive_messages(wait_time=0.1) == []
+
+    assert [message['message_id'] for message in queue.dead_letters] == [message_id]
+    stats = queue.get_stats()
+    assert (stats['received'], stats['redriven'], stats['visible'], stats['in_flight']) == (2, 1, 0, 0)
+
+
+def run_emulator(monkeypatch, handler, message_bodies):
+    queue = QueueEmulator(visibility_timeout=0.2, max_receive_count=3, batch_size=len(message_bodies),
+                          concurrency=1, function_timeout=5)
+    monkeypatch.setattr(command_processor, 'handler', handler)
+    for body in message_bodies:
+        queue.send_message(body)
+    queue.start()
+    try:
+        assert queue.wait_until_drained(timeout=5.0)
+    finally:
+        queue.stop()
+    return queue
+
+
+def test_only_batch_item_failures_are_redelivered(monkeypatch):
+    deliveries = []
+    lock = threading.Lock()
+
+    def handler(event, context):
+        assert context.get_remaining_time_in_millis() > 0
+        failures = []
+        with lock:
+            for record in event['Records']:
+                deliveries.append(record['body'])
+                if record['body'] == 'b' and deliveries.count('b') == 1:
+                    failures.append({'itemIdentifier': record['messageId']})
+        return {'batchItemFailures': failures} if failures else {}
+
+    queue = run_emulator(monkeypatch, handler, ['a', 'b', 'c'])
+
+    assert sorted(deliveries) == ['a', 'b', 'b', 'c']
+    stats = queue.get_stats()
+    assert (stats['deleted'], stats['dead_letters'], stats['invocations']) == (3, 0, 2)
+
+
+def test_failed_invocation_leaves_the_whole_batch_for_redelivery(monkeypatch):
+    invocations = []
+
+    def handler(event, context):
+        invocations.append(sorted(record['body'] for record in event['Records']))
+        if len(invocations) == 1:
+            raise RuntimeError("function crashed")
+        return {}
+
+    queue = run_emulator(monkeypatch, handler, ['a', 'b'])
+
+    assert invocations == [['a', 'b'], ['a', 'b']]
+    stats = queue.get_stats()
+    assert (stats['deleted'], stats['invocation_errors']) == (2, 1)